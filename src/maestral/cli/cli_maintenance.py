@@ -370,6 +370,11 @@ Currently available config keys are:
 - keep_history: the sync history to keep in seconds
 - upload: if upload sync is enabled
 - download: if download sync is enabled
+- scan_threads: number of threads to use when scanning local folders
+- hash_processes: number of processes to use for hashing, 0 to use threads
+- upload_chunk_threads: number of chunks of a large file to upload in parallel
+- download_segments: number of segments of a large file to download in parallel
+- segmented_download_min_size: minimum file size in bytes for segmented downloads
 """,
 )
 def config() -> None:
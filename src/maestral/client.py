@@ -8,10 +8,13 @@ from __future__ import annotations
 # system imports
 import os
 import re
+import errno
+import hashlib
 import time
 import functools
 import contextlib
 import threading
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime, timezone
 from typing import (
     Callable,
@@ -24,7 +27,7 @@ from typing import (
     cast,
     TYPE_CHECKING,
 )
-from typing_extensions import ParamSpec, Concatenate
+from typing_extensions import ParamSpec, Concatenate, Protocol
 
 # external imports
 import requests
@@ -66,6 +69,7 @@ from .exceptions import (
     NotFoundError,
     NotLinkedError,
     DataCorruptionError,
+    DropboxConnectionError,
 )
 from .errorhandling import (
     convert_api_errors,
@@ -73,6 +77,7 @@ from .errorhandling import (
     CONNECTION_ERRORS,
 )
 from .config import MaestralState
+from .models import UploadSessionEntry
 from .constants import DROPBOX_APP_KEY
 from .utils import natural_size, chunks, clamp
 from .utils.path import opener_no_symlink, delete
@@ -99,6 +104,207 @@ def get_hash(data: bytes) -> str:
     return hasher.hexdigest()
 
 
+class UploadSessionStore(Protocol):
+    """Persistent storage for the state of upload sessions, keyed by local path."""
+
+    def get_upload_session(self, local_path: str) -> UploadSessionEntry | None:
+        ...
+
+    def save_upload_session(self, session: UploadSessionEntry) -> None:
+        ...
+
+    def delete_upload_session(self, local_path: str) -> None:
+        ...
+
+
+class _UploadHasher:
+    """
+    Computes the content hash of an upload from the chunks which were sent. This avoids
+    reading the file again to determine the content hash of the uploaded data.
+
+    Chunks must be added in order of their offsets. If a chunk is skipped or repeated,
+    for instance because the server reports an incorrect offset, no hash can be given.
+    """
+
+    def __init__(self) -> None:
+        self._hasher = DropboxContentHasher()
+        self._offset = 0
+        self._valid = True
+
+    def update(self, offset: int, data: bytes) -> None:
+        """
+        Adds a successfully uploaded chunk.
+
+        :param offset: Offset of the chunk in the file.
+        :param data: Chunk data.
+        """
+        if offset != self._offset:
+            self._valid = False
+        elif self._valid:
+            self._hasher.update(data)
+            self._offset += len(data)
+
+    def hexdigest(self) -> str | None:
+        """
+        :returns: Content hash of the uploaded data or None if chunks were not
+            contiguous.
+        """
+        return self._hasher.hexdigest() if self._valid else None
+
+
+class _ConcurrentUploadHasher(_UploadHasher):
+    """
+    Computes the content hash of an upload from chunks which may be sent in any order.
+    Only the hashes of 4 MB blocks are kept in memory. All chunks except the last one
+    must be a multiple of :attr:`DropboxContentHasher.BLOCK_SIZE` in size.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: dict[int, tuple[int, list[bytes]]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, offset: int, data: bytes) -> None:
+        """
+        Adds a successfully uploaded chunk.
+
+        :param offset: Offset of the chunk in the file.
+        :param data: Chunk data.
+        """
+        view = memoryview(data)
+        block_size = DropboxContentHasher.BLOCK_SIZE
+        block_hashes = [
+            hashlib.sha256(view[i : i + block_size]).digest()
+            for i in range(0, len(view), block_size)
+        ]
+
+        with self._lock:
+            self._chunks[offset] = (len(data), block_hashes)
+
+    def hexdigest(self) -> str | None:
+        """
+        :returns: Content hash of the uploaded data or None if chunks were not
+            contiguous or not aligned to blocks.
+        """
+        overall_hasher = hashlib.sha256()
+        expected_offset = 0
+
+        with self._lock:
+            for offset in sorted(self._chunks):
+                if offset != expected_offset:
+                    return None
+                if offset % DropboxContentHasher.BLOCK_SIZE != 0:
+                    return None
+
+                length, block_hashes = self._chunks[offset]
+
+                for block_hash in block_hashes:
+                    overall_hasher.update(block_hash)
+
+                expected_offset += length
+
+        return overall_hasher.hexdigest()
+
+
+class _ThrottledProgress:
+    """
+    Reports the progress of a transfer to a sync event at most once per interval to
+    reduce overhead when data arrives in many small pieces.
+
+    :param sync_event: Sync event to update. If None, progress will not be reported.
+    :param interval: Minimum interval in seconds between updates.
+    """
+
+    def __init__(self, sync_event: SyncEvent | None, interval: float = 0.1) -> None:
+        self.sync_event = sync_event
+        self.interval = interval
+        self._last_update = 0.0
+
+    def update(self, completed: int, force: bool = False) -> None:
+        """
+        Reports the number of bytes transferred.
+
+        :param completed: Number of bytes transferred.
+        :param force: Whether to report the progress even if the interval since the
+            last update has not yet passed.
+        """
+        if not self.sync_event:
+            return
+
+        now = time.monotonic()
+
+        if force or now - self._last_update >= self.interval:
+            self.sync_event.completed = completed
+            self._last_update = now
+
+
+class _ByteBudget:
+    """
+    Limits the number of bytes held in memory by concurrent transfers. Threads block
+    when reserving bytes until enough of the budget is available. A reservation larger
+    than the budget is granted once no other bytes are reserved to avoid deadlocks.
+
+    :param max_bytes: Maximum number of bytes that can be reserved at once.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._reserved = 0
+        self._cond = threading.Condition()
+
+    @contextlib.contextmanager
+    def reserve(self, n_bytes: int) -> Iterator[None]:
+        """
+        Context manager which reserves the given number of bytes for its duration.
+
+        :param n_bytes: Number of bytes to reserve.
+        """
+        with self._cond:
+            while self._reserved > 0 and self._reserved + n_bytes > self.max_bytes:
+                self._cond.wait()
+            self._reserved += n_bytes
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._reserved -= n_bytes
+                self._cond.notify_all()
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int) -> None:
+    """
+    Writes all data to a file at the given offset. Unlike :meth:`os.pwrite`, this
+    retries short writes until all data has been written.
+
+    :param fd: File descriptor to write to.
+    :param data: Data to write.
+    :param offset: Position in the file to write the data to.
+    :raises OSError: if no data could be written.
+    """
+    view = memoryview(data)
+
+    while view:
+        n = os.pwrite(fd, view, offset)
+
+        if n == 0:
+            raise OSError(errno.EIO, "Could not write data")
+
+        view = view[n:]
+        offset += n
+
+
+def _opener_create_no_symlink(path: str, flags: int) -> int:
+    """
+    Opener that creates the file if it does not exist and does not follow symlinks.
+
+    :param path: Path to open.
+    :param flags: Flags passed to :meth:`os.open`. O_CREAT will be added.
+    :return: Open file descriptor.
+    """
+    return opener_no_symlink(path, flags | os.O_CREAT)
+
+
 class DropboxClient:
     """Client for the Dropbox SDK
 
@@ -124,11 +330,16 @@ class DropboxClient:
     :param timeout: Timeout for individual requests. Defaults to 100 sec if not given.
     :param session: Optional requests session to use. If not given, a new session will
         be created with :func:`dropbox.dropbox_client.create_session`.
+    :param max_upload_buffer: Maximum number of bytes which concurrent uploads may hold
+        in memory at once. Uploads will wait for others to complete before exceeding
+        this limit. A single upload chunk is always allowed, even if it is larger.
     """
 
     SDK_VERSION: str = "2.0"
 
     MAX_TRANSFER_RETRIES = 3
+    DOWNLOAD_CHUNK_SIZE = 2**20
+    UPLOAD_SESSION_MAX_AGE = 46 * 60 * 60
     MAX_LIST_FOLDER_RETRIES = 3
 
     _dbx: Dropbox | None
@@ -139,6 +350,7 @@ class DropboxClient:
         cred_storage: CredentialStorage,
         timeout: float = 100,
         session: requests.Session | None = None,
+        max_upload_buffer: int = 300 * 10**6,
     ) -> None:
         self.config_name = config_name
         self._auth_flow: DropboxOAuth2FlowNoRedirect | None = None
@@ -152,6 +364,7 @@ class DropboxClient:
         self._timeout = timeout
         self._session = session or create_session()
         self._backoff_until = 0
+        self._upload_budget = _ByteBudget(max_upload_buffer)
         self._dbx: Dropbox | None = None
         self._dbx_base: Dropbox | None = None
         self._cached_account_info: FullAccount | None = None
@@ -611,38 +824,57 @@ class DropboxClient:
         dbx_path: str,
         local_path: str,
         sync_event: SyncEvent | None = None,
+        resume: bool = False,
+        num_segments: int = 1,
+        min_segmented_size: int = 64 * 2**20,
     ) -> FileMetadata:
         """
-        Downloads a file from Dropbox to given local path.
+        Downloads a file from Dropbox to given local path. If the connection is lost
+        during the download, it will be resumed from the last complete 4 MB block.
 
         :param dbx_path: Path to file on Dropbox or rev number.
         :param local_path: Path to local download destination.
         :param sync_event: If given, the sync event will be updated with the number of
             downloaded bytes.
+        :param resume: Whether to treat existing data at ``local_path`` as a partial
+            download of the same file and only download the remaining data. This
+            should only be used when ``dbx_path`` refers to a rev number.
+        :param num_segments: Number of segments to download in parallel. If larger than
+            one, files of at least ``min_segmented_size`` bytes will be split into byte
+            ranges which are downloaded concurrently. The file size is taken from
+            ``sync_event``, segmented downloads require it to be given.
+        :param min_segmented_size: Minimum size of the data to download for segmented
+            downloads.
         :returns: Metadata of downloaded item.
         :raises DataCorruptionError: if data is corrupted during download.
         """
-        chunk_size = 2**13
+        tries = 0
 
-        with convert_api_errors(dbx_path=dbx_path):
-            md, http_resp = self.dbx.files_download(dbx_path)
+        while True:
+            try:
+                md = self._download_helper(
+                    dbx_path,
+                    local_path,
+                    sync_event,
+                    resume,
+                    num_segments,
+                    min_segmented_size,
+                )
+                break
+            except DropboxConnectionError:
+                if tries >= self.MAX_TRANSFER_RETRIES:
+                    raise
 
-            with contextlib.closing(http_resp):
-                with open(local_path, "wb", opener=opener_no_symlink) as f:
-                    hasher = DropboxContentHasher()
-                    wrapped_f = StreamHasher(f, hasher)
-                    for c in http_resp.iter_content(chunk_size):
-                        wrapped_f.write(c)
-                        if sync_event:
-                            sync_event.completed = wrapped_f.tell()
-
-                    local_hash = hasher.hexdigest()
-
-                    if md.content_hash != local_hash:
-                        delete(local_path)
-                        raise DataCorruptionError(
-                            "Data corrupted", "Please retry download."
-                        )
+                tries += 1
+                resume = True
+
+                self._logger.debug(
+                    "Connection lost while downloading %s, resuming (%s/%s)",
+                    dbx_path,
+                    tries,
+                    self.MAX_TRANSFER_RETRIES,
+                )
+                time.sleep(2)
 
         # Dropbox SDK provides naive datetime in UTC.
         client_mod = md.client_modified.replace(tzinfo=timezone.utc)
@@ -655,6 +887,260 @@ class DropboxClient:
 
         return convert_metadata(md)
 
+    def _ranged_dbx(self, start: int, end: int | None = None) -> Dropbox:
+        """
+        Returns a Dropbox SDK instance which only requests the given byte range when
+        downloading files. Any other headers, such as the path root, are preserved.
+
+        :param start: First byte to download.
+        :param end: Last byte to download, inclusive. If not given, download until the
+            end of the file.
+        :returns: Dropbox SDK instance.
+        """
+        end_str = "" if end is None else str(end)
+        headers = dict(self.dbx._headers or {})
+        headers["Range"] = f"bytes={start}-{end_str}"
+        return self.dbx.clone(headers=headers)
+
+    def _download_helper(
+        self,
+        dbx_path: str,
+        local_path: str,
+        sync_event: SyncEvent | None,
+        resume: bool,
+        num_segments: int,
+        min_segmented_size: int,
+    ) -> files.FileMetadata:
+        block_size = DropboxContentHasher.BLOCK_SIZE
+
+        with convert_api_errors(dbx_path=dbx_path, local_path=local_path):
+            # Partial downloads are opened for reading and writing without O_APPEND
+            # since segmented downloads write data at arbitrary positions.
+            with open(
+                local_path,
+                "r+b" if resume else "wb",
+                opener=_opener_create_no_symlink,
+            ) as f:
+
+                # Resume from the last complete block of any partial download. This
+                # ensures that we always request at least one byte.
+                size = f.seek(0, os.SEEK_END)
+                offset = (size - 1) // block_size * block_size if size > 0 else 0
+
+                f.truncate(offset)
+                f.seek(offset)
+
+                if (
+                    num_segments > 1
+                    and sync_event
+                    and sync_event.size - offset >= min_segmented_size
+                ):
+                    md, local_hash = self._download_segmented(
+                        dbx_path, f, offset, sync_event.size, num_segments, sync_event
+                    )
+                else:
+                    md, local_hash = self._download_stream(
+                        dbx_path, f, offset, sync_event
+                    )
+
+            if md.content_hash != local_hash:
+                delete(local_path)
+                raise DataCorruptionError("Data corrupted", "Please retry download.")
+
+        return md
+
+    def _download_stream(
+        self,
+        dbx_path: str,
+        f: BinaryIO,
+        offset: int,
+        sync_event: SyncEvent | None,
+    ) -> tuple[files.FileMetadata, str]:
+        """
+        Downloads the data of a file from ``offset`` onwards in a single request and
+        appends it to the file.
+
+        :param dbx_path: Path to file on Dropbox or rev number.
+        :param f: File to write to, already containing any data before ``offset``.
+        :param offset: Offset to start downloading from. Must be a multiple of 4 MB.
+        :param sync_event: If given, the sync event will be updated with the number of
+            downloaded bytes.
+        :returns: Metadata of the downloaded file and content hash of the file data.
+        """
+        block_size = DropboxContentHasher.BLOCK_SIZE
+        hasher = DropboxContentHasher()
+        progress = _ThrottledProgress(sync_event)
+
+        for block_offset in range(0, offset, block_size):
+            hasher.update(os.pread(f.fileno(), block_size, block_offset))
+
+        if offset > 0:
+            md, http_resp = self._ranged_dbx(offset).files_download(dbx_path)
+
+            if http_resp.status_code != 206:
+                # The range was ignored, start from the beginning.
+                f.truncate(0)
+                f.seek(0)
+                hasher = DropboxContentHasher()
+        else:
+            md, http_resp = self.dbx.files_download(dbx_path)
+
+        with contextlib.closing(http_resp):
+            wrapped_f = StreamHasher(f, hasher)
+            progress.update(wrapped_f.tell(), force=True)
+
+            for c in http_resp.iter_content(self.DOWNLOAD_CHUNK_SIZE):
+                wrapped_f.write(c)
+                progress.update(wrapped_f.tell())
+
+            progress.update(wrapped_f.tell(), force=True)
+
+        return md, hasher.hexdigest()
+
+    def _download_segmented(
+        self,
+        dbx_path: str,
+        f: BinaryIO,
+        offset: int,
+        size: int,
+        num_segments: int,
+        sync_event: SyncEvent | None,
+    ) -> tuple[files.FileMetadata, str]:
+        """
+        Downloads the data of a file from ``offset`` onwards in segments of whole 4 MB
+        blocks. Segments are requested in parallel and written at their position in the
+        file. Each segment is resumed on its own if the connection is lost. If the
+        download fails, the file is truncated to the data which was downloaded without
+        gaps so that it can be resumed later.
+
+        :param dbx_path: Path to file on Dropbox or rev number.
+        :param f: File to write to, already containing any data before ``offset``.
+        :param offset: Offset to start downloading from. Must be a multiple of 4 MB.
+        :param size: Expected size of the file.
+        :param num_segments: Number of segments to download in parallel.
+        :param sync_event: If given, the sync event will be updated with the number of
+            downloaded bytes.
+        :returns: Metadata of the downloaded file and content hash of the file data.
+        """
+        block_size = DropboxContentHasher.BLOCK_SIZE
+        fd = f.fileno()
+        progress = _ThrottledProgress(sync_event)
+
+        block_hashes: dict[int, bytes] = {}
+
+        for block_offset in range(0, offset, block_size):
+            block_data = os.pread(fd, block_size, block_offset)
+            block_hashes[block_offset] = hashlib.sha256(block_data).digest()
+
+        n_blocks = -(-(size - offset) // block_size)
+        segment_size = -(-n_blocks // num_segments) * block_size
+        segment_offsets = list(range(offset, size, segment_size))
+
+        f.truncate(size)
+        progress.update(offset, force=True)
+
+        downloaded = {start: 0 for start in segment_offsets}
+        metadata: list[files.FileMetadata] = []
+        lock = threading.Lock()
+        cancel = threading.Event()
+
+        def download_segment(start: int) -> None:
+            end = min(start + segment_size, size)
+            pos = start
+            block_hasher = hashlib.sha256()
+            tries = 0
+
+            while pos < end and not cancel.is_set():
+                try:
+                    with convert_api_errors(dbx_path=dbx_path):
+                        ranged_dbx = self._ranged_dbx(pos, end - 1)
+                        md, http_resp = ranged_dbx.files_download(dbx_path)
+
+                        with contextlib.closing(http_resp):
+                            if http_resp.status_code != 206:
+                                raise DataCorruptionError(
+                                    "Data corrupted", "Range request was ignored."
+                                )
+
+                            with lock:
+                                metadata.append(md)
+
+                            for c in http_resp.iter_content(self.DOWNLOAD_CHUNK_SIZE):
+                                if cancel.is_set():
+                                    return
+
+                                _pwrite_all(fd, c, pos)
+
+                                view = memoryview(c)
+
+                                while view:
+                                    n = min(len(view), block_size - pos % block_size)
+                                    block_hasher.update(view[:n])
+                                    view = view[n:]
+                                    pos += n
+
+                                    if pos % block_size == 0 or pos == size:
+                                        block_start = (pos - 1) // block_size
+                                        block_digest = block_hasher.digest()
+                                        block_hashes[
+                                            block_start * block_size
+                                        ] = block_digest
+                                        block_hasher = hashlib.sha256()
+
+                                with lock:
+                                    downloaded[start] = pos - start
+                                    progress.update(offset + sum(downloaded.values()))
+
+                except DropboxConnectionError:
+                    if tries >= self.MAX_TRANSFER_RETRIES:
+                        raise
+
+                    tries += 1
+                    time.sleep(2)
+
+        with ThreadPoolExecutor(
+            max_workers=num_segments,
+            thread_name_prefix="maestral-segment-download",
+        ) as executor:
+            futures = [
+                executor.submit(download_segment, start) for start in segment_offsets
+            ]
+
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                cancel.set()
+                executor.shutdown(wait=True)
+
+                # Keep the data which was downloaded without gaps.
+                valid_size = offset
+                for start in segment_offsets:
+                    valid_size = start + downloaded[start] // block_size * block_size
+                    if downloaded[start] < min(segment_size, size - start):
+                        break
+
+                f.truncate(valid_size)
+                raise
+
+        if any(md.rev != metadata[0].rev for md in metadata):
+            raise DataCorruptionError(
+                "Data corrupted", "The file was modified during the download."
+            )
+
+        progress.update(offset + sum(downloaded.values()), force=True)
+
+        overall_hasher = hashlib.sha256()
+
+        for block_offset in range(0, size, block_size):
+            try:
+                overall_hasher.update(block_hashes[block_offset])
+            except KeyError:
+                # Missing data, will fail the content hash check.
+                break
+
+        return metadata[0], overall_hasher.hexdigest()
+
     def upload(
         self,
         local_path: str,
@@ -664,6 +1150,8 @@ class DropboxClient:
         update_rev: str | None = None,
         autorename: bool = False,
         sync_event: SyncEvent | None = None,
+        max_parallel_chunks: int = 1,
+        session_store: UploadSessionStore | None = None,
     ) -> FileMetadata:
         """
         Uploads local file to Dropbox.
@@ -671,7 +1159,9 @@ class DropboxClient:
         :param local_path: Path of local file to upload.
         :param dbx_path: Path to save file on Dropbox.
         :param chunk_size: Maximum size for individual uploads. If larger than 150 MB,
-            it will be set to 150 MB.
+            it will be set to 150 MB. Data is read into memory one chunk at a time. The
+            total size of chunks held in memory by concurrent uploads is limited by
+            ``max_upload_buffer``.
         :param write_mode: Your intent when writing a file to some path. This is used to
             determine what constitutes a conflict and what the autorename strategy is.
             This is used to determine what
@@ -703,21 +1193,23 @@ class DropboxClient:
         :param autorename: If there's a conflict, as determined by ``mode``, have the
             Dropbox server try to autorename the file to avoid conflict. The default for
             this field is False.
-        :returns: Metadata of uploaded file.
+        :param max_parallel_chunks: Maximum number of chunks to upload in parallel. If
+            larger than one, files which span more than two chunks will be uploaded
+            through a concurrent upload session. The chunk size will then be rounded
+            down to a multiple of 4 MB, as required by the Dropbox API.
+        :param session_store: If given, the state of upload sessions for large files is
+            persisted in this store. An interrupted upload will be resumed from the
+            last uploaded chunk when the same unchanged file is uploaded again.
+        :returns: Metadata of uploaded file. Its content hash is verified against the
+            content hash of the uploaded data.
         :raises DataCorruptionError: if data is corrupted during upload.
         """
         chunk_size = clamp(chunk_size, 10**5, 150 * 10**6)
+        dbx_write_mode = self._get_dbx_write_mode(write_mode, update_rev)
 
-        if write_mode is WriteMode.Add:
-            dbx_write_mode = files.WriteMode.add
-        elif write_mode is WriteMode.Overwrite:
-            dbx_write_mode = files.WriteMode.overwrite
-        elif write_mode is WriteMode.Update:
-            if update_rev is None:
-                raise RuntimeError("Please provide 'update_rev'")
-            dbx_write_mode = files.WriteMode.update(update_rev)
-        else:
-            raise RuntimeError("No write mode for uploading file.")
+        hasher = _UploadHasher()
+        block_size = DropboxContentHasher.BLOCK_SIZE
+        concurrent_chunk_size = max(chunk_size // block_size * block_size, block_size)
 
         with convert_api_errors(dbx_path=dbx_path, local_path=local_path):
 
@@ -730,47 +1222,129 @@ class DropboxClient:
 
                 # Upload all at once.
 
-                res = self._upload_helper(
-                    local_path,
-                    dbx_path,
-                    mtime_dt,
-                    dbx_write_mode,
-                    autorename,
-                    sync_event,
-                )
+                with self._upload_budget.reserve(stat.st_size):
+                    res = self._upload_helper(
+                        local_path,
+                        dbx_path,
+                        mtime_dt,
+                        dbx_write_mode,
+                        autorename,
+                        sync_event,
+                        hasher,
+                    )
 
             else:
 
-                # Upload in chunks.
-                # Note: We currently do not support resuming interrupted uploads.
-                # Dropbox keeps upload sessions open for 48h so this could be done in
-                # the future.
-
-                with open(local_path, "rb", opener=opener_no_symlink) as f:
+                # Upload in chunks. Chunks are uploaded in parallel through a
+                # concurrent session if requested and if there are enough chunks.
+                # Uploads of unchanged files are resumed from a previous session.
 
-                    session_id = self._upload_session_start_helper(
-                        f, chunk_size, dbx_path, sync_event
-                    )
+                concurrent = (
+                    max_parallel_chunks > 1 and stat.st_size > 2 * concurrent_chunk_size
+                )
+                session_type = "concurrent" if concurrent else "sequential"
 
-                    while stat.st_size - f.tell() > chunk_size:
-                        self._upload_session_append_helper(
-                            f, session_id, chunk_size, dbx_path, sync_event
+                session = self._get_resumable_upload_session(
+                    session_store, local_path, dbx_path, stat, session_type
+                )
+                resumed_bytes = session.uploaded_bytes if session else None
+
+                try:
+                    if concurrent:
+                        hasher = _ConcurrentUploadHasher()
+
+                        res = self._upload_concurrent(
+                            local_path,
+                            dbx_path,
+                            stat,
+                            concurrent_chunk_size,
+                            max_parallel_chunks,
+                            # Commit info.
+                            mtime_dt,
+                            dbx_write_mode,
+                            autorename,
+                            # Commit info end.
+                            sync_event,
+                            hasher,
+                            session,
+                            session_store,
+                        )
+                    else:
+                        res = self._upload_sequential(
+                            local_path,
+                            dbx_path,
+                            stat,
+                            chunk_size,
+                            # Commit info.
+                            mtime_dt,
+                            dbx_write_mode,
+                            autorename,
+                            # Commit info end.
+                            sync_event,
+                            hasher,
+                            session,
+                            session_store,
+                        )
+                except DropboxConnectionError:
+                    # Keep the session to resume the upload later.
+                    raise
+                except MaestralApiError as exc:
+                    if session_store:
+                        session_store.delete_upload_session(local_path)
+
+                    if (
+                        session
+                        and session.uploaded_bytes == resumed_bytes
+                        and isinstance(exc, SyncError)
+                    ):
+                        # The session could not be continued, for instance because
+                        # it expired. Start a new upload instead.
+                        self._logger.debug(
+                            "Could not resume upload of %s: %s", local_path, exc
+                        )
+                        return self.upload(
+                            local_path,
+                            dbx_path,
+                            chunk_size,
+                            write_mode,
+                            update_rev,
+                            autorename,
+                            sync_event,
+                            max_parallel_chunks,
+                            session_store,
                         )
 
-                    res = self._upload_session_finish_helper(
-                        f,
-                        session_id,
-                        chunk_size,
-                        # Commit info.
-                        dbx_path,
-                        mtime_dt,
-                        dbx_write_mode,
-                        autorename,
-                        # Commit info end.
-                        sync_event,
-                    )
+                    raise
 
-        return convert_metadata(res)
+                if session_store:
+                    session_store.delete_upload_session(local_path)
+
+        md = convert_metadata(res)
+
+        # Compare the hash of all uploaded data to the hash of the committed file. Each
+        # chunk was already verified by the server, this guards against missing or
+        # reordered chunks.
+        uploaded_hash = hasher.hexdigest()
+
+        if uploaded_hash and md.content_hash != uploaded_hash:
+            raise DataCorruptionError("Data corrupted", "Please retry upload.")
+
+        return md
+
+    @staticmethod
+    def _get_dbx_write_mode(
+        write_mode: WriteMode, update_rev: str | None
+    ) -> files.WriteMode:
+        if write_mode is WriteMode.Add:
+            return files.WriteMode.add
+        elif write_mode is WriteMode.Overwrite:
+            return files.WriteMode.overwrite
+        elif write_mode is WriteMode.Update:
+            if update_rev is None:
+                raise RuntimeError("Please provide 'update_rev'")
+            return files.WriteMode.update(update_rev)
+        else:
+            raise RuntimeError("No write mode for uploading file.")
 
     @_retry_on_error(DataCorruptionError, MAX_TRANSFER_RETRIES)
     def _upload_helper(
@@ -781,6 +1355,7 @@ class DropboxClient:
         mode: files.WriteMode,
         autorename: bool,
         sync_event: SyncEvent | None,
+        hasher: _UploadHasher,
     ) -> files.FileMetadata:
         with open(local_path, "rb", opener=opener_no_symlink) as f:
             data = f.read()
@@ -795,6 +1370,8 @@ class DropboxClient:
                     autorename=autorename,
                 )
 
+            hasher.update(0, data)
+
             if sync_event:
                 sync_event.completed = f.tell()
 
@@ -807,6 +1384,7 @@ class DropboxClient:
         chunk_size: int,
         dbx_path: str,
         sync_event: SyncEvent | None,
+        hasher: _UploadHasher,
     ) -> str:
         initial_offset = f.tell()
         data = f.read(chunk_size)
@@ -821,6 +1399,8 @@ class DropboxClient:
             f.seek(initial_offset)
             raise
 
+        hasher.update(initial_offset, data)
+
         if sync_event:
             sync_event.completed = f.tell()
 
@@ -834,6 +1414,7 @@ class DropboxClient:
         chunk_size: int,
         dbx_path: str,
         sync_event: SyncEvent | None,
+        hasher: _UploadHasher,
     ) -> None:
         initial_offset = f.tell()
         data = f.read(chunk_size)
@@ -863,6 +1444,8 @@ class DropboxClient:
             f.seek(initial_offset)
             raise
 
+        hasher.update(initial_offset, data)
+
         if sync_event:
             sync_event.completed = f.tell()
 
@@ -877,6 +1460,7 @@ class DropboxClient:
         mode: files.WriteMode,
         autorename: bool,
         sync_event: SyncEvent | None,
+        hasher: _UploadHasher,
     ) -> files.FileMetadata:
         initial_offset = f.tell()
         data = f.read(chunk_size)
@@ -919,11 +1503,483 @@ class DropboxClient:
             f.seek(initial_offset)
             raise
 
+        hasher.update(initial_offset, data)
+
+        if sync_event:
+            sync_event.completed = sync_event.size
+
+        return md
+
+    def _get_resumable_upload_session(
+        self,
+        session_store: UploadSessionStore | None,
+        local_path: str,
+        dbx_path: str,
+        stat: os.stat_result,
+        session_type: str,
+    ) -> UploadSessionEntry | None:
+        """
+        Gets a previous upload session for the file which can be resumed. Sessions for
+        files that have changed since and expired sessions are discarded.
+
+        :param session_store: Store of upload sessions.
+        :param local_path: Path of local file to upload.
+        :param dbx_path: Path to save file on Dropbox.
+        :param stat: Current stat result of the file.
+        :param session_type: Type of the upload session which will be used.
+        :returns: Session to resume or None.
+        """
+        if not session_store:
+            return None
+
+        session = session_store.get_upload_session(local_path)
+
+        if not session:
+            return None
+
+        if (
+            session.dbx_path == dbx_path
+            and session.session_type == session_type
+            and session.inode == stat.st_ino
+            and session.mtime == stat.st_mtime
+            and session.size == stat.st_size
+            and time.time() - session.time_created < self.UPLOAD_SESSION_MAX_AGE
+        ):
+            self._logger.debug(
+                "Resuming upload of %s at %s",
+                local_path,
+                natural_size(session.uploaded_bytes),
+            )
+            return session
+
+        session_store.delete_upload_session(local_path)
+        return None
+
+    @staticmethod
+    def _new_upload_session(
+        session_store: UploadSessionStore | None,
+        session_id: str,
+        session_type: str,
+        local_path: str,
+        dbx_path: str,
+        stat: os.stat_result,
+        uploaded_bytes: int,
+    ) -> UploadSessionEntry:
+        session = UploadSessionEntry(
+            local_path=local_path,
+            dbx_path=dbx_path,
+            session_id=session_id,
+            session_type=session_type,
+            uploaded_bytes=uploaded_bytes,
+            inode=stat.st_ino,
+            mtime=stat.st_mtime,
+            size=stat.st_size,
+            time_created=time.time(),
+        )
+
+        if session_store:
+            session_store.save_upload_session(session)
+
+        return session
+
+    @staticmethod
+    def _update_upload_session(
+        session_store: UploadSessionStore | None,
+        session: UploadSessionEntry,
+        uploaded_bytes: int,
+    ) -> None:
+        session.uploaded_bytes = uploaded_bytes
+
+        if session_store:
+            session_store.save_upload_session(session)
+
+    def _hash_uploaded_data(
+        self, f: BinaryIO, uploaded_bytes: int, chunk_size: int, hasher: _UploadHasher
+    ) -> None:
+        """
+        Adds data which was uploaded by a previous session to the hasher. This reads
+        the file locally instead of persisting the hasher state.
+
+        :param f: File which is uploaded.
+        :param uploaded_bytes: Number of bytes uploaded by the previous session.
+        :param chunk_size: Size of chunks to read and add to the hasher.
+        :param hasher: Hasher to update.
+        """
+        for offset in range(0, uploaded_bytes, chunk_size):
+            length = min(chunk_size, uploaded_bytes - offset)
+            with self._upload_budget.reserve(length):
+                hasher.update(offset, os.pread(f.fileno(), length, offset))
+
+    def _upload_sequential(
+        self,
+        local_path: str,
+        dbx_path: str,
+        stat: os.stat_result,
+        chunk_size: int,
+        client_modified: datetime,
+        mode: files.WriteMode,
+        autorename: bool,
+        sync_event: SyncEvent | None,
+        hasher: _UploadHasher,
+        session: UploadSessionEntry | None,
+        session_store: UploadSessionStore | None,
+    ) -> files.FileMetadata:
+        """
+        Uploads a file through a sequential upload session, one chunk after another.
+
+        :param local_path: Path of local file to upload.
+        :param dbx_path: Path to save file on Dropbox.
+        :param stat: Stat result of the file.
+        :param chunk_size: Size of individual chunks.
+        :param client_modified: Modification time of the file to commit.
+        :param mode: Write mode to commit.
+        :param autorename: Whether to autorename the file on conflicts.
+        :param sync_event: If given, the sync event will be updated with the number of
+            uploaded bytes.
+        :param hasher: Hasher which will be updated with all uploaded chunks.
+        :param session: Previous session to resume.
+        :param session_store: Store to persist the session state.
+        :returns: Metadata of the uploaded file.
+        """
+        with open(local_path, "rb", opener=opener_no_symlink) as f:
+
+            if session:
+                self._hash_uploaded_data(f, session.uploaded_bytes, chunk_size, hasher)
+                f.seek(session.uploaded_bytes)
+
+                if sync_event:
+                    sync_event.completed = f.tell()
+
+            else:
+                with self._upload_budget.reserve(chunk_size):
+                    session_id = self._upload_session_start_helper(
+                        f, chunk_size, dbx_path, sync_event, hasher
+                    )
+
+                session = self._new_upload_session(
+                    session_store,
+                    session_id,
+                    "sequential",
+                    local_path,
+                    dbx_path,
+                    stat,
+                    f.tell(),
+                )
+
+            while stat.st_size - f.tell() > chunk_size:
+                with self._upload_budget.reserve(chunk_size):
+                    self._upload_session_append_helper(
+                        f, session.session_id, chunk_size, dbx_path, sync_event, hasher
+                    )
+
+                self._update_upload_session(session_store, session, f.tell())
+
+            with self._upload_budget.reserve(stat.st_size - f.tell()):
+                return self._upload_session_finish_helper(
+                    f,
+                    session.session_id,
+                    chunk_size,
+                    # Commit info.
+                    dbx_path,
+                    client_modified,
+                    mode,
+                    autorename,
+                    # Commit info end.
+                    sync_event,
+                    hasher,
+                )
+
+    def _upload_concurrent(
+        self,
+        local_path: str,
+        dbx_path: str,
+        stat: os.stat_result,
+        chunk_size: int,
+        max_parallel_chunks: int,
+        client_modified: datetime,
+        mode: files.WriteMode,
+        autorename: bool,
+        sync_event: SyncEvent | None,
+        hasher: _ConcurrentUploadHasher,
+        session: UploadSessionEntry | None,
+        session_store: UploadSessionStore | None,
+    ) -> files.FileMetadata:
+        """
+        Uploads a file through a concurrent upload session. All chunks except the last
+        one are appended in parallel. The last chunk closes the session and is therefore
+        only sent once all other chunks have been uploaded.
+
+        :param local_path: Path of local file to upload.
+        :param dbx_path: Path to save file on Dropbox.
+        :param stat: Stat result of the file.
+        :param chunk_size: Size of individual chunks. Must be a multiple of 4 MB.
+        :param max_parallel_chunks: Maximum number of chunks to upload in parallel.
+        :param client_modified: Modification time of the file to commit.
+        :param mode: Write mode to commit.
+        :param autorename: Whether to autorename the file on conflicts.
+        :param sync_event: If given, the sync event will be updated with the number of
+            uploaded bytes.
+        :param hasher: Hasher which will be updated with all uploaded chunks.
+        :param session: Previous session to resume.
+        :param session_store: Store to persist the session state.
+        :returns: Metadata of the uploaded file.
+        """
+        size = stat.st_size
+
+        with open(local_path, "rb", opener=opener_no_symlink) as f:
+
+            if session:
+                self._hash_uploaded_data(f, session.uploaded_bytes, chunk_size, hasher)
+            else:
+                with convert_api_errors(dbx_path=dbx_path):
+                    session_start = self.dbx.files_upload_session_start(
+                        b"", session_type=files.UploadSessionType.concurrent
+                    )
+
+                session = self._new_upload_session(
+                    session_store,
+                    session_start.session_id,
+                    "concurrent",
+                    local_path,
+                    dbx_path,
+                    stat,
+                    0,
+                )
+
+            offsets = list(range(session.uploaded_bytes, size, chunk_size))
+
+            # Chunks which were uploaded beyond the contiguous uploaded range.
+            completed_chunks: dict[int, int] = {}
+            completed = session.uploaded_bytes
+            completed_lock = threading.Lock()
+
+            if sync_event:
+                sync_event.completed = completed
+
+            def upload_chunk(offset: int, close: bool) -> None:
+                nonlocal completed
+
+                n_bytes = self._upload_concurrent_chunk_helper(
+                    f, session.session_id, offset, chunk_size, close, dbx_path, hasher
+                )
+
+                with completed_lock:
+                    completed += n_bytes
+                    completed_chunks[offset] = n_bytes
+
+                    uploaded_bytes = session.uploaded_bytes
+                    while uploaded_bytes in completed_chunks:
+                        uploaded_bytes += completed_chunks.pop(uploaded_bytes)
+
+                    self._update_upload_session(session_store, session, uploaded_bytes)
+
+                    if sync_event:
+                        sync_event.completed = completed
+
+            if offsets:
+                last_offset = offsets.pop()
+
+                with ThreadPoolExecutor(
+                    max_workers=max_parallel_chunks,
+                    thread_name_prefix="maestral-chunk-upload",
+                ) as executor:
+                    futures: list[Future[None]] = [
+                        executor.submit(upload_chunk, offset, False)
+                        for offset in offsets
+                    ]
+
+                    try:
+                        for future in futures:
+                            future.result()
+                    except BaseException:
+                        # Don't start any more chunks when one has failed.
+                        for future in futures:
+                            future.cancel()
+                        raise
+
+                upload_chunk(last_offset, True)
+
+        cursor = files.UploadSessionCursor(session_id=session.session_id, offset=size)
+        commit = files.CommitInfo(
+            path=dbx_path,
+            client_modified=client_modified,
+            autorename=autorename,
+            mode=mode,
+        )
+
+        with convert_api_errors(dbx_path=dbx_path):
+            md = self.dbx.files_upload_session_finish(b"", cursor, commit)
+
         if sync_event:
             sync_event.completed = sync_event.size
 
         return md
 
+    @_retry_on_error(DropboxConnectionError, MAX_TRANSFER_RETRIES, backoff=2)
+    @_retry_on_error(DataCorruptionError, MAX_TRANSFER_RETRIES)
+    def _upload_concurrent_chunk_helper(
+        self,
+        f: BinaryIO,
+        session_id: str,
+        offset: int,
+        chunk_size: int,
+        close: bool,
+        dbx_path: str,
+        hasher: _ConcurrentUploadHasher,
+    ) -> int:
+        with self._upload_budget.reserve(chunk_size):
+            data = os.pread(f.fileno(), chunk_size, offset)
+            cursor = files.UploadSessionCursor(session_id=session_id, offset=offset)
+
+            with convert_api_errors(dbx_path=dbx_path):
+                self.dbx.files_upload_session_append_v2(
+                    data, cursor, close=close, content_hash=get_hash(data)
+                )
+
+            hasher.update(offset, data)
+
+        return len(data)
+
+    def upload_batch(
+        self,
+        entries: Sequence[tuple[str, str, WriteMode, str | None]],
+        autorename: bool = False,
+        sync_events: Sequence[SyncEvent | None] | None = None,
+        max_parallel_uploads: int = 8,
+        batch_size: int = 900,
+    ) -> list[FileMetadata | MaestralApiError]:
+        """
+        Uploads multiple small local files to Dropbox. The content of each file is
+        uploaded in a single request through its own upload session. Sessions are then
+        committed in batches with a single call to ``upload_session/finish_batch_v2``.
+        This avoids taking a lock on the Dropbox namespace for each file and is
+        therefore much faster than uploading many small files with :meth:`upload`.
+        Large files should be uploaded with :meth:`upload` instead.
+
+        :param entries: List of local paths, Dropbox paths, write modes and revs to
+            match for :class:`core.WriteMode.Update`. See :meth:`upload` for the
+            meaning of the write modes.
+        :param autorename: If there's a conflict, as determined by the write mode, have
+            the Dropbox server try to autorename the file to avoid conflict.
+        :param sync_events: If given, sync events for each entry which will be updated
+            with the number of uploaded bytes.
+        :param max_parallel_uploads: Maximum number of files to upload in parallel.
+        :param batch_size: Number of files to commit in each batch. Dropbox allows
+            batches of up to 1,000 files. Larger values will be capped automatically.
+        :returns: List of Metadata for uploaded files or MaestralApiErrors for failures.
+            Results will be in the same order as the original input. The content hash
+            of each uploaded file is verified against the content hash of the uploaded
+            data.
+        """
+        batch_size = clamp(batch_size, 1, 1000)
+        events = sync_events or [None] * len(entries)
+
+        result_list: list[FileMetadata | MaestralApiError] = []
+
+        def upload_content(
+            i: int,
+        ) -> tuple[str, int, str, datetime] | MaestralApiError:
+            local_path, dbx_path, _, _ = entries[i]
+            try:
+                return self._upload_batch_entry_helper(local_path, dbx_path, events[i])
+            except MaestralApiError as exc:
+                return exc
+
+        with ThreadPoolExecutor(
+            max_workers=max_parallel_uploads, thread_name_prefix="maestral-batch-upload"
+        ) as executor:
+            for indices in chunks(list(range(len(entries))), n=batch_size):
+                uploads = list(executor.map(upload_content, indices))
+
+                args: list[files.UploadSessionFinishArg] = []
+                committed: list[int] = []
+                uploaded_hashes: dict[int, str] = {}
+
+                for i, upload in zip(indices, uploads):
+                    if isinstance(upload, MaestralApiError):
+                        continue
+
+                    _, dbx_path, write_mode, update_rev = entries[i]
+                    session_id, size, uploaded_hashes[i], client_modified = upload
+
+                    cursor = files.UploadSessionCursor(
+                        session_id=session_id, offset=size
+                    )
+                    commit = files.CommitInfo(
+                        path=dbx_path,
+                        client_modified=client_modified,
+                        autorename=autorename,
+                        mode=self._get_dbx_write_mode(write_mode, update_rev),
+                    )
+                    args.append(files.UploadSessionFinishArg(cursor, commit))
+                    committed.append(i)
+
+                batch_entries = []
+
+                if args:
+                    with convert_api_errors():
+                        res = self.dbx.files_upload_session_finish_batch_v2(args)
+                    batch_entries = res.entries
+
+                results: dict[int, FileMetadata | MaestralApiError] = {}
+
+                for i, entry in zip(committed, batch_entries):
+                    local_path, dbx_path, _, _ = entries[i]
+
+                    if entry.is_success():
+                        md = convert_metadata(entry.get_success())
+                        if md.content_hash != uploaded_hashes[i]:
+                            results[i] = DataCorruptionError(
+                                "Data corrupted",
+                                "Please retry upload.",
+                                dbx_path=dbx_path,
+                                local_path=local_path,
+                            )
+                        else:
+                            results[i] = md
+                    elif entry.is_failure():
+                        exc = exceptions.ApiError(
+                            error=entry.get_failure(),
+                            user_message_text="",
+                            user_message_locale="",
+                            request_id="",
+                        )
+                        results[i] = dropbox_to_maestral_error(
+                            exc, dbx_path=dbx_path, local_path=local_path
+                        )
+
+                for i, upload in zip(indices, uploads):
+                    if isinstance(upload, MaestralApiError):
+                        result_list.append(upload)
+                    else:
+                        result_list.append(results[i])
+
+        return result_list
+
+    @_retry_on_error(DataCorruptionError, MAX_TRANSFER_RETRIES)
+    def _upload_batch_entry_helper(
+        self, local_path: str, dbx_path: str, sync_event: SyncEvent | None
+    ) -> tuple[str, int, str, datetime]:
+        with convert_api_errors(dbx_path=dbx_path, local_path=local_path):
+            with open(local_path, "rb", opener=opener_no_symlink) as f:
+                stat = os.fstat(f.fileno())
+
+                with self._upload_budget.reserve(stat.st_size):
+                    data = f.read()
+                    content_hash = get_hash(data)
+
+                    session_start = self.dbx.files_upload_session_start(
+                        data, close=True, content_hash=content_hash
+                    )
+
+        if sync_event:
+            sync_event.completed = len(data)
+
+        # Dropbox SDK takes naive datetime in UTC
+        mtime_dt = datetime.utcfromtimestamp(stat.st_mtime)
+
+        return session_start.session_id, len(data), content_hash, mtime_dt
+
     def remove(
         self, dbx_path: str, parent_rev: str | None = None
     ) -> FileMetadata | FolderMetadata:
@@ -999,6 +2055,10 @@ class DropboxClient:
                             "Dropbox. Please try again later."
                         )
                         raise SyncError(title, text)
+                    else:
+                        title = "Could not delete items"
+                        text = "The batch job failed unexpectedly."
+                        raise SyncError(title, text)
 
         for i, entry in enumerate(res_entries):
             if entry.is_success():
@@ -1074,53 +2134,60 @@ class DropboxClient:
         """
         batch_size = clamp(batch_size, 1, 1000)
 
-        entries = []
         result_list: list[FolderMetadata | MaestralApiError] = []
 
-        with convert_api_errors():
-            # Up two ~ 1,000 entries allowed per batch:
-            # https://www.dropbox.com/developers/reference/data-ingress-guide
-            for chunk in chunks(dbx_paths, n=batch_size):
+        # Up two ~ 1,000 entries allowed per batch:
+        # https://www.dropbox.com/developers/reference/data-ingress-guide
+        for chunk in chunks(dbx_paths, n=batch_size):
+            with convert_api_errors():
                 res = self.dbx.files_create_folder_batch(chunk, autorename, force_async)
-                if res.is_complete():
-                    batch_res = res.get_complete()
-                    entries.extend(batch_res.entries)
-                elif res.is_async_job_id():
-                    async_job_id = res.get_async_job_id()
 
-                    time.sleep(0.5)
+            if res.is_complete():
+                batch_res = res.get_complete()
+
+            elif res.is_async_job_id():
+                async_job_id = res.get_async_job_id()
+
+                time.sleep(0.5)
+
+                with convert_api_errors():
                     res = self.dbx.files_create_folder_batch_check(async_job_id)
 
-                    check_interval = round(len(chunk) / 100, 1)
+                check_interval = round(len(chunk) / 100, 1)
 
-                    while res.is_in_progress():
-                        time.sleep(check_interval)
+                while res.is_in_progress():
+                    time.sleep(check_interval)
+                    with convert_api_errors():
                         res = self.dbx.files_create_folder_batch_check(async_job_id)
 
-                    if res.is_complete():
-                        batch_res = res.get_complete()
-                        entries.extend(batch_res.entries)
+                if res.is_complete():
+                    batch_res = res.get_complete()
 
-                    elif res.is_failed():
-                        error = res.get_failed()
-                        if error.is_too_many_files():
-                            res_list = self.make_dir_batch(
-                                chunk, round(batch_size / 2), autorename, force_async
-                            )
-                            result_list.extend(res_list)
+                elif res.is_failed():
+                    error = res.get_failed()
+                    if error.is_too_many_files() and len(chunk) > 1:
+                        res_list = self.make_dir_batch(
+                            chunk, round(len(chunk) / 2), autorename, force_async
+                        )
+                        result_list.extend(res_list)
+                        continue
+                    else:
+                        title = "Could not create folders"
+                        text = "The batch job failed unexpectedly."
+                        raise SyncError(title, text)
 
-        for i, entry in enumerate(entries):
-            if entry.is_success():
-                result_list.append(convert_metadata(entry.get_success().metadata))
-            elif entry.is_failure():
-                exc = exceptions.ApiError(
-                    error=entry.get_failure(),
-                    user_message_text="",
-                    user_message_locale="",
-                    request_id="",
-                )
-                sync_err = dropbox_to_maestral_error(exc, dbx_path=dbx_paths[i])
-                result_list.append(sync_err)
+            for dbx_path, entry in zip(chunk, batch_res.entries):
+                if entry.is_success():
+                    result_list.append(convert_metadata(entry.get_success().metadata))
+                elif entry.is_failure():
+                    exc = exceptions.ApiError(
+                        error=entry.get_failure(),
+                        user_message_text="",
+                        user_message_locale="",
+                        request_id="",
+                    )
+                    sync_err = dropbox_to_maestral_error(exc, dbx_path=dbx_path)
+                    result_list.append(sync_err)
 
         return result_list
 
@@ -39,6 +39,11 @@ DEFAULTS_CONFIG: _DefaultsType = {
         "keep_history": 60 * 60 * 24 * 7,  # default: one week
         "upload": True,  # if download sync is enabled
         "download": True,  # if upload sync is enabled
+        "scan_threads": 4,  # number of threads to use when scanning local folders
+        "hash_processes": 0,  # number of processes for hashing, 0 to use threads
+        "upload_chunk_threads": 4,  # number of chunks of a file to upload in parallel
+        "download_segments": 4,  # number of segments of a file to download in parallel
+        "segmented_download_min_size": 64 * 2**20,  # min size for segmented download
     },
 }
 
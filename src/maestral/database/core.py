@@ -4,20 +4,205 @@ This model defines our core SQLite database interface.
 
 from __future__ import annotations
 
-from typing import Any
+from contextlib import contextmanager
+from queue import Queue, Empty
+from threading import Lock
+from typing import Any, Iterable, Iterator, Sequence
 
 import sqlite3
 
 
+CACHE_SIZE = 8 * 2**20
+"""Maximum size of the page cache of each connection in bytes."""
+
+MMAP_SIZE = 64 * 2**20
+"""Maximum size of the database file which is memory-mapped in bytes."""
+
+
+def configure_connection(connection: sqlite3.Connection) -> None:
+    """
+    Configures a connection for concurrent access from multiple connections. This
+    enables write-ahead logging, which allows readers to proceed concurrently with a
+    writer, and relaxes syncing to disk to once per checkpoint instead of once per
+    transaction. Increases the page cache and enables memory-mapped I/O.
+
+    :param connection: Connection to configure.
+    """
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.execute(f"PRAGMA cache_size = -{CACHE_SIZE // 1024}")
+    connection.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+
+
+class ReadConnectionPool:
+    """
+    A pool of read-only connections to an SQLite database file. Connections are opened
+    on demand up to the given size. In write-ahead logging mode, readers only see
+    committed changes and do not block or wait for the writer.
+
+    :param path: Path to the database file.
+    :param size: Maximum number of connections.
+    """
+
+    def __init__(self, path: str, size: int = 4) -> None:
+        self.path = path
+        self.size = size
+
+        self._lock = Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._idle: Queue[sqlite3.Connection] = Queue()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        A context manager which provides a connection from the pool. Blocks until a
+        connection becomes available if all connections are in use.
+        """
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self) -> None:
+        """Closes all connections."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+            while not self._idle.empty():
+                self._idle.get_nowait()
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+
+        with self._lock:
+            if len(self._connections) < self.size:
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                connection.row_factory = sqlite3.Row
+                configure_connection(connection)
+                connection.execute("PRAGMA query_only = ON")
+                self._connections.append(connection)
+                return connection
+
+        return self._idle.get()
+
+
 class Database:
-    """Wrapper around sqlite3.Connection with atomic transactions."""
+    """
+    Wrapper around sqlite3.Connection with atomic transactions.
 
-    def __init__(self, connection: sqlite3.Connection) -> None:
+    By default, each statement is committed on its own. Use :meth:`transaction` or
+    :meth:`begin_transaction` and :meth:`end_transaction` to group multiple statements
+    into a single transaction which is committed only once. Transactions may be
+    nested, only the outermost transaction will be committed. Nested transactions use
+    savepoints and can be rolled back on their own. This class does not synchronise
+    access from multiple threads, callers need to take care of this.
+
+    Statements which only read committed data can be executed with :meth:`read`. They
+    use a pool of separate read-only connections which can be used concurrently from
+    multiple threads.
+
+    :param connection: Connection to use for all writes.
+    :param read_pool_size: Number of read-only connections for :meth:`read`. If zero
+        or for in-memory databases, reads use the main connection instead.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, read_pool_size: int = 0) -> None:
         connection.row_factory = sqlite3.Row
+        configure_connection(connection)
         self.connection = connection
+        self._transaction_depth = 0
+
+        path = connection.execute("PRAGMA database_list").fetchone()["file"]
+
+        self.read_pool: ReadConnectionPool | None = None
+
+        if read_pool_size > 0 and path:
+            self.read_pool = ReadConnectionPool(path, read_pool_size)
+
+    @property
+    def in_transaction(self) -> bool:
+        """Whether a transaction started with :meth:`begin_transaction` is active."""
+        return self._transaction_depth > 0
+
+    def begin_transaction(self) -> None:
+        """
+        Begins a transaction. Any following statements will not be committed until the
+        outermost transaction is ended with :meth:`end_transaction`.
+        """
+        if self._transaction_depth > 0:
+            # A savepoint outside an SQLite transaction would start a new transaction
+            # which is committed when the savepoint is released.
+            if not self.connection.in_transaction:
+                self.connection.execute("BEGIN")
+            self.connection.execute(f"SAVEPOINT sp{self._transaction_depth}")
+
+        self._transaction_depth += 1
+
+    def end_transaction(self, commit: bool = True) -> None:
+        """
+        Ends a transaction. If this is the outermost transaction, all statements
+        executed since it began are either committed or rolled back. Otherwise, they
+        are kept or rolled back until the outer transaction is ended.
+
+        :param commit: Whether to commit or roll back changes.
+        """
+        if self._transaction_depth == 0:
+            raise RuntimeError("No transaction in progress")
+
+        self._transaction_depth -= 1
+
+        if self._transaction_depth > 0:
+            savepoint = f"sp{self._transaction_depth}"
+            if not commit:
+                self.connection.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+            self.connection.execute(f"RELEASE SAVEPOINT {savepoint}")
+        elif commit:
+            self.connection.commit()
+        else:
+            self.connection.rollback()
+
+    def commit(self) -> None:
+        """
+        Commits all statements executed since the outermost transaction began or was
+        last committed. The transaction remains active. This allows long-running
+        transactions to make their changes durable and visible to other connections
+        at regular intervals.
+
+        :raises RuntimeError: if no transaction or a nested transaction is active.
+        """
+        if self._transaction_depth == 0:
+            raise RuntimeError("No transaction in progress")
+        if self._transaction_depth > 1:
+            raise RuntimeError("Cannot commit during a nested transaction")
+
+        self.connection.commit()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        A context manager to group all statements executed within into a single
+        transaction. Changes are committed when exiting the outermost context or rolled
+        back if an exception is raised.
+        """
+        self.begin_transaction()
+        try:
+            yield
+        except BaseException:
+            self.end_transaction(commit=False)
+            raise
+        else:
+            self.end_transaction()
 
     def close(self) -> None:
-        """Closes the SQL connection."""
+        """Closes the SQL connection and any read-only connections."""
+        if self.read_pool:
+            self.read_pool.close()
         self.connection.close()
 
     def execute(self, sql: str, *args: Any) -> sqlite3.Cursor:
@@ -28,12 +213,50 @@ class Database:
         :param args: Parameters to substitute for placeholders in SQL statement.
         :returns: The created cursor.
         """
+        if self.in_transaction:
+            return self.connection.execute(sql, args)
+
         with self.connection:
             return self.connection.execute(sql, args)
 
+    def read(self, sql: str, *args: Any) -> list[sqlite3.Row]:
+        """
+        Executes the given SQL statement on a read-only connection from the pool and
+        returns all resulting rows. This only sees committed changes and does not
+        require synchronisation with writes. If there is no pool, the statement is
+        executed on the main connection and callers need to synchronise access as for
+        any other statement.
+
+        :param sql: SQL statement to execute.
+        :param args: Parameters to substitute for placeholders in SQL statement.
+        :returns: The resulting rows.
+        """
+        if not self.read_pool:
+            return self.execute(sql, *args).fetchall()
+
+        with self.read_pool.connection() as connection:
+            return connection.execute(sql, args).fetchall()
+
+    def executemany(self, sql: str, args: Iterable[Sequence[Any]]) -> sqlite3.Cursor:
+        """
+        Creates a cursor and executes the given SQL statement once for each sequence of
+        parameters in a single transaction.
+
+        :param sql: SQL statement to execute.
+        :param args: Iterable over parameter sequences to substitute for placeholders in
+            the SQL statement.
+        :returns: The created cursor.
+        """
+        if self.in_transaction:
+            return self.connection.executemany(sql, args)
+
+        with self.connection:
+            return self.connection.executemany(sql, args)
+
     def executescript(self, script: str) -> None:
         """
-        Creates a cursor and executes the given SQL script.
+        Creates a cursor and executes the given SQL script. Note that this commits any
+        pending changes from a transaction before executing the script.
 
         :param script: SQL script to execute.
         :returns: The created cursor.
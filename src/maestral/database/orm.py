@@ -9,8 +9,23 @@ memory is constrained.
 
 from __future__ import annotations
 
+import sqlite3
+from contextlib import contextmanager
 from weakref import WeakValueDictionary
-from typing import Any, Generator, TypeVar, Generic, Union, Optional, cast, overload
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Sequence,
+    TypeVar,
+    Generic,
+    Union,
+    Optional,
+    cast,
+    overload,
+)
 
 from .core import Database
 from .query import Query
@@ -22,6 +37,10 @@ ST = TypeVar("ST")
 M = TypeVar("M", bound="Model")
 
 
+# SQLite versions before 3.32 allow at most 999 parameters per statement.
+MAX_QUERY_PARAMETERS = 900
+
+
 __all__ = [
     "Column",
     "NonNullColumn",
@@ -229,13 +248,16 @@ class Manager(Generic[M]):
 
         self._cache: WeakValueDictionary[SQLSafeType, M] = WeakValueDictionary()
 
-        # Precompute often-used SQL query strings.
-        self._columns = model.__columns__
+        # Precompute often-used SQL query strings. Columns are selected explicitly
+        # instead of with "SELECT *" so that their order matches self._columns.
+        self._columns = list(model.__columns__)
 
         column_names = [col.name for col in self._columns]
         column_names_str = ", ".join(column_names)
         column_refs = ", ".join(["?"] * len(self._columns))
 
+        self._sql_select_template = f"SELECT {column_names_str} FROM {self.table_name}"
+
         self._sql_insert_template = "INSERT INTO {} ({}) VALUES ({})".format(
             self.table_name, column_names_str, column_refs
         )
@@ -248,6 +270,23 @@ class Manager(Generic[M]):
             self.pk_column.name,
         )
 
+        # Upserts require SQLite 3.24 or later. Fall back to replacing rows otherwise,
+        # which is equivalent for tables without foreign keys or triggers.
+        if sqlite3.sqlite_version_info >= (3, 24, 0):
+            set_expressions = [f"{name} = excluded.{name}" for name in column_names]
+            self._sql_upsert_template = "{} ON CONFLICT ({}) DO UPDATE SET {}".format(
+                self._sql_insert_template,
+                self.pk_column.name,
+                ", ".join(set_expressions),
+            )
+        else:
+            self._sql_upsert_template = self._sql_insert_template.replace(
+                "INSERT", "INSERT OR REPLACE", 1
+            )
+
+        self._pk_index = self._columns.index(self.pk_column)
+        self._create_item = self._compile_row_factory()
+
         # Create table if required.
         if not self._has_table():
             self.create_table()
@@ -270,29 +309,56 @@ class Manager(Generic[M]):
         """Clears our cache."""
         self._cache.clear()
 
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        A context manager to group all changes made within into a single database
+        transaction, see :meth:`Database.transaction`. The cache is cleared if changes
+        are rolled back.
+        """
+        try:
+            with self.db.transaction():
+                yield
+        except BaseException:
+            self.clear_cache()
+            raise
+
     def delete(self, query: Query) -> None:
         clause, args = query.clause()
         sql = f"DELETE FROM {self.table_name} WHERE {clause}"
         self.db.execute(sql, *args)
         self.clear_cache()
 
-    def select(self, query: Query) -> list[M]:
+    def select(self, query: Query, committed_only: bool = False) -> list[M]:
+        """
+        Selects all model objects / rows matching the given query.
+
+        :param query: Query to match.
+        :param committed_only: If ``True``, read only committed rows on a read-only
+            connection, see :meth:`Database.read`. Such model objects are not cached
+            since they may be outdated by uncommitted changes.
+        :returns: List of model objects.
+        """
         clause, args = query.clause()
-        sql = f"SELECT * FROM {self.table_name} WHERE {clause}"
-        result = self.db.execute(sql, *args)
+        sql = f"{self._sql_select_template} WHERE {clause}"
 
-        return [self._item_from_kwargs(**row) for row in result.fetchall()]
+        if committed_only:
+            rows = self.db.read(sql, *args)
+            return [self._create_item(row) for row in rows]
+
+        result = self.db.execute(sql, *args)
+        return [self._item_from_row(row) for row in result.fetchall()]
 
     def select_iter(
         self, query: Query, size: int = 1000
     ) -> Generator[list[M], Any, None]:
         clause, args = query.clause()
-        sql = f"SELECT * FROM {self.table_name} WHERE {clause}"
+        sql = f"{self._sql_select_template} WHERE {clause}"
         result = self.db.execute(sql, *args)
         rows = result.fetchmany(size)
 
         while len(rows) > 0:
-            yield [self._item_from_kwargs(**row) for row in rows]
+            yield [self._item_from_row(row) for row in rows]
             rows = result.fetchmany(size)
 
     def select_sql(self, sql: str, *args: Any) -> list[M]:
@@ -303,8 +369,8 @@ class Manager(Generic[M]):
         :param args: Parameters to substitute for placeholders in SQL statement.
         :returns: List of model objects from the query.
         """
-        result = self.db.execute(f"SELECT * FROM {self.table_name} {sql}", *args)
-        return [self._item_from_kwargs(**row) for row in result.fetchall()]
+        result = self.db.execute(f"{self._sql_select_template} {sql}", *args)
+        return [self._item_from_row(row) for row in result.fetchall()]
 
     def delete_primary_key(self, primary_key: Any) -> None:
         """
@@ -321,22 +387,30 @@ class Manager(Generic[M]):
         except KeyError:
             pass
 
-    def get(self, primary_key: Any) -> M | None:
+    def get(self, primary_key: Any, committed_only: bool = False) -> M | None:
         """
         Gets a model object from database by its primary key. This will return a cached
         value if available and None if no row with the primary key exists.
 
         :param primary_key: Primary key for row.
+        :param committed_only: If ``True``, read only the committed row on a read-only
+            connection, see :meth:`Database.read`. The cache is not used since it may
+            contain uncommitted changes.
         :returns: Model object representing the row.
         """
         pk_sql = self.pk_column.py_to_sql(primary_key)
 
+        if committed_only:
+            sql = f"{self._sql_select_template} WHERE {self.pk_column.name} = ?"
+            rows = self.db.read(sql, pk_sql)
+            return self._create_item(rows[0]) if rows else None
+
         try:
             return self._cache[pk_sql]
         except KeyError:
             pass
 
-        sql = f"SELECT * FROM {self.table_name} WHERE {self.pk_column.name} = ?"
+        sql = f"{self._sql_select_template} WHERE {self.pk_column.name} = ?"
         result = self.db.execute(sql, pk_sql)
 
         row = result.fetchone()
@@ -344,7 +418,45 @@ class Manager(Generic[M]):
         if not row:
             return None
 
-        return self._item_from_kwargs(**row)
+        return self._item_from_row(row)
+
+    def get_many(self, primary_keys: Iterable[Any]) -> dict[Any, M]:
+        """
+        Gets multiple model objects from database by their primary keys. Cached values
+        are used where available, all other rows are fetched with one query per
+        :const:`MAX_QUERY_PARAMETERS` primary keys and added to the cache. Note that
+        the cache only keeps weak references, callers should keep the returned mapping
+        for as long as they rely on cached lookups with :meth:`get`.
+
+        :param primary_keys: Primary keys for rows.
+        :returns: Mapping of primary keys to model objects. Primary keys without a row
+            are omitted.
+        """
+        results: dict[Any, M] = {}
+        missing: dict[SQLSafeType, Any] = {}
+
+        for primary_key in primary_keys:
+            pk_sql = self.pk_column.py_to_sql(primary_key)
+
+            try:
+                results[primary_key] = self._cache[pk_sql]
+            except KeyError:
+                missing[pk_sql] = primary_key
+
+        pks_sql = list(missing)
+
+        for i in range(0, len(pks_sql), MAX_QUERY_PARAMETERS):
+            chunk = pks_sql[i : i + MAX_QUERY_PARAMETERS]
+            placeholders = ", ".join(["?"] * len(chunk))
+            sql = (
+                f"{self._sql_select_template} "
+                f"WHERE {self.pk_column.name} IN ({placeholders})"
+            )
+
+            for row in self.db.execute(sql, *chunk).fetchall():
+                results[missing[row[self._pk_index]]] = self._item_from_row(row)
+
+        return results
 
     def has(self, primary_key: Any) -> bool:
         """
@@ -405,10 +517,67 @@ class Manager(Generic[M]):
         else:
             self.save(obj)
 
-    def count(self) -> int:
-        """Returns the number of rows in the table."""
-        res = self.db.execute(f"SELECT COUNT(*) FROM {self.table_name};")
-        counts = res.fetchone()
+    def upsert_many(self, objs: Iterable[M]) -> None:
+        """
+        Inserts or updates multiple model objects in the database table. This uses a
+        single statement per object instead of checking first if the row exists, as
+        :meth:`update` does, and executes all statements in a single transaction.
+
+        :param objs: Model objects to insert or update. Primary keys are required.
+        """
+        pks: list[SQLSafeType] = []
+        rows: list[list[Any]] = []
+
+        for obj in objs:
+            pk_sql = self._get_primary_key(obj)
+
+            if pk_sql is None:
+                raise ValueError("Primary key is required to update row")
+
+            pks.append(pk_sql)
+            rows.append(
+                [col.py_to_sql(getattr(obj, col.name)) for col in self._columns]
+            )
+
+        self.db.executemany(self._sql_upsert_template, rows)
+
+        for pk_sql in pks:
+            try:
+                del self._cache[pk_sql]
+            except KeyError:
+                pass
+
+    def delete_many(self, primary_keys: Iterable[Any]) -> None:
+        """
+        Deletes multiple model objects / rows from the database by primary key in a
+        single transaction.
+
+        :param primary_keys: Primary keys of rows to delete.
+        """
+        pks = [self.pk_column.py_to_sql(pk) for pk in primary_keys]
+        sql = f"DELETE FROM {self.table_name} WHERE {self.pk_column.name} = ?"
+        self.db.executemany(sql, [(pk,) for pk in pks])
+
+        for pk_sql in pks:
+            try:
+                del self._cache[pk_sql]
+            except KeyError:
+                pass
+
+    def count(self, committed_only: bool = False) -> int:
+        """
+        Returns the number of rows in the table.
+
+        :param committed_only: If ``True``, count only committed rows on a read-only
+            connection, see :meth:`Database.read`.
+        """
+        sql = f"SELECT COUNT(*) FROM {self.table_name};"
+
+        if committed_only:
+            counts = self.db.read(sql)[0]
+        else:
+            counts = self.db.execute(sql).fetchone()
+
         return cast(int, counts[0])
 
     def clear(self) -> None:
@@ -433,24 +602,56 @@ class Manager(Generic[M]):
         pk_py = getattr(obj, self.pk_column.name)
         return self.pk_column.py_to_sql(pk_py)
 
-    def _item_from_kwargs(self, **kwargs: Any) -> M:
+    def _item_from_row(self, row: Sequence[Any]) -> M:
         """
-        Create a model object from SQL column values
+        Create a model object from a database row and add it to our cache.
 
-        :param kwargs: Column values.
+        :param row: Column values in the order of :attr:`_columns`.
         :returns: Model object.
         """
-        # Convert any types as appropriate.
-        for key, value in kwargs.items():
-            col = getattr(self.model, key)
-            kwargs[key] = col.sql_to_py(value)
+        obj = self._create_item(row)
+        self._cache[row[self._pk_index]] = obj
+        return obj
 
-        obj = self.model(**kwargs)
+    def _compile_row_factory(self) -> Callable[[Sequence[Any]], M]:
+        """
+        Builds a function which creates a model object from a database row without
+        caching it. Converters and attribute setters for each column are looked up only
+        once, and :meth:`Model.__init__` with its validation of keyword arguments is
+        bypassed. Model objects are therefore only valid if the database row is.
 
-        pk_sql = self._get_primary_key(obj)
-        self._cache[pk_sql] = obj
+        :returns: Function which takes column values in the order of
+            :attr:`_columns` and returns a model object.
+        """
+        new = self.model.__new__
+        model = self.model
+        fields = []
 
-        return obj
+        for col in self._columns:
+            set_value = getattr(model, col.private_name).__set__
+
+            if type(col.type).sql_to_py is SqlType.sql_to_py:
+                convert = None  # No conversion required.
+            else:
+                convert = col.type.sql_to_py
+
+            fields.append((set_value, convert, isinstance(col, NonNullColumn)))
+
+        def row_factory(row: Sequence[Any]) -> M:
+            obj = new(model)
+
+            for (set_value, convert, non_null), value in zip(fields, row):
+                if value is None:
+                    if non_null:
+                        raise ValueError("Unexpected value None / NULL")
+                elif convert:
+                    value = convert(value)
+
+                set_value(obj, value)
+
+            return obj
+
+        return row_factory
 
 
 class ModelBase(type):
@@ -470,10 +671,9 @@ class ModelBase(type):
         # Add __columns__ attribute to namespace.
         namespace["__columns__"] = frozenset(columns)
 
-        # Add slots to namespace if we have declared columns. Otherwise, don't set slots
-        # because this prevents subclasses from having weakrefs.
-        if slots:
-            namespace["__slots__"] = slots
+        # Store column values in slots instead of an instance dictionary. The Model base
+        # class provides a slot for weakrefs.
+        namespace.setdefault("__slots__", slots)
 
         return super().__new__(mcs, cls_name, bases, namespace, **kwargs)
 
@@ -490,6 +690,8 @@ class Model(metaclass=ModelBase):
     to use. The ``__columns__`` attribute will be populated automatically for you.
     """
 
+    __slots__ = ("__weakref__",)
+
     __tablename__: str
     """The name of the database table"""
 
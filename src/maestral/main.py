@@ -614,7 +614,9 @@ class Maestral:
         if not node:
             # Check if the path is in our index. If yes, it is fully synced, otherwise
             # it is unwatched.
-            if dbx_path_lower == "/" or self.sync.get_local_rev(dbx_path_lower):
+            if dbx_path_lower == "/" or self.sync.get_local_rev(
+                dbx_path_lower, committed_only=True
+            ):
                 return FileStatus.Synced.value
             return FileStatus.Unwatched.value
 
@@ -1430,9 +1432,11 @@ class Maestral:
 
     def shutdown_daemon(self) -> None:
         """
-        Stop syncing and notify anyone monitoring ``shutdown_future`` that we are done.
+        Stop syncing, release all worker threads and notify anyone monitoring
+        ``shutdown_future`` that we are done.
         """
         self.stop_sync()
+        self.sync.close()
 
         if self.shutdown_future and self._loop and self._loop.is_running():
             self._loop.call_soon_threadsafe(self.shutdown_future.set_result, True)
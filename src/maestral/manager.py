@@ -825,6 +825,7 @@ class SyncManager:
     def __del__(self) -> None:
         try:
             self.stop()
+            self.sync.close()
             self._connection_helper_running = False
         except Exception:
             pass
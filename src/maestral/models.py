@@ -11,7 +11,7 @@ from __future__ import annotations
 import os
 import time
 import enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Mapping
 
 # external imports
 from watchdog.events import (
@@ -41,6 +41,8 @@ __all__ = [
     "SyncEvent",
     "IndexEntry",
     "HashCacheEntry",
+    "FolderSnapshotEntry",
+    "UploadSessionEntry",
     "SyncErrorEntry",
 ]
 
@@ -269,15 +271,30 @@ class SyncEvent(Model):
         return f"<{self.__class__.__name__}({attr_str})>"
 
     @classmethod
-    def from_metadata(cls, md: Metadata, sync_engine: SyncEngine) -> SyncEvent:
+    def from_metadata(
+        cls,
+        md: Metadata,
+        sync_engine: SyncEngine,
+        index_entries: Mapping[str, IndexEntry] | None = None,
+    ) -> SyncEvent:
         """
         Initializes a SyncEvent from the given Dropbox metadata.
 
         :param md: Dropbox Metadata.
         :param sync_engine: SyncEngine instance.
+        :param index_entries: Prefetched index entries, as returned by
+            :meth:`maestral.sync.SyncEngine.get_index_entries`. If given, items which
+            are missing from the mapping are assumed not to be in the index.
         :returns: An instance of this class with attributes populated from the given
             Dropbox Metadata.
         """
+
+        def get_local_rev() -> str | None:
+            if index_entries is None:
+                return sync_engine.get_local_rev(md.path_lower)
+            index_entry = index_entries.get(md.path_lower)
+            return index_entry.rev if index_entry else None
+
         if isinstance(md, DeletedMetadata):
             # there is currently no API call to determine who deleted a file or folder
             change_type = ChangeType.Removed
@@ -289,7 +306,7 @@ class SyncEvent(Model):
             dbx_id = None
             change_dbid = None
 
-            local_rev = sync_engine.get_local_rev(md.path_lower)
+            local_rev = get_local_rev()
             if local_rev == "folder":
                 item_type = ItemType.Folder
             elif local_rev is not None:
@@ -317,7 +334,7 @@ class SyncEvent(Model):
             dbx_id = md.id
             size = md.size
             change_time = md.client_modified.timestamp()
-            if sync_engine.get_local_rev(md.path_lower):
+            if get_local_rev():
                 change_type = ChangeType.Modified
             else:
                 change_type = ChangeType.Added
@@ -393,8 +410,16 @@ class SyncEvent(Model):
         except OSError:
             stat = None
 
+        # The content hash of added or modified files is only required if there already
+        # is a file on Dropbox at the same path. It will be computed when needed or
+        # during the upload to avoid reading every file twice.
+        lazy_hash = not event.is_directory and change_type in (
+            ChangeType.Added,
+            ChangeType.Modified,
+        )
+
         try:
-            content_hash = sync_engine.get_local_hash(to_path)
+            content_hash = sync_engine.get_local_hash(to_path, cache_only=lazy_hash)
         except SyncError:
             content_hash = None
 
@@ -528,6 +553,69 @@ class HashCacheEntry(Model):
     """
 
 
+class FolderSnapshotEntry(Model):
+    """
+    Represents the state of a local folder at the time of the last full scan. This is
+    used to skip listing folders whose content did not change between restarts.
+    """
+
+    __tablename__ = "folder_snapshot"
+
+    dbx_path_lower = NonNullColumn(SqlPath(), primary_key=True)
+    """The normalised Dropbox path of the folder."""
+
+    inode = NonNullColumn(SqlLargeInt())
+    """The inode of the folder."""
+
+    mtime = NonNullColumn(SqlFloat())
+    """The mtime of the folder when it was last listed."""
+
+    ctime = NonNullColumn(SqlFloat())
+    """The ctime of the folder when it was last listed."""
+
+    child_count = NonNullColumn(SqlInt())
+    """The number of children which were listed."""
+
+
+class UploadSessionEntry(Model):
+    """
+    Represents an upload session which has not been finished yet. This is used to
+    resume interrupted uploads of large files.
+    """
+
+    __tablename__ = "upload_sessions"
+
+    local_path = NonNullColumn(SqlPath(), primary_key=True)
+    """The local path of the file which is uploaded."""
+
+    dbx_path = NonNullColumn(SqlPath())
+    """The Dropbox path which the file is uploaded to."""
+
+    session_id = NonNullColumn(SqlString())
+    """The ID of the upload session."""
+
+    session_type = NonNullColumn(SqlString())
+    """The type of the upload session, 'sequential' or 'concurrent'."""
+
+    uploaded_bytes = NonNullColumn(SqlLargeInt())
+    """
+    The number of bytes from the start of the file which have been uploaded. Chunks
+    beyond this offset may have been uploaded as well for concurrent sessions.
+    """
+
+    inode = NonNullColumn(SqlLargeInt())
+    """The inode of the file when the session was started."""
+
+    mtime = NonNullColumn(SqlFloat())
+    """The mtime of the file when the session was started."""
+
+    size = NonNullColumn(SqlLargeInt())
+    """The size of the file when the session was started."""
+
+    time_created = NonNullColumn(SqlFloat())
+    """The time when the session was started."""
+
+
 class SyncErrorEntry(Model):
     """Table of sync errors"""
 
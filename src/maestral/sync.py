@@ -14,19 +14,28 @@ import urllib.parse
 import enum
 import sqlite3
 import gc
-from stat import S_ISDIR
+import functools
+import multiprocessing
+from stat import S_ISDIR, S_ISREG
 from pprint import pformat
-from threading import Event, Condition, RLock, current_thread
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Event, Condition, Lock, RLock, current_thread
+from concurrent.futures import (
+    Executor,
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
 from queue import Queue, Empty
 from collections import defaultdict
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from tempfile import NamedTemporaryFile
 from typing import (
     Any,
     Iterator,
     Iterable,
     Collection,
+    Sequence,
     Callable,
     Type,
     TypeVar,
@@ -44,6 +53,7 @@ from watchdog.events import (
     EVENT_TYPE_DELETED,
     EVENT_TYPE_MOVED,
     EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_CLOSED,
 )
 from watchdog.events import (
     DirModifiedEvent,
@@ -77,6 +87,7 @@ from .constants import (
     IS_MACOS,
 )
 from .exceptions import (
+    MaestralApiError,
     SyncError,
     CancelledError,
     NoDropboxDirError,
@@ -97,6 +108,8 @@ from .client import (
 from .models import (
     SyncEvent,
     HashCacheEntry,
+    FolderSnapshotEntry,
+    UploadSessionEntry,
     IndexEntry,
     SyncErrorEntry,
     SyncDirection,
@@ -105,8 +118,9 @@ from .models import (
     ChangeType,
 )
 from .logging import scoped_logger
-from .utils import removeprefix, sanitize_string, exc_info_tuple
+from .utils import removeprefix, sanitize_string, exc_info_tuple, chunks
 from .utils.caches import LRUCache
+from .utils.scheduler import DependencyScheduler
 from .utils.integration import (
     cpu_usage_percent,
     CPU_COUNT,
@@ -115,7 +129,6 @@ from .utils.path import (
     exists,
     isfile,
     isdir,
-    getsize,
     generate_cc_name,
     move,
     delete,
@@ -123,7 +136,9 @@ from .utils.path import (
     is_equal_or_child,
     is_fs_case_sensitive,
     content_hash,
+    content_hashes,
     walk,
+    walk_parallel,
     normalize,
     normalize_case,
     normalize_unicode,
@@ -150,6 +165,19 @@ umask = os.umask(0o22)
 os.umask(umask)
 
 NUM_THREADS = min(64, CPU_COUNT * 4)
+FOLDER_SNAPSHOT_MTIME_MARGIN = 2.0
+PROCESS_HASHING_MIN_FILES = 100
+PROCESS_HASHING_BATCH_SIZE = 50
+DB_READ_POOL_SIZE = 4
+DB_COMMIT_EVENTS = 500
+DB_COMMIT_INTERVAL = 5.0
+REMOVE_BATCH_SIZE = 900
+MAKE_DIR_BATCH_SIZE = 900
+UPLOAD_BATCH_SIZE = 900
+UPLOAD_BATCH_MIN_FILES = 10
+UPLOAD_BATCH_MAX_FILE_SIZE = 4 * 2**20
+PARTIAL_DOWNLOAD_PREFIX = "partial-"
+PARTIAL_DOWNLOAD_MAX_AGE = 60 * 60 * 24 * 2
 
 P = ParamSpec("P")
 T = TypeVar("T")
@@ -188,6 +216,27 @@ class _Ignore:
         )
 
 
+class _IndexDirEntry:
+    """
+    A minimal stand-in for :class:`os.DirEntry` for items which are known from our
+    index instead of from listing their parent folder.
+
+    :param path: Local path of the item.
+    """
+
+    __slots__ = ("path", "name")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.name = osp.basename(path)
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        return os.stat(self.path, follow_symlinks=follow_symlinks)
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return S_ISDIR(self.stat(follow_symlinks=follow_symlinks).st_mode)
+
+
 class FSEventHandler(FileSystemEventHandler):
     """A local file event handler
 
@@ -204,9 +253,12 @@ class FSEventHandler(FileSystemEventHandler):
 
     :cvar float ignore_timeout: Timeout in seconds after which filters for ignored
         events will expire.
+    :cvar float write_settle_time: Time in seconds without new events after which an
+        item is considered to be completely written.
     """
 
     _ignored_events: set[_Ignore]
+    _last_write_times: dict[str, float]
     local_file_event_queue: Queue[FileSystemEvent]
 
     def __init__(
@@ -238,6 +290,10 @@ class FSEventHandler(FileSystemEventHandler):
         self.ignore_timeout = 2.0
         self.local_file_event_queue = Queue()
 
+        self._last_write_times = {}
+        self._write_times_lock = Lock()
+        self.write_settle_time = 0.2
+
     @property
     def enabled(self) -> bool:
         """Whether queuing of events is enabled."""
@@ -312,6 +368,52 @@ class FSEventHandler(FileSystemEventHandler):
             if ignore.ttl and ignore.ttl < now:
                 self._ignored_events.discard(ignore)
 
+    def _update_write_times(self, event: FileSystemEvent) -> None:
+        """
+        Keeps track of the last time that each item was written to. Closing a file
+        after writing, reported on Linux through inotify's IN_CLOSE_WRITE, marks the
+        write as complete.
+
+        :param event: Local file system event.
+        """
+        with self._write_times_lock:
+            if event.event_type == EVENT_TYPE_CLOSED:
+                self._last_write_times.pop(get_dest_path(event), None)
+            elif event.event_type in (
+                EVENT_TYPE_CREATED,
+                EVENT_TYPE_MODIFIED,
+                EVENT_TYPE_MOVED,
+            ):
+                self._last_write_times[get_dest_path(event)] = time.monotonic()
+
+    def time_since_last_write(self, local_path: str) -> float | None:
+        """
+        Returns the time since an item was last written to. Only recent writes, within
+        :attr:`write_settle_time`, are reported.
+
+        :param local_path: Absolute path of the item.
+        :returns: Time in seconds since the last write or None if the item has not been
+            written to recently or the last write is complete.
+        """
+        with self._write_times_lock:
+            last_write_time = self._last_write_times.get(local_path)
+
+        if last_write_time is None:
+            return None
+
+        elapsed = time.monotonic() - last_write_time
+
+        return elapsed if elapsed < self.write_settle_time else None
+
+    def expire_write_times(self) -> None:
+        """Removes all write times which are no longer recent."""
+        now = time.monotonic()
+
+        with self._write_times_lock:
+            for path, last_write_time in list(self._last_write_times.items()):
+                if now - last_write_time >= self.write_settle_time:
+                    del self._last_write_times[path]
+
     def _is_ignored(self, event: FileSystemEvent) -> bool:
         """
         Checks if a file system event should be explicitly ignored because it was
@@ -355,6 +457,8 @@ class FSEventHandler(FileSystemEventHandler):
 
         :param event: Watchdog file event.
         """
+        self._update_write_times(event)
+
         # Ignore events if asked to do so.
         if not self._enabled:
             return
@@ -559,6 +663,23 @@ class SyncEngine:
         # Data structures for internal communication.
         self._cancel_requested = Event()
 
+        # Long-lived worker pools for uploads, downloads and local indexing. Threads
+        # are started on demand and reused across sync cycles.
+        self._upload_pool = ThreadPoolExecutor(
+            max_workers=NUM_THREADS, thread_name_prefix="maestral-upload-pool"
+        )
+        self._download_pool = ThreadPoolExecutor(
+            max_workers=NUM_THREADS, thread_name_prefix="maestral-download-pool"
+        )
+        self._hash_pool = ThreadPoolExecutor(
+            max_workers=NUM_THREADS, thread_name_prefix="maestral-local-indexer"
+        )
+        # Batch jobs distribute their work to the upload pool. Commit them one at a
+        # time since each commit takes a lock on the Dropbox namespace.
+        self._batch_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="maestral-batch-pool"
+        )
+
         # Data structures for user information.
         self.activity = ActivityTree()
 
@@ -571,17 +692,23 @@ class SyncEngine:
             self.local_cursor = 0.0
 
         self._connection = sqlite3.connect(self._db_path, check_same_thread=False)
-        self._db = Database(self._connection)
+        self._db = Database(self._connection, read_pool_size=DB_READ_POOL_SIZE)
         self._index_table = Manager(self._db, IndexEntry)
         self._history_table = Manager(self._db, SyncEvent)
         self._hash_table = Manager(self._db, HashCacheEntry)
+        self._folder_snapshot_table = Manager(self._db, FolderSnapshotEntry)
+        self._upload_sessions_table = Manager(self._db, UploadSessionEntry)
         self._sync_errors_table = Manager(self._db, SyncErrorEntry)
 
+        # Progress of the active transaction, see _database_transaction.
+        self._db_pending_events = 0
+        self._db_last_commit = 0.0
+
         # Caches.
         self._case_conversion_cache = LRUCache(capacity=5000)
 
         # Clean our file cache-
-        self.clean_cache_dir(raise_error=False)
+        self.clean_cache_dir(raise_error=False, keep_partial_downloads=True)
 
     def reload_cached_config(self) -> None:
         """
@@ -598,6 +725,13 @@ class SyncEngine:
             self._conf.get("sync", "max_cpu_percent") * CPU_COUNT
         )
         self._local_cursor: float = self._state.get("sync", "lastsync")
+        self._scan_threads: int = self._conf.get("sync", "scan_threads")
+        self._hash_processes: int = self._conf.get("sync", "hash_processes")
+        self._upload_chunk_threads: int = self._conf.get("sync", "upload_chunk_threads")
+        self._download_segments: int = self._conf.get("sync", "download_segments")
+        self._segmented_download_min_size: int = self._conf.get(
+            "sync", "segmented_download_min_size"
+        )
 
         self._is_fs_case_sensitive = self._check_fs_case_sensitive()
 
@@ -739,12 +873,12 @@ class SyncEngine:
     def last_change(self) -> float:
         """The time stamp of the last file change or 0.0 if there are no file changes in
         our history."""
-        with self._database_access():
-            row = self._db.execute("SELECT MAX(last_sync) FROM 'index'").fetchone()
-            if not row:
+        with self._database_access(lock=False):
+            rows = self._db.read("SELECT MAX(last_sync) FROM 'index'")
+            if not rows:
                 return 0.0
             try:
-                return row[0] or 0.0
+                return rows[0][0] or 0.0
             except IndexError:
                 return 0.0
 
@@ -757,8 +891,8 @@ class SyncEngine:
     def get_history(self, dbx_path: str | None = None) -> list[SyncEvent]:
         """A list of the last SyncEvents in our history. History will be kept for the
         interval specified by the config value ``keep_history`` (defaults to two weeks)
-        but at most 1,000 events will be kept."""
-        with self._database_access():
+        but at most 1,000 events will be kept. Only committed changes are returned."""
+        with self._database_access(lock=False):
             query: Query
             if dbx_path is None:
                 query = AllQuery()
@@ -766,7 +900,9 @@ class SyncEngine:
                 query = MatchQuery(SyncEvent.dbx_path, dbx_path)
 
             order_expr = "IFNULL(change_time, sync_time)"
-            sync_events = self._history_table.select(query.order_by(order_expr))
+            sync_events = self._history_table.select(
+                query.order_by(order_expr), committed_only=True
+            )
             return sync_events
 
     def reset_sync_state(self) -> None:
@@ -779,6 +915,8 @@ class SyncEngine:
             self._history_table.clear()
             self._sync_errors_table.clear()
             self._hash_table.clear()
+            self._folder_snapshot_table.clear()
+            self._upload_sessions_table.clear()
 
         self._state.reset_to_defaults("sync")
         self.reload_cached_config()
@@ -789,31 +927,35 @@ class SyncEngine:
 
     @property
     def sync_errors(self) -> list[SyncErrorEntry]:
-        """Returns a list of all sync errors."""
-        with self._database_access():
-            return self._sync_errors_table.select(AllQuery())
+        """Returns a list of all sync errors. Errors are committed as soon as they
+        occur."""
+        with self._database_access(lock=False):
+            return self._sync_errors_table.select(AllQuery(), committed_only=True)
 
     @property
     def upload_errors(self) -> list[SyncErrorEntry]:
         """Returns a list of all upload errors."""
-        with self._database_access():
+        with self._database_access(lock=False):
             query = MatchQuery(SyncErrorEntry.direction, SyncDirection.Up)
-            return self._sync_errors_table.select(query)
+            return self._sync_errors_table.select(query, committed_only=True)
 
     @property
     def download_errors(self) -> list[SyncErrorEntry]:
         """Returns a list of all download errors."""
-        with self._database_access():
+        with self._database_access(lock=False):
             query = MatchQuery(SyncErrorEntry.direction, SyncDirection.Down)
-            return self._sync_errors_table.select(query)
+            return self._sync_errors_table.select(query, committed_only=True)
 
     def has_sync_errors(self) -> bool:
         """Returns ``True`` in case of sync errors, ``False`` otherwise."""
-        with self._database_access():
-            return self._sync_errors_table.count() > 0
+        with self._database_access(lock=False):
+            return self._sync_errors_table.count(committed_only=True) > 0
 
     def sync_errors_for_path(
-        self, dbx_path_lower: str, direction: SyncDirection | None = None
+        self,
+        dbx_path_lower: str,
+        direction: SyncDirection | None = None,
+        committed_only: bool = False,
     ) -> list[SyncErrorEntry]:
         """
         Returns a list of all sync errors for the given path and its children.
@@ -821,21 +963,18 @@ class SyncEngine:
         :param dbx_path_lower: Normalised Dropbox path.
         :param direction: Direction to filter sync errors. If not given, both upload
             and download errors will be returned.
+        :param committed_only: Whether to read only committed changes. Such reads do
+            not wait for the database lock. Use this outside of sync threads.
         :returns: List of sync errors.
         """
-        with self._database_access():
-            path_tree_query = PathTreeQuery(
-                SyncErrorEntry.dbx_path_lower, dbx_path_lower
-            )
+        with self._database_access(lock=not committed_only):
+            query: Query = PathTreeQuery(SyncErrorEntry.dbx_path_lower, dbx_path_lower)
 
             if direction:
                 direction_query = MatchQuery(SyncErrorEntry.direction, direction)
-                joint_query = AndQuery(path_tree_query, direction_query)
-                errors = self._sync_errors_table.select(joint_query)
-            else:
-                errors = self._sync_errors_table.select(path_tree_query)
+                query = AndQuery(query, direction_query)
 
-            return errors
+            return self._sync_errors_table.select(query, committed_only=committed_only)
 
     def clear_sync_errors_for_path(
         self, dbx_path_lower: str, recursive: bool = False
@@ -872,15 +1011,33 @@ class SyncEngine:
         with self._database_access():
             return self._index_table.select(AllQuery())
 
-    def get_index_entry(self, dbx_path_lower: str) -> IndexEntry | None:
+    def get_index_entry(
+        self, dbx_path_lower: str, committed_only: bool = False
+    ) -> IndexEntry | None:
         """
         Gets the index entry for the given Dropbox path.
 
         :param dbx_path_lower: Normalized lower case Dropbox path.
+        :param committed_only: Whether to read only committed changes. Such reads do
+            not wait for the database lock. Use this outside of sync threads.
         :returns: Index entry or ``None`` if no entry exists for the given path.
         """
+        with self._database_access(lock=not committed_only):
+            return self._index_table.get(dbx_path_lower, committed_only=committed_only)
+
+    def get_index_entries(
+        self, dbx_paths_lower: Iterable[str]
+    ) -> dict[str, IndexEntry]:
+        """
+        Gets the index entries for multiple Dropbox paths with as few queries as
+        possible. While the returned mapping is alive, the entries are also cached for
+        :meth:`get_index_entry`.
+
+        :param dbx_paths_lower: Normalized lower case Dropbox paths.
+        :returns: Mapping of paths to index entries. Paths without an entry are omitted.
+        """
         with self._database_access():
-            return self._index_table.get(dbx_path_lower)
+            return self._index_table.get_many(dbx_paths_lower)
 
     def iter_index(self) -> Iterator[IndexEntry]:
         """
@@ -901,15 +1058,112 @@ class SyncEngine:
         with self._database_access():
             return self._index_table.count()
 
-    def get_local_rev(self, dbx_path_lower: str) -> str | None:
+    def _get_index_snapshot(self) -> dict[str, tuple[str, bool, float]]:
+        """
+        Loads a compact in-memory copy of our index for bulk comparisons. This avoids
+        one database query per item when comparing a large local tree against the
+        index. Only the columns required for the comparison are loaded.
+
+        :returns: Mapping of normalized Dropbox paths to a tuple of the cased Dropbox
+            path, whether the item is a folder and the time of its last sync.
+        """
+        path_type = IndexEntry.dbx_path_lower.type
+        folder = IndexEntry.item_type.py_to_sql(ItemType.Folder)
+
+        with self._database_access():
+            res = self._db.execute(
+                "SELECT dbx_path_lower, dbx_path_cased, item_type, last_sync "
+                "FROM 'index'"
+            )
+            return {
+                path_type.sql_to_py(row[0]): (
+                    path_type.sql_to_py(row[1]),
+                    row[2] == folder,
+                    row[3] or 0.0,
+                )
+                for row in res
+            }
+
+    def _get_folder_snapshot(self) -> dict[str, tuple[int, float, float, int]]:
+        """
+        Loads the folder snapshot from the last full scan of the local Dropbox folder.
+
+        :returns: Mapping of normalized Dropbox paths to a tuple of inode, mtime, ctime
+            and child count of the folder.
+        """
+        path_type = FolderSnapshotEntry.dbx_path_lower.type
+        inode_type = FolderSnapshotEntry.inode.type
+
+        with self._database_access():
+            res = self._db.execute(
+                "SELECT dbx_path_lower, inode, mtime, ctime, child_count "
+                "FROM folder_snapshot"
+            )
+            return {
+                path_type.sql_to_py(row[0]): (
+                    inode_type.sql_to_py(row[1]),
+                    row[2],
+                    row[3],
+                    row[4],
+                )
+                for row in res
+            }
+
+    def _save_folder_snapshot(
+        self,
+        old_snapshot: dict[str, tuple[int, float, float, int]],
+        new_snapshot: dict[str, tuple[int, float, float, int]],
+    ) -> None:
+        """
+        Saves the folder snapshot from a full scan. Only rows which changed compared to
+        the previous snapshot are written.
+
+        :param old_snapshot: Previous snapshot as returned by
+            :meth:`_get_folder_snapshot`.
+        :param new_snapshot: New snapshot.
+        """
+        path_col = FolderSnapshotEntry.dbx_path_lower
+        inode_col = FolderSnapshotEntry.inode
+
+        deleted = [
+            (path_col.py_to_sql(path),) for path in old_snapshot.keys() - new_snapshot
+        ]
+        changed = [
+            (
+                path_col.py_to_sql(path),
+                inode_col.py_to_sql(inode),
+                mtime,
+                ctime,
+                child_count,
+            )
+            for path, (inode, mtime, ctime, child_count) in new_snapshot.items()
+            if old_snapshot.get(path) != (inode, mtime, ctime, child_count)
+        ]
+
+        with self._database_access():
+            self._db.executemany(
+                "DELETE FROM folder_snapshot WHERE dbx_path_lower = ?", deleted
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO folder_snapshot "
+                "(dbx_path_lower, inode, mtime, ctime, child_count) "
+                "VALUES (?, ?, ?, ?, ?)",
+                changed,
+            )
+
+    def get_local_rev(
+        self, dbx_path_lower: str, committed_only: bool = False
+    ) -> str | None:
         """
         Gets revision number of local file.
 
         :param dbx_path_lower: Normalized lower case Dropbox path.
+        :param committed_only: Whether to read only committed changes, see
+            :meth:`get_index_entry`.
         :returns: Revision number as str or ``None`` if no local revision number has
             been saved.
         """
-        entry = self.get_index_entry(dbx_path_lower)
+        entry = self.get_index_entry(dbx_path_lower, committed_only=committed_only)
 
         if entry:
             return entry.rev
@@ -943,7 +1197,7 @@ class SyncEngine:
 
         dbx_path_lower = event.dbx_path_lower
 
-        with self._database_access():
+        with self._database_access(), self._index_table.transaction():
 
             # Remove any entries for deleted or moved items.
 
@@ -977,42 +1231,68 @@ class SyncEngine:
 
         :param md: Dropbox metadata.
         """
-        with self._database_access():
+        with self._database_access(), self._index_table.transaction():
             if isinstance(md, DeletedMetadata):
                 return self.remove_node_from_index(md.path_lower)
 
-            if isinstance(md, FileMetadata):
-                rev = md.rev
-                hash_str = md.content_hash
-                item_type = ItemType.File
-                symlink_target = md.symlink_target
-                md_id = md.id
-            elif isinstance(md, FolderMetadata):
-                rev = "folder"
-                hash_str = "folder"
-                item_type = ItemType.Folder
-                symlink_target = None
-                md_id = md.id
-            else:
-                raise RuntimeError(f"Unknown metadata type: {md}")
-
-            # Construct correct display path from ancestors.
-            dbx_path_cased = self.correct_case(md.path_display)
-
-            # Update existing entry or create new entry.
-            entry = IndexEntry(
-                dbx_path_cased=dbx_path_cased,
-                dbx_path_lower=md.path_lower,
-                dbx_id=md_id,
-                item_type=item_type,
-                last_sync=None,
-                rev=rev,
-                content_hash=hash_str,
-                symlink_target=symlink_target,
-            )
-
+            entry = self._index_entry_from_dbx_metadata(md)
             self._index_table.update(entry)
 
+    def update_index_from_dbx_metadata_batch(self, entries: Sequence[Metadata]) -> None:
+        """
+        Updates the local index from multiple Dropbox metadata. All created or modified
+        items are written with a single bulk upsert.
+
+        :param entries: Dropbox metadata, ordered such that parent folders come before
+            their children.
+        """
+        with self._database_access(), self._index_table.transaction():
+            index_entries: list[IndexEntry] = []
+
+            for md in entries:
+                if isinstance(md, DeletedMetadata):
+                    self.remove_node_from_index(md.path_lower)
+                else:
+                    index_entries.append(self._index_entry_from_dbx_metadata(md))
+
+            self._index_table.upsert_many(index_entries)
+
+    def _index_entry_from_dbx_metadata(self, md: Metadata) -> IndexEntry:
+        """
+        Creates an index entry from Dropbox metadata.
+
+        :param md: Dropbox metadata of a file or folder.
+        :returns: Index entry.
+        """
+        if isinstance(md, FileMetadata):
+            rev = md.rev
+            hash_str = md.content_hash
+            item_type = ItemType.File
+            symlink_target = md.symlink_target
+            md_id = md.id
+        elif isinstance(md, FolderMetadata):
+            rev = "folder"
+            hash_str = "folder"
+            item_type = ItemType.Folder
+            symlink_target = None
+            md_id = md.id
+        else:
+            raise RuntimeError(f"Unknown metadata type: {md}")
+
+        # Construct correct display path from ancestors.
+        dbx_path_cased = self.correct_case(md.path_display)
+
+        return IndexEntry(
+            dbx_path_cased=dbx_path_cased,
+            dbx_path_lower=md.path_lower,
+            dbx_id=md_id,
+            item_type=item_type,
+            last_sync=None,
+            rev=rev,
+            content_hash=hash_str,
+            symlink_target=symlink_target,
+        )
+
     def remove_node_from_index(self, dbx_path_lower: str) -> None:
         """
         Removes any local index entries for the given path and all its children.
@@ -1025,13 +1305,16 @@ class SyncEngine:
 
     # ==== Content hashing =============================================================
 
-    def get_local_hash(self, local_path: str) -> str | None:
+    def get_local_hash(self, local_path: str, cache_only: bool = False) -> str | None:
         """
         Computes content hash of a local file.
 
         :param local_path: Absolute path on local drive.
+        :param cache_only: If True, only return a content hash from our cache and don't
+            compute it if there is no up-to-date cache entry.
         :returns: Content hash to compare with Dropbox's content hash, or 'folder' if
-            the path points to a directory. ``None`` if there is nothing at the path.
+            the path points to a directory. ``None`` if there is nothing at the path or
+            if ``cache_only`` is given and the hash is not cached.
         """
         try:
             stat = os.lstat(local_path)
@@ -1058,6 +1341,9 @@ class SyncEngine:
             if cache_entry and cache_entry.mtime == mtime:
                 return cache_entry.hash_str
 
+        if cache_only:
+            return None
+
         with convert_api_errors():
             hash_str, mtime = content_hash(local_path)
 
@@ -1094,6 +1380,104 @@ class SyncEngine:
             else:
                 self._hash_table.delete_primary_key(inode)
 
+    def _cache_hashes_in_process_pool(self, fs_events: list[FileSystemEvent]) -> None:
+        """
+        Computes the content hashes of all files from the given events which are not
+        yet in our hash cache in a process pool and saves them to the cache. This avoids
+        contention for the GIL when hashing a large number of files. Nothing is done if
+        there are fewer than :const:`PROCESS_HASHING_MIN_FILES` cache misses because
+        starting the worker processes would outweigh any benefit.
+
+        :param fs_events: Local file system events.
+        """
+        inodes: list[int] = []
+        paths: list[str] = []
+
+        for event in fs_events:
+            if event.is_directory or event.event_type == EVENT_TYPE_DELETED:
+                continue
+
+            local_path = get_dest_path(event)
+
+            try:
+                stat = os.lstat(local_path)
+            except OSError:
+                continue
+
+            # Leave symlinks and other special files to get_local_hash().
+            if not S_ISREG(stat.st_mode):
+                continue
+
+            with self._database_access():
+                cache_entry = self._hash_table.get(stat.st_ino)
+
+            if cache_entry and cache_entry.mtime == stat.st_mtime:
+                continue
+
+            inodes.append(stat.st_ino)
+            paths.append(local_path)
+
+        if len(paths) < PROCESS_HASHING_MIN_FILES:
+            return
+
+        self._logger.debug("Hashing %s files in process pool", len(paths))
+
+        # Use "spawn" instead of "fork" since forking a multithreaded process is unsafe.
+        with ProcessPoolExecutor(
+            max_workers=self._hash_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            path_batches = list(chunks(paths, PROCESS_HASHING_BATCH_SIZE))
+            inode_batches = chunks(inodes, PROCESS_HASHING_BATCH_SIZE)
+            results = executor.map(content_hashes, path_batches)
+
+            for batch in zip(inode_batches, path_batches, results):
+                # Files which could not be hashed will be retried later when
+                # creating the SyncEvent, and any errors will be handled there.
+                cache_entries = [
+                    HashCacheEntry(
+                        inode=inode,
+                        local_path=local_path,
+                        hash_str=hash_str,
+                        mtime=mtime,
+                    )
+                    for inode, local_path, (hash_str, mtime) in zip(*batch)
+                    if hash_str
+                ]
+
+                with self._database_access():
+                    self._hash_table.upsert_many(cache_entries)
+
+    # ==== Upload session management ===================================================
+
+    def get_upload_session(self, local_path: str) -> UploadSessionEntry | None:
+        """
+        Gets the state of an unfinished upload session for a local file.
+
+        :param local_path: Absolute path on local drive.
+        :returns: Upload session or None if there is no unfinished upload.
+        """
+        with self._database_access():
+            return self._upload_sessions_table.get(local_path)
+
+    def save_upload_session(self, session: UploadSessionEntry) -> None:
+        """
+        Saves the state of an upload session to resume an interrupted upload later.
+
+        :param session: Upload session to save.
+        """
+        with self._database_access():
+            self._upload_sessions_table.update(session)
+
+    def delete_upload_session(self, local_path: str) -> None:
+        """
+        Removes the upload session for a local file once it is no longer needed.
+
+        :param local_path: Absolute path on local drive.
+        """
+        with self._database_access():
+            self._upload_sessions_table.delete_primary_key(local_path)
+
     # ==== Mignore management ==========================================================
 
     @property
@@ -1193,15 +1577,32 @@ class SyncEngine:
             time.sleep(0.01)
             retries += 1
 
-    def clean_cache_dir(self, raise_error: bool = True) -> None:
+    def clean_cache_dir(
+        self, raise_error: bool = True, keep_partial_downloads: bool = False
+    ) -> None:
         """
         Removes all items in the cache directory.
 
         :param raise_error: Whether errors should be raised or only logged.
+        :param keep_partial_downloads: Whether to keep partial downloads which were
+            modified recently enough to be resumed.
         """
         with self.sync_lock:
             try:
-                delete(self._file_cache_path, raise_error=True)
+                if keep_partial_downloads and isdir(self._file_cache_path):
+                    now = time.time()
+
+                    with os.scandir(self._file_cache_path) as it:
+                        for entry in it:
+                            if not (
+                                entry.name.startswith(PARTIAL_DOWNLOAD_PREFIX)
+                                and entry.is_file(follow_symlinks=False)
+                                and now - entry.stat().st_mtime
+                                < PARTIAL_DOWNLOAD_MAX_AGE
+                            ):
+                                delete(entry.path, raise_error=True)
+                else:
+                    delete(self._file_cache_path, raise_error=True)
             except (FileNotFoundError, IsADirectoryError):
                 pass
             except OSError as err:
@@ -1239,6 +1640,17 @@ class SyncEngine:
                 f"{self._file_cache_path}.",
             )
 
+    def _partial_download_path(self, rev: str) -> str:
+        """
+        Returns the path in our cache directory for a partial download of the given
+        revision. Data at this path is resumed by subsequent downloads.
+
+        :param rev: Revision of the file to download.
+        :returns: Path of the partial download.
+        """
+        self.ensure_cache_dir_present()
+        return osp.join(self.file_cache_path, PARTIAL_DOWNLOAD_PREFIX + rev)
+
     def correct_case(self, dbx_path: str) -> str:
         """
         Converts a Dropbox path with correctly cased basename to a fully cased path.
@@ -1480,6 +1892,24 @@ class SyncEngine:
 
         self._logger.info("Sync aborted")
 
+    def close(self) -> None:
+        """
+        Cancels any ongoing sync, shuts down all worker pools and closes the database
+        connections. The sync engine cannot be used afterwards.
+        """
+        self.cancel_sync()
+
+        for pool in (
+            self._batch_pool,
+            self._upload_pool,
+            self._download_pool,
+            self._hash_pool,
+        ):
+            pool.shutdown(wait=True)
+
+        with self._database_access():
+            self._db.close()
+
     def busy(self) -> bool:
         """
         Checks if we are currently syncing.
@@ -1558,22 +1988,79 @@ class SyncEngine:
                     type=err.__class__.__name__,
                 )
             )
+            # Commit right away so that the error is shown to the user.
+            self._database_checkpoint(n_events=0, force=True)
+
+    @contextmanager
+    def _database_transaction(self) -> Iterator[None]:
+        """
+        A context manager to group database changes, including those from other
+        threads, into a transaction. Changes are committed at checkpoints, see
+        :meth:`_database_checkpoint`, and when the context exits. This does not hold
+        the database lock while the context is active. Changes are committed even if an
+        exception is raised because they reflect changes to local or remote items which
+        have already been applied.
+        """
+        with self._database_access():
+            self._db.begin_transaction()
+            self._db_pending_events = 0
+            self._db_last_commit = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._database_access():
+                self._db.end_transaction()
+
+    def _database_checkpoint(self, n_events: int = 1, force: bool = False) -> None:
+        """
+        Commits the changes of the active :meth:`_database_transaction` once enough
+        sync events have completed or enough time has passed since the last commit.
+        This bounds the changes which are lost on a crash and lets readers of committed
+        data see the sync progress. Does nothing if no transaction is active.
+
+        :param n_events: Number of sync events completed since the last checkpoint.
+        :param force: Whether to commit regardless of the number of completed events
+            and of the time since the last commit.
+        """
+        with self._database_access():
+            if not self._db.in_transaction:
+                return
+
+            self._db_pending_events += n_events
+            elapsed = time.monotonic() - self._db_last_commit
+
+            if (
+                force
+                or self._db_pending_events >= DB_COMMIT_EVENTS
+                or elapsed >= DB_COMMIT_INTERVAL
+            ):
+                self._db.commit()
+                self._db_pending_events = 0
+                self._db_last_commit = time.monotonic()
 
     @contextmanager
-    def _database_access(self, raise_error: bool = True) -> Iterator[None]:
+    def _database_access(
+        self, raise_error: bool = True, lock: bool = True
+    ) -> Iterator[None]:
         """
         A context manager to synchronises access to the SQLite database. Catches
         exceptions raised by sqlite3 and converts them to a MaestralApiError if we know
         how to handle them.
 
         :param raise_error: Whether errors should be raised or logged.
+        :param lock: Whether to acquire the database lock. Reads of committed data from
+            the pool of read-only connections do not require the lock. The lock is
+            always acquired if there is no pool since such reads then use the main
+            connection.
         """
         title = ""
         msg = ""
         new_exc = None
 
         try:
-            with self._db_lock:
+            use_lock = lock or self._db.read_pool is None
+
+            with self._db_lock if use_lock else nullcontext():
                 yield
         except sqlite3.OperationalError as exc:
             title = "Database transaction error"
@@ -1608,6 +2095,7 @@ class SyncEngine:
         """
         self._case_conversion_cache.clear()
         self.fs_events.expire_ignored_events()
+        self.fs_events.expire_write_times()
 
     def _sync_event_from_fs_event(self, fs_event: FileSystemEvent) -> SyncEvent:
         return SyncEvent.from_file_system_event(fs_event, self)
@@ -1617,10 +2105,13 @@ class SyncEngine:
     ) -> list[SyncEvent]:
         """Convert local file system events to sync events. This is done in a thread
         pool to parallelize content hashing."""
+        if self._hash_processes > 0:
+            self._cache_hashes_in_process_pool(fs_events)
+
         res = do_parallel(
             self._sync_event_from_fs_event,
             fs_events,
-            thread_name_prefix="maestral-local-indexer",
+            executor=self._hash_pool,
         )
         return list(res)
 
@@ -1691,18 +2182,55 @@ class SyncEngine:
         changes = []
         snapshot_time = time.time()
 
-        # Get modified or added items.
-        for path, stat in walk(self.dropbox_path, self._scandir_with_ignore):
+        # Load the index once instead of querying it for every local item.
+        index_snapshot = self._get_index_snapshot()
+        index_children: defaultdict[str, list[str]] = defaultdict(list)
+
+        for dbx_path_lower in index_snapshot:
+            index_children[osp.dirname(dbx_path_lower)].append(dbx_path_lower)
+
+        # Folders which did not change since the last scan are listed from our index.
+        # Don't trust the snapshot if the mignore file changed since the last sync
+        # because the listed children may no longer match the current rules.
+        old_folder_snapshot = self._get_folder_snapshot()
 
+        try:
+            mignore_mtime = os.stat(self._mignore_path).st_mtime
+        except OSError:
+            mignore_mtime = 0.0
+
+        listdir = functools.partial(
+            self._scandir_from_snapshot,
+            folder_snapshot=(
+                old_folder_snapshot if mignore_mtime <= self.local_cursor else {}
+            ),
+            index_snapshot=index_snapshot,
+            index_children=index_children,
+        )
+
+        # Keep track of all items seen during the walk to detect deletions and to
+        # create a new folder snapshot.
+        seen_paths: set[str] = set()
+        listed_children: defaultdict[str, set[str]] = defaultdict(set)
+        folder_stats = {"/": os.lstat(self.dropbox_path)}
+
+        # Get modified or added items.
+        for path, stat in walk_parallel(self.dropbox_path, listdir, self._scan_threads):
             is_dir = S_ISDIR(stat.st_mode)
             dbx_path_lower = self.to_dbx_path_lower(path)
-            index_entry = self.get_index_entry(dbx_path_lower)
+            index_entry = index_snapshot.get(dbx_path_lower)
+            seen_paths.add(dbx_path_lower)
+            listed_children[osp.dirname(dbx_path_lower)].add(dbx_path_lower)
+
+            if is_dir:
+                folder_stats[dbx_path_lower] = stat
 
             if index_entry:
                 is_new = False
-                last_sync = index_entry.last_sync or 0.0
+                _, was_dir, last_sync = index_entry
             else:
                 is_new = True
+                was_dir = False
                 last_sync = 0.0
 
             last_sync = max(last_sync, self.local_cursor)
@@ -1727,10 +2255,10 @@ class SyncEngine:
                 changes.append(event)
 
             elif is_modified:
-                if is_dir and index_entry.is_directory:  # type: ignore
+                if is_dir and was_dir:
                     # We don't emit `DirModifiedEvent`s.
                     pass
-                elif not is_dir and not index_entry.is_directory:  # type: ignore
+                elif not is_dir and not was_dir:
                     event = FileModifiedEvent(path)
                     changes.append(event)
                 elif is_dir:
@@ -1742,8 +2270,15 @@ class SyncEngine:
                     event1 = FileCreatedEvent(path)
                     changes += [event0, event1]
 
-        # Get deleted items.
-        for entry in self.iter_index():
+        # Get deleted items. Those are all indexed items which were not seen during the
+        # walk. Only those items need to be checked individually since the walk also
+        # skips excluded items which may still exist locally.
+        for dbx_path_lower in index_snapshot.keys() - seen_paths:
+            entry = self.get_index_entry(dbx_path_lower)
+
+            if not entry:
+                continue
+
             local_path = self.to_local_path_from_cased(entry.dbx_path_cased)
             is_mignore = self._is_mignore_path(entry.dbx_path_cased, entry.is_directory)
 
@@ -1754,6 +2289,28 @@ class SyncEngine:
                     event = FileDeletedEvent(local_path)
                 changes.append(event)
 
+        # Save a snapshot of all folders whose listed content matches our index. Skip
+        # folders changed just before the scan since further changes may not update
+        # their mtime or ctime on file systems with a coarse time resolution.
+        new_folder_snapshot = {}
+        min_change_time = snapshot_time - FOLDER_SNAPSHOT_MTIME_MARGIN
+
+        for dbx_path_lower, stat in folder_stats.items():
+            children = index_children.get(dbx_path_lower, [])
+            if (
+                stat.st_mtime < min_change_time
+                and stat.st_ctime < min_change_time
+                and listed_children[dbx_path_lower] == set(children)
+            ):
+                new_folder_snapshot[dbx_path_lower] = (
+                    stat.st_ino,
+                    stat.st_mtime,
+                    stat.st_ctime,
+                    len(children),
+                )
+
+        self._save_folder_snapshot(old_folder_snapshot, new_folder_snapshot)
+
         # Ensure that the local Dropbox folder still exists before returning changes.
         # This prevents a deletion of the Dropbox folder from being incorrectly
         # processed as individual file deletions.
@@ -1850,7 +2407,7 @@ class SyncEngine:
 
         deleted: list[SyncEvent] = []
         dir_moved: list[SyncEvent] = []
-        other: defaultdict[int, list[SyncEvent]] = defaultdict(list)
+        other_unsorted: list[SyncEvent] = []
 
         for event in sync_events:
             if self.is_excluded(event.local_path) or self.is_mignore(event):
@@ -1861,48 +2418,188 @@ class SyncEngine:
             elif event.is_directory and event.is_moved:
                 dir_moved.append(event)
             else:
-                level = event.dbx_path.count("/")
-                other[level].append(event)
+                other_unsorted.append(event)
 
             # Housekeeping.
             self.activity.add(event)
 
+        # Items at the old path of a moved file, or below it, are synced only after the
+        # move. Defer them to a level after the move so that they can depend on it.
+        move_levels = {
+            event.dbx_path_from_lower: event.dbx_path.count("/")
+            for event in other_unsorted
+            if event.is_moved and event.dbx_path_from_lower
+        }
+        other: defaultdict[int, list[SyncEvent]] = defaultdict(list)
+
+        for event in other_unsorted:
+            level = get_sync_level(event.dbx_path_lower, move_levels)
+            other[level].append(event)
+
         self._logger.debug("Filtered deleted events:\n%s", pf_repr(deleted))
         self._logger.debug("Filtered dir moved events:\n%s", pf_repr(dir_moved))
         self._logger.debug("Filtered other events:\n%s", pf_repr(other))
 
-        # Apply deleted events first, folder moved events second.
-        # Neither event type requires an actual upload.
-        if deleted:
-            self._logger.info("Uploading deletions...")
+        # Commit database changes in batches instead of once per item.
+        with self._database_transaction():
+            # Apply deleted events first, folder moved events second.
+            # Neither event type requires an actual upload.
+            if deleted:
+                self._logger.info("Uploading deletions...")
 
-        res = do_parallel(
-            self._create_remote_entry,
-            deleted,
-            on_progress=lambda x, y: self._logger.info(f"Deleting {x}/{y}"),
-            thread_name_prefix="maestral-upload-pool",
-        )
-        results.extend(res)
+            # Delete files which are in our index in batches. Their revs ensure that we
+            # don't delete any remote changes. Other deletions need more checks and are
+            # applied individually.
+            deleted_files: list[tuple[SyncEvent, str]] = []
+            deleted_other: list[SyncEvent] = []
 
-        if dir_moved:
-            self._logger.info("Moving folders...")
+            for event in deleted:
+                local_rev = self.get_local_rev(event.dbx_path_lower)
 
-        for event in dir_moved:
-            self._logger.info(f"Moving {event.dbx_path_from}")
-            r = self._create_remote_entry(event)
-            results.append(r)
+                if event.is_file and local_rev and local_rev != "folder":
+                    deleted_files.append((event, local_rev))
+                else:
+                    deleted_other.append(event)
+
+            n_deleted = 0
+
+            for delete_batch in chunks(deleted_files, REMOVE_BATCH_SIZE):
+                results.extend(self._on_local_files_deleted_batch(delete_batch))
+                n_deleted += len(delete_batch)
+                self._logger.info(f"Deleting {n_deleted}/{len(deleted)}")
+                self._database_checkpoint(len(delete_batch))
 
-        # Apply other events in parallel, processing each hierarchy level successively.
-        for level in sorted(other):
             res = do_parallel(
                 self._create_remote_entry,
-                other[level],
-                on_progress=lambda x, y: self._logger.info(f"Syncing ↑ {x}/{y}"),
-                thread_name_prefix="maestral-upload-pool",
+                deleted_other,
+                on_progress=lambda x, y: self._logger.info(
+                    f"Deleting {n_deleted + x}/{len(deleted)}"
+                ),
+                executor=self._upload_pool,
             )
-            results.extend(res)
 
-        self._clean_history()
+            for r in res:
+                results.append(r)
+                self._database_checkpoint()
+
+            if dir_moved:
+                self._logger.info("Moving folders...")
+
+            for event in dir_moved:
+                self._logger.info(f"Moving {event.dbx_path_from}")
+                r = self._create_remote_entry(event)
+                results.append(r)
+                self._database_checkpoint()
+
+            # Apply other events in parallel. Each item is synced as soon as its parent
+            # folder has been synced. Folders are created in batches, except for top-level
+            # folders in a team space which are created as shared folders.
+            scheduler: DependencyScheduler[list[SyncEvent]]
+            scheduler = DependencyScheduler(self._upload_pool)
+            task_ids: dict[str, int] = {}
+            move_task_ids: dict[str, int] = {}
+
+            def get_move_tasks(events: list[SyncEvent]) -> set[int]:
+                # Find moves away from the path of each item or of its ancestors.
+                move_tasks = set()
+
+                for e in events:
+                    path = e.dbx_path_lower
+
+                    while path != "/":
+                        try:
+                            move_tasks.add(move_task_ids[path])
+                        except KeyError:
+                            pass
+                        path = osp.dirname(path)
+
+                return move_tasks
+
+            def add_task(
+                func: Callable[[], list[SyncEvent]],
+                events: list[SyncEvent],
+                executor: Executor | None = None,
+            ) -> None:
+                depends_on = get_parent_tasks(events, task_ids) | get_move_tasks(events)
+                task_id = scheduler.add(func, depends_on, executor=executor)
+
+                for e in events:
+                    task_ids[e.dbx_path_lower] = task_id
+                    if e.is_moved and e.dbx_path_from_lower:
+                        move_task_ids[e.dbx_path_from_lower] = task_id
+
+            def sync_individually(event: SyncEvent) -> list[SyncEvent]:
+                return [self._create_remote_entry(event)]
+
+            for level in sorted(other):
+                moved_files: list[SyncEvent] = []
+                created_folders: list[SyncEvent] = []
+                other_events: list[SyncEvent] = []
+                small_files: list[SyncEvent] = []
+
+                for event in other[level]:
+                    is_team_folder = (
+                        self.client.is_team_space and event.dbx_path.count("/") == 1
+                    )
+
+                    if event.is_moved:
+                        moved_files.append(event)
+                    elif event.is_added and event.is_directory and not is_team_folder:
+                        created_folders.append(event)
+                    elif (
+                        event.is_file
+                        and (event.is_added or event.is_changed)
+                        and not event.symlink_target
+                        and event.size <= UPLOAD_BATCH_MAX_FILE_SIZE
+                    ):
+                        small_files.append(event)
+                    else:
+                        other_events.append(event)
+
+                # Parents of moved files are synced at lower levels. Schedule the moves
+                # first so that other items at this level can depend on them.
+                for event in moved_files:
+                    add_task(functools.partial(sync_individually, event), [event])
+
+                for folder_batch in chunks(created_folders, MAKE_DIR_BATCH_SIZE):
+                    add_task(
+                        functools.partial(
+                            self._on_local_folders_created_batch, folder_batch
+                        ),
+                        folder_batch,
+                        executor=self._batch_pool,
+                    )
+
+                # Files are uploaded individually if there are too few to batch them.
+                if len(small_files) < UPLOAD_BATCH_MIN_FILES:
+                    other_events.extend(small_files)
+                    small_files.clear()
+
+                for upload_batch in chunks(small_files, UPLOAD_BATCH_SIZE):
+                    add_task(
+                        functools.partial(
+                            self._on_local_files_uploaded_batch, upload_batch
+                        ),
+                        upload_batch,
+                        executor=self._batch_pool,
+                    )
+
+                for event in other_events:
+                    add_task(functools.partial(sync_individually, event), [event])
+
+            n_events = sum(len(events) for events in other.values())
+            n_done = 0
+
+            for res in scheduler.run():
+                results.extend(res)
+                n_done += len(res)
+                self._logger.info(f"Syncing ↑ {n_done}/{n_events}")
+                self._database_checkpoint(len(res))
+
+            if len(scheduler) > 0:
+                self._logger.debug("Upload scheduler: %s", scheduler.stats())
+
+            self._clean_history()
 
         return results
 
@@ -2271,22 +2968,21 @@ class SyncEngine:
 
         return event
 
-    @staticmethod
-    def _wait_for_creation(local_path: str) -> None:
+    def _wait_for_creation(self, local_path: str) -> None:
         """
-        Wait for a file at a path to be created or modified.
+        Wait for an item at a path to be created or modified. Only items which were
+        written to recently are delayed until no new file system events have been
+        received for :attr:`FSEventHandler.write_settle_time`.
 
         :param local_path: Absolute path to file on drive.
         """
-        try:
-            while True:
-                size1 = getsize(local_path)
-                time.sleep(0.2)
-                size2 = getsize(local_path)
-                if size1 == size2:
-                    return
-        except OSError:
-            return
+        while True:
+            elapsed = self.fs_events.time_since_last_write(local_path)
+
+            if elapsed is None:
+                return
+
+            time.sleep(self.fs_events.write_settle_time - elapsed)
 
     def _on_local_moved(self, event: SyncEvent) -> Metadata | None:
         """
@@ -2369,21 +3065,27 @@ class SyncEngine:
             for md in result.entries:
                 self.update_index_from_dbx_metadata(md)
 
-    def _on_local_file_created(self, event: SyncEvent) -> Metadata | None:
+    def _check_local_file_upload(
+        self, event: SyncEvent
+    ) -> tuple[WriteMode, str | None] | None:
         """
-        Call when a local file is created.
+        Checks if a local file needs to be uploaded for a created or modified event and
+        determines the write mode for the upload. This handles selective sync and
+        normalization conflicts of created files.
 
-        :param event: SyncEvent corresponding to local created event.
-        :returns: Metadata for created item or None if no remote item is created.
-        :raises MaestralApiError: For any issues when syncing the item.
+        :param event: SyncEvent for local created or modified file.
+        :returns: Write mode and rev to match for :class:`core.WriteMode.Update` or
+            None if no upload is required.
+        :raises MaestralApiError: For any issues when checking the item.
         """
-        # Fail fast on badly decoded paths.
-        validate_encoding(event.local_path)
+        if event.is_added:
+            # Fail fast on badly decoded paths.
+            validate_encoding(event.local_path)
 
-        if self._handle_selective_sync_conflict(event):
-            return None
-        if self._handle_normalization_conflict(event):
-            return None
+            if self._handle_selective_sync_conflict(event):
+                return None
+            if self._handle_normalization_conflict(event):
+                return None
 
         self._wait_for_creation(event.local_path)
 
@@ -2392,34 +3094,43 @@ class SyncEngine:
             return None
 
         local_entry = self.get_index_entry(event.dbx_path_lower)
-        local_rev: str | None = None
 
         if not local_entry:
+            if event.is_changed:
+                self._logger.debug(
+                    '"%s" appears to have been modified but cannot find old revision',
+                    event.dbx_path,
+                )
             # File is new to us, let Dropbox rename it if something is in the way.
-            mode = WriteMode.Add
+            return WriteMode.Add, None
         elif local_entry.is_directory:
             # Try to overwrite the destination, this will fail...
-            mode = WriteMode.Overwrite
+            return WriteMode.Overwrite, None
         else:
+            if event.is_added:
+                self._logger.debug(
+                    '"%s" appears to have been created but we are already tracking it',
+                    event.dbx_path,
+                )
             # File has been modified, update remote if matching rev,
             # create conflict otherwise.
-            mode = WriteMode.Update
-            local_rev = local_entry.rev
+            return WriteMode.Update, local_entry.rev
 
-            self._logger.debug(
-                '"%s" appears to have been created but we are already tracking it',
-                event.dbx_path,
-            )
+    def _on_local_file_created(self, event: SyncEvent) -> Metadata | None:
+        """
+        Call when a local file is created.
+
+        :param event: SyncEvent corresponding to local created event.
+        :returns: Metadata for created item or None if no remote item is created.
+        :raises MaestralApiError: For any issues when syncing the item.
+        """
+        upload_mode = self._check_local_file_upload(event)
+
+        if not upload_mode:
+            return None
 
         try:
-            md_new = self.client.upload(
-                event.local_path,
-                event.dbx_path,
-                autorename=True,
-                write_mode=mode,
-                update_rev=local_rev,
-                sync_event=event,
-            )
+            md_new = self._upload_file(event, *upload_mode)
         except (NotFoundError, NotAFolderError, IsAFolderError):
             # Note: NotAFolderError can be raised when a parent in the local path
             # refers to a file instead of a folder.
@@ -2435,6 +3146,185 @@ class SyncEngine:
 
         return md_new
 
+    def _upload_file(
+        self, event: SyncEvent, write_mode: WriteMode, update_rev: str | None
+    ) -> FileMetadata:
+        """
+        Uploads a local file for a sync event. The content hash of the uploaded data is
+        saved to the sync event and, if the file was not modified during the upload, to
+        our hash cache. This saves reading the file again to compute its hash.
+
+        :param event: SyncEvent for local created or modified file.
+        :param write_mode: Write mode for the upload.
+        :param update_rev: Rev to match for :class:`core.WriteMode.Update`.
+        :returns: Metadata of uploaded file.
+        :raises MaestralApiError: For any issues when uploading the item.
+        """
+        try:
+            stat_before = os.lstat(event.local_path)
+        except OSError:
+            stat_before = None
+
+        md_new = self.client.upload(
+            event.local_path,
+            event.dbx_path,
+            autorename=True,
+            write_mode=write_mode,
+            update_rev=update_rev,
+            sync_event=event,
+            max_parallel_chunks=self._upload_chunk_threads,
+            session_store=self,
+        )
+
+        self._save_uploaded_hash(event, md_new, stat_before)
+
+        return md_new
+
+    def _save_uploaded_hash(
+        self, event: SyncEvent, md_new: FileMetadata, stat_before: os.stat_result | None
+    ) -> None:
+        """
+        Saves the content hash of an uploaded file to the sync event and, if the file
+        was not modified during the upload, to our hash cache.
+
+        :param event: SyncEvent for local created or modified file.
+        :param md_new: Metadata of uploaded file.
+        :param stat_before: Stat result of the local file before the upload.
+        """
+        event.content_hash = md_new.content_hash
+
+        try:
+            stat_after = os.lstat(event.local_path)
+        except OSError:
+            stat_after = None
+
+        if (
+            stat_before
+            and stat_after
+            and S_ISREG(stat_before.st_mode)
+            and (stat_before.st_ino, stat_before.st_mtime, stat_before.st_size)
+            == (stat_after.st_ino, stat_after.st_mtime, stat_after.st_size)
+        ):
+            self._save_local_hash(
+                stat_before.st_ino,
+                event.local_path,
+                md_new.content_hash,
+                stat_before.st_mtime,
+            )
+
+    def _on_local_files_uploaded_batch(
+        self, events: list[SyncEvent]
+    ) -> list[SyncEvent]:
+        """
+        Uploads multiple small local files for created or modified events and commits
+        them to Dropbox in a single batch. This is the batched equivalent of calling
+        :meth:`_create_remote_entry` for each event and performs the same checks and
+        conflict handling as :meth:`_on_local_file_created` and
+        :meth:`_on_local_file_modified`.
+
+        :param events: SyncEvents for local created or modified files.
+        :returns: SyncEvents with updated status.
+        """
+        if self._cancel_requested.is_set():
+            raise CancelledError("Sync cancelled")
+
+        self._slow_down()
+
+        def check(
+            event: SyncEvent,
+        ) -> tuple[SyncEvent, tuple[WriteMode, str | None] | None]:
+            event.status = SyncStatus.Syncing
+
+            try:
+                upload_mode = self._check_local_file_upload(event)
+            except SyncError as err:
+                self._handle_sync_error(err, direction=SyncDirection.Up)
+                event.status = SyncStatus.Failed
+                return event, None
+
+            if not upload_mode:
+                event.status = SyncStatus.Skipped
+
+            return event, upload_mode
+
+        # Checks may require API calls, perform them in parallel.
+        to_upload: list[tuple[SyncEvent, tuple[WriteMode, str | None]]] = []
+
+        for event, upload_mode in do_parallel(
+            check, events, executor=self._upload_pool
+        ):
+            if upload_mode:
+                to_upload.append((event, upload_mode))
+
+        stats_before: list[os.stat_result | None] = []
+
+        for event, _ in to_upload:
+            try:
+                stats_before.append(os.lstat(event.local_path))
+            except OSError:
+                stats_before.append(None)
+
+        results: list[FileMetadata | MaestralApiError]
+
+        try:
+            results = self.client.upload_batch(
+                [(e.local_path, e.dbx_path, *mode) for e, mode in to_upload],
+                autorename=True,
+                sync_events=[e for e, _ in to_upload],
+                max_parallel_uploads=NUM_THREADS,
+            )
+        except SyncError as err:
+            # The entire batch failed. Report the error for each item.
+            results = [
+                SyncError(err.title, err.message, dbx_path=e.dbx_path)
+                for e, _ in to_upload
+            ]
+
+        uploaded: list[Metadata] = []
+
+        for (event, _), stat_before, res in zip(to_upload, stats_before, results):
+            if isinstance(res, (NotFoundError, NotAFolderError, IsAFolderError)):
+                # Note: NotAFolderError can be raised when a parent in the local path
+                # refers to a file instead of a folder.
+                self._logger.debug(
+                    'Could not upload "%s": the file does not exist', event.local_path
+                )
+                event.status = SyncStatus.Skipped
+            elif isinstance(res, SyncError):
+                res.local_path = event.local_path
+                self._handle_sync_error(res, direction=SyncDirection.Up)
+                event.status = SyncStatus.Failed
+            elif isinstance(res, MaestralApiError):
+                raise res
+            else:
+                self._save_uploaded_hash(event, res, stat_before)
+
+                try:
+                    if not self._handle_upload_conflict(res, event):
+                        self._logger.debug('Uploaded "%s" to Dropbox', event.dbx_path)
+                except SyncError as err:
+                    self._handle_sync_error(err, direction=SyncDirection.Up)
+                    event.status = SyncStatus.Failed
+                else:
+                    event.status = SyncStatus.Done
+
+                uploaded.append(res)
+
+        # Add index entries and events to the database.
+        with self._database_access():
+            self.update_index_from_dbx_metadata_batch(uploaded)
+
+            for event in events:
+                if event.status == SyncStatus.Done:
+                    self._history_table.save(event)
+
+        for event in events:
+            if event.status != SyncStatus.Failed:
+                self.clear_sync_errors_from_event(event)
+                self.activity.discard(event)
+
+        return events
+
     def _on_local_folder_created(self, event: SyncEvent) -> Metadata | None:
         """
         Call when a local folder is created.
@@ -2498,6 +3388,107 @@ class SyncEngine:
 
         return md_new
 
+    def _on_local_folders_created_batch(
+        self, events: list[SyncEvent]
+    ) -> list[SyncEvent]:
+        """
+        Creates folders for multiple local folder creations on Dropbox in a single batch
+        job. This is the batched equivalent of calling :meth:`_create_remote_entry` for
+        each event and performs the same conflict handling as
+        :meth:`_on_local_folder_created`. All events must be from the same level of the
+        folder hierarchy.
+
+        :param events: SyncEvents for local created folders.
+        :returns: SyncEvents with updated status.
+        """
+        if self._cancel_requested.is_set():
+            raise CancelledError("Sync cancelled")
+
+        self._slow_down()
+
+        to_create: list[SyncEvent] = []
+
+        for event in events:
+            event.status = SyncStatus.Syncing
+
+            try:
+                # Fail fast on badly decoded paths.
+                validate_encoding(event.local_path)
+
+                if self._handle_selective_sync_conflict(event):
+                    event.status = SyncStatus.Skipped
+                elif self._handle_normalization_conflict(event):
+                    event.status = SyncStatus.Skipped
+                else:
+                    to_create.append(event)
+            except SyncError as err:
+                self._handle_sync_error(err, direction=SyncDirection.Up)
+                event.status = SyncStatus.Failed
+
+        results: list[FolderMetadata | MaestralApiError]
+
+        try:
+            results = self.client.make_dir_batch(
+                [e.dbx_path for e in to_create], autorename=False
+            )
+        except SyncError as err:
+            # The entire batch job failed. Report the error for each item.
+            results = [
+                SyncError(err.title, err.message, dbx_path=e.dbx_path)
+                for e in to_create
+            ]
+
+        created: list[Metadata] = []
+
+        for event, res in zip(to_create, results):
+            try:
+                if isinstance(res, FolderConflictError):
+                    self._logger.debug(
+                        'No conflict for "%s": the folder already exists',
+                        event.local_path,
+                    )
+                    try:
+                        md = self.client.get_metadata(event.dbx_path)
+                        if isinstance(md, FolderMetadata):
+                            created.append(md)
+                    except NotFoundError:
+                        pass
+
+                    event.status = SyncStatus.Skipped
+                    continue
+                elif isinstance(res, FileConflictError):
+                    md_new = self.client.make_dir(event.dbx_path, autorename=True)
+                elif isinstance(res, MaestralApiError):
+                    raise res
+                else:
+                    md_new = res
+
+                if not self._handle_upload_conflict(md_new, event):
+                    self._logger.debug('Created "%s" on Dropbox', event.dbx_path)
+
+                created.append(md_new)
+                event.status = SyncStatus.Done
+
+            except SyncError as err:
+                err.local_path = event.local_path
+                self._handle_sync_error(err, direction=SyncDirection.Up)
+                event.status = SyncStatus.Failed
+
+        # Add index entries and events to the database.
+        with self._database_access():
+            self.update_index_from_dbx_metadata_batch(created)
+
+            for event in events:
+                if event.status == SyncStatus.Done:
+                    self._history_table.save(event)
+
+        for event in events:
+            if event.status != SyncStatus.Failed:
+                self.clear_sync_errors_from_event(event)
+                self.activity.discard(event)
+
+        return events
+
     def _on_local_file_modified(self, event: SyncEvent) -> Metadata | None:
         """
         Call when a local file is modified.
@@ -2507,36 +3498,13 @@ class SyncEngine:
             item is modified.
         :raises MaestralApiError: For any issues when syncing the item.
         """
-        self._wait_for_creation(event.local_path)
+        upload_mode = self._check_local_file_upload(event)
 
-        # Check if item already exists with identical content.
-        if not self._check_requires_upload(event):
+        if not upload_mode:
             return None
 
-        local_entry = self.get_index_entry(event.dbx_path_lower)
-        local_rev: str | None = None
-
-        if not local_entry:
-            self._logger.debug(
-                '"%s" appears to have been modified but cannot find old revision',
-                event.dbx_path,
-            )
-            mode = WriteMode.Add
-        elif local_entry.is_directory:
-            mode = WriteMode.Overwrite
-        else:
-            mode = WriteMode.Update
-            local_rev = local_entry.rev
-
         try:
-            md_new = self.client.upload(
-                event.local_path,
-                event.dbx_path,
-                autorename=True,
-                write_mode=mode,
-                update_rev=local_rev,
-                sync_event=event,
-            )
+            md_new = self._upload_file(event, *upload_mode)
         except (NotFoundError, NotAFolderError, IsAFolderError):
             # Note: NotAFolderError can be raised when a parent in the local path
             # refers to a file instead of a folder.
@@ -2552,14 +3520,14 @@ class SyncEngine:
 
         return md_new
 
-    def _on_local_deleted(self, event: SyncEvent) -> Metadata | None:
+    def _check_local_deletion(self, event: SyncEvent) -> bool:
         """
-        Call when a local item is deleted. We try not to delete remote items which have
-        been modified since the last sync.
+        Checks if a local deletion should be applied to Dropbox. This only performs
+        checks which do not require any API calls.
 
         :param event: SyncEvent for local deletion.
-        :returns: Metadata for deleted item or None if no remote item is deleted.
-        :raises MaestralApiError: For any issues when syncing the item.
+        :returns: Whether the remote item should be deleted.
+        :raises SyncError: If the remote item must not be deleted.
         """
         # Return early on invalid encoding. We don't raise an error here because the
         # file cannot exist on the server.
@@ -2571,7 +3539,7 @@ class SyncEngine:
                 'Could not delete "%s": the item does not exist on Dropbox',
                 event.dbx_path,
             )
-            return None
+            return False
 
         # We intercept any attempts to delete the home folder here instead of waiting
         # for an error from the Dropbox API. This allows us to provide a better error
@@ -2594,6 +3562,20 @@ class SyncEngine:
             self._logger.debug(
                 'Not deleting "%s": is excluded by selective sync', event.dbx_path
             )
+            return False
+
+        return True
+
+    def _on_local_deleted(self, event: SyncEvent) -> Metadata | None:
+        """
+        Call when a local item is deleted. We try not to delete remote items which have
+        been modified since the last sync.
+
+        :param event: SyncEvent for local deletion.
+        :returns: Metadata for deleted item or None if no remote item is deleted.
+        :raises MaestralApiError: For any issues when syncing the item.
+        """
+        if not self._check_local_deletion(event):
             return None
 
         local_rev = self.get_local_rev(event.dbx_path_lower)
@@ -2663,6 +3645,91 @@ class SyncEngine:
 
         return md_deleted
 
+    def _on_local_files_deleted_batch(
+        self, events: list[tuple[SyncEvent, str]]
+    ) -> list[SyncEvent]:
+        """
+        Applies local deletions of files to Dropbox in a single batch job. This is the
+        batched equivalent of calling :meth:`_create_remote_entry` for each event. We
+        skip fetching the remote metadata since each file is only deleted if its rev on
+        Dropbox still matches the rev in our index.
+
+        :param events: SyncEvents for local file deletions and their revs from our
+            index.
+        :returns: SyncEvents with updated status.
+        """
+        if self._cancel_requested.is_set():
+            raise CancelledError("Sync cancelled")
+
+        self._slow_down()
+
+        to_delete: list[tuple[SyncEvent, str]] = []
+
+        for event, rev in events:
+            event.status = SyncStatus.Syncing
+
+            try:
+                if self._check_local_deletion(event):
+                    to_delete.append((event, rev))
+                else:
+                    event.status = SyncStatus.Skipped
+            except SyncError as err:
+                self._handle_sync_error(err, direction=SyncDirection.Up)
+                event.status = SyncStatus.Failed
+
+        results: list[Metadata | MaestralApiError]
+
+        try:
+            results = list(
+                self.client.remove_batch([(e.dbx_path, rev) for e, rev in to_delete])
+            )
+        except SyncError as err:
+            # The entire batch job failed, for instance because of too many write
+            # operations. Report the error for each item.
+            results = [
+                SyncError(err.title, err.message, dbx_path=e.dbx_path)
+                for e, _ in to_delete
+            ]
+
+        # Index entries to remove. Files have no children, so we can delete entries by
+        # their primary key instead of removing each node with its children.
+        removed: list[str] = []
+
+        for (event, _), res in zip(to_delete, results):
+            if isinstance(res, (NotFoundError, PathError)):
+                self._logger.debug(
+                    'Could not delete "%s": the item no longer exists or has been '
+                    "changed since last sync",
+                    event.dbx_path,
+                )
+                removed.append(event.dbx_path_lower)
+                event.status = SyncStatus.Skipped
+            elif isinstance(res, SyncError):
+                res.local_path = event.local_path
+                self._handle_sync_error(res, direction=SyncDirection.Up)
+                event.status = SyncStatus.Failed
+            elif isinstance(res, MaestralApiError):
+                raise res
+            else:
+                removed.append(event.dbx_path_lower)
+                event.status = SyncStatus.Done
+
+        with self._database_access():
+            self._index_table.delete_many(removed)
+
+        for event, _ in events:
+            if event.status != SyncStatus.Failed:
+                self.clear_sync_errors_from_event(event)
+                self.activity.discard(event)
+
+        # Add events to history database.
+        with self._database_access():
+            for event, _ in events:
+                if event.status == SyncStatus.Done:
+                    self._history_table.save(event)
+
+        return [event for event, _ in events]
+
     def _handle_upload_conflict(self, md_new: Metadata, event: SyncEvent) -> bool:
         """
         If a conflicting copy was created by Dropbox during the upload, we mirror the
@@ -2716,6 +3783,25 @@ class SyncEngine:
 
         if isinstance(md_old, FileMetadata):
 
+            if (
+                not event.symlink_target
+                and not md_old.symlink_target
+                and event.size != md_old.size
+            ):
+                # File sizes differ, no need to compare content hashes.
+                return True
+
+            if event.content_hash is None:
+                # Content hashes of added or modified files are computed lazily.
+                local_hash = self.get_local_hash(event.local_path)
+
+                if local_hash is None:
+                    # The file no longer exists locally. Leave it to the upload to
+                    # handle this.
+                    return True
+
+                event.content_hash = local_hash
+
             if (
                 event.content_hash == md_old.content_hash
                 and event.symlink_target == md_old.symlink_target
@@ -2807,9 +3893,7 @@ class SyncEngine:
                     res.entries.sort(key=lambda x: x.path_lower.count("/"))
 
                     # Convert metadata to sync_events.
-                    sync_events = [
-                        SyncEvent.from_metadata(md, self) for md in res.entries
-                    ]
+                    sync_events = self._sync_events_from_metadata(res.entries)
                     download_res = self.apply_remote_changes(sync_events)
 
                     success = all(
@@ -2937,12 +4021,30 @@ class SyncEngine:
 
             self._logger.debug("Remote changes:\n%s", pf_repr(changes.entries))
 
-            sync_events = [SyncEvent.from_metadata(md, self) for md in changes.entries]
+            sync_events = self._sync_events_from_metadata(changes.entries)
 
             self._logger.debug("Converted remote changes to SyncEvents")
 
             yield sync_events, changes.cursor
 
+    def _sync_events_from_metadata(self, entries: list[Metadata]) -> list[SyncEvent]:
+        """
+        Converts Dropbox metadata to SyncEvents. Index entries for all items and their
+        parent folders are loaded in bulk instead of one query per item.
+
+        :param entries: Dropbox metadata, ordered such that parent folders come before
+            their children.
+        :returns: SyncEvents for the metadata.
+        """
+        paths = {md.path_lower for md in entries}
+        paths.update({osp.dirname(path) for path in paths})
+
+        # Keep a reference to the entries so that they remain cached while we correct
+        # the casing of paths from their parent folders.
+        index_entries = self.get_index_entries(paths)
+
+        return [SyncEvent.from_metadata(md, self, index_entries) for md in entries]
+
     def apply_remote_changes(self, sync_events: list[SyncEvent]) -> list[SyncEvent]:
         """
         Applies remote changes to local folder. Call this on the result of
@@ -3000,44 +4102,98 @@ class SyncEngine:
 
         self.excluded_items = new_excluded
 
-        # Apply deleted items.
-        if deleted:
-            self._logger.info("Applying deletions...")
+        # Commit database changes in batches instead of once per item.
+        with self._database_transaction():
+            # Apply all changes in parallel. Items are synced as soon as the changes to
+            # their parent folders and any deletions which they depend on are applied.
+            scheduler = self._schedule_remote_changes(deleted, folders, files)
+
+            for res in scheduler.run():
+                results.append(res)
+                self._logger.info(f"Syncing ↓ {len(results)}/{len(scheduler)}")
+                self._database_checkpoint()
+
+            if len(scheduler) > 0:
+                self._logger.debug("Download scheduler: %s", scheduler.stats())
+
+            self._clean_history()
+
+        return results
+
+    def _schedule_remote_changes(
+        self,
+        deleted: dict[int, list[SyncEvent]],
+        folders: dict[int, list[SyncEvent]],
+        files: list[SyncEvent],
+    ) -> DependencyScheduler[SyncEvent]:
+        """
+        Schedules remote changes to be applied locally. The following ordering is
+        guaranteed, all other changes are applied in parallel:
+
+        - Deletions of folders are applied before deletions of their children.
+        - Creations are applied after deletions at the same path or of an ancestor.
+          This handles items which change their type.
+        - Creations of folders are applied after deletions of their children. This
+          handles folders whose casing changes.
+        - Creations are applied after creations of their parent folders.
+
+        :param deleted: Remote deletions, keyed by their level in the hierarchy.
+        :param folders: Remote folder changes, keyed by their level in the hierarchy.
+        :param files: Remote file changes.
+        :returns: Scheduler for all changes.
+        """
+        scheduler: DependencyScheduler[SyncEvent]
+        scheduler = DependencyScheduler(self._download_pool)
+
+        deleted_task_ids: dict[str, int] = {}
+        created_task_ids: dict[str, int] = {}
+        folder_paths = {e.dbx_path_lower for events in folders.values() for e in events}
+        child_deletions: defaultdict[str, set[int]] = defaultdict(set)
+
+        def get_deletion_task(dbx_path_lower: str) -> set[int]:
+            # Find the deletion of the item itself or of its nearest ancestor.
+            path = dbx_path_lower
+
+            while path != "/":
+                try:
+                    return {deleted_task_ids[path]}
+                except KeyError:
+                    path = osp.dirname(path)
+
+            return set()
 
         for level in sorted(deleted):
-            res = do_parallel(
-                self._create_local_entry,
-                deleted[level],
-                on_progress=lambda x, y: self._logger.info(f"Deleting {x}/{y}"),
-                thread_name_prefix="maestral-download-pool",
-            )
-            results.extend(res)
+            for event in deleted[level]:
+                task_id = scheduler.add(
+                    functools.partial(self._create_local_entry, event),
+                    get_parent_tasks([event], deleted_task_ids),
+                )
+                deleted_task_ids[event.dbx_path_lower] = task_id
 
-        # Create local folders, start with top-level and work your way down.
-        if folders:
-            self._logger.info("Creating folders...")
+                dirname = osp.dirname(event.dbx_path_lower)
 
-        for level in sorted(folders):
-            res = do_parallel(
-                self._create_local_entry,
-                folders[level],
-                on_progress=lambda x, y: self._logger.info(f"Creating folder {x}/{y}"),
-                thread_name_prefix="maestral-download-pool",
-            )
-            results.extend(res)
+                while dirname != "/":
+                    if dirname in folder_paths:
+                        child_deletions[dirname].add(task_id)
+                    dirname = osp.dirname(dirname)
 
-        # Apply created files.
-        res = do_parallel(
-            self._create_local_entry,
-            files,
-            on_progress=lambda x, y: self._logger.info(f"Syncing ↓ {x}/{y}"),
-            thread_name_prefix="maestral-download-pool",
-        )
-        results.extend(res)
+        for level in sorted(folders):
+            for event in folders[level]:
+                created_task_ids[event.dbx_path_lower] = scheduler.add(
+                    functools.partial(self._create_local_entry, event),
+                    get_parent_tasks([event], created_task_ids)
+                    | get_deletion_task(event.dbx_path_lower)
+                    | child_deletions[event.dbx_path_lower],
+                )
 
-        self._clean_history()
+        for event in files:
+            scheduler.add(
+                functools.partial(self._create_local_entry, event),
+                get_parent_tasks([event], created_task_ids)
+                | get_deletion_task(event.dbx_path_lower),
+            )
 
-        return results
+        return scheduler
 
     def notify_user(self, sync_events: list[SyncEvent]) -> None:
         """
@@ -3264,16 +4420,12 @@ class SyncEngine:
             stat = os.lstat(local_path)
             if S_ISDIR(stat.st_mode):
                 ctime = stat.st_ctime
-                with os.scandir(local_path) as it:
-                    for entry in it:
-                        if entry.is_dir(follow_symlinks=False):
-                            child_ctime = self._get_ctime(entry.path)
-                        elif not self.is_excluded(entry.name):
-                            child_ctime = entry.stat(follow_symlinks=False).st_ctime
-                        else:
-                            child_ctime = -1.0
-
-                        ctime = max(ctime, child_ctime)
+                # This is called for every folder index update, mostly for small
+                # folders. Walk sequentially to avoid the overhead of a thread pool.
+                for _, child_stat in walk(
+                    local_path, self._scandir_without_excluded_files
+                ):
+                    ctime = max(ctime, child_stat.st_ctime)
 
                 return ctime
             else:
@@ -3305,6 +4457,10 @@ class SyncEngine:
         for entry in changes.entries:
             histories[entry.path_lower].append(entry)
 
+        index_entries = self.get_index_entries(
+            path for path, h in histories.items() if len(h) > 1
+        )
+
         new_entries = []
 
         for h in histories.values():
@@ -3312,7 +4468,7 @@ class SyncEngine:
                 new_entries.extend(h)
             else:
                 last_event = h[-1]
-                local_entry = self.get_index_entry(last_event.path_lower)
+                local_entry = index_entries.get(last_event.path_lower)
                 was_dir = local_entry and local_entry.is_directory
 
                 # Dropbox guarantees that applying events in the provided order will
@@ -3446,12 +4602,18 @@ class SyncEngine:
                     os.symlink(event.symlink_target, event.local_path)
                     stat = os.lstat(event.local_path)
         else:
-            # We download to a temporary file first (this may take some time).
-            tmp_fname = self._new_tmp_file()
+            # We download to a temporary file first (this may take some time). Partial
+            # downloads of the same revision from a previous attempt are resumed.
+            tmp_fname = self._partial_download_path(cast(str, event.rev))
 
             try:
                 md = self.client.download(
-                    f"rev:{event.rev}", tmp_fname, sync_event=event
+                    f"rev:{event.rev}",
+                    tmp_fname,
+                    sync_event=event,
+                    resume=True,
+                    num_segments=self._download_segments,
+                    min_segmented_size=self._segmented_download_min_size,
                 )
                 event = SyncEvent.from_metadata(md, self)
             except SyncError as err:
@@ -3671,7 +4833,9 @@ class SyncEngine:
 
             # Add created and modified events for children as appropriate.
 
-            for path, stat in walk(local_path, self._scandir_with_ignore):
+            for path, stat in walk_parallel(
+                local_path, self._scandir_with_ignore, self._scan_threads
+            ):
                 if S_ISDIR(stat.st_mode):
                     self.fs_events.queue_event(DirCreatedEvent(path))
                 else:
@@ -3705,7 +4869,7 @@ class SyncEngine:
 
     def _clean_history(self) -> None:
         """Commits new events and removes all events older than ``_keep_history`` from
-        history."""
+        history. Also removes upload sessions which can no longer be resumed."""
         with self._database_access():
             # Drop all entries older than keep_history.
             now = time.time()
@@ -3717,6 +4881,12 @@ class SyncEngine:
             )
             self._history_table.clear_cache()
 
+            self._db.execute(
+                "DELETE FROM upload_sessions WHERE time_created < ?",
+                now - DropboxClient.UPLOAD_SESSION_MAX_AGE,
+            )
+            self._upload_sessions_table.clear_cache()
+
     def _scandir_with_ignore(
         self, path: str | os.PathLike[str]
     ) -> Iterator[os.DirEntry[str]]:
@@ -3729,6 +4899,63 @@ class SyncEngine:
                 ):
                     yield entry
 
+    def _scandir_without_excluded_files(
+        self, path: str | os.PathLike[str]
+    ) -> Iterator[os.DirEntry[str]]:
+
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False) or not self.is_excluded(
+                    entry.name
+                ):
+                    yield entry
+
+    def _scandir_from_snapshot(
+        self,
+        path: str,
+        folder_snapshot: dict[str, tuple[int, float, float, int]],
+        index_snapshot: dict[str, tuple[str, bool, float]],
+        index_children: dict[str, list[str]],
+    ) -> Iterable[os.DirEntry[str]]:
+        """
+        Lists a local folder like :meth:`_scandir_with_ignore`. If the folder is
+        unchanged since it was saved in the folder snapshot, its children are taken from
+        our index instead of listing the folder. The folder's ctime is compared in
+        addition to its mtime because tools which preserve the mtime when adding items,
+        such as ``rsync -a`` or ``cp -p``, still update the ctime.
+
+        :param path: Local path of the folder.
+        :param folder_snapshot: Folder snapshot from the last scan.
+        :param index_snapshot: Compact copy of the index.
+        :param index_children: Mapping of folder paths to the paths of their children in
+            the index.
+        :returns: Iterable over directory entries.
+        """
+        dbx_path_lower = self.to_dbx_path_lower(path)
+        saved = folder_snapshot.get(dbx_path_lower)
+        children = index_children.get(dbx_path_lower, [])
+
+        if saved:
+            stat = os.lstat(path)
+            current = (stat.st_ino, stat.st_mtime, stat.st_ctime, len(children))
+            if saved == current:
+                # Items only provide the subset of the DirEntry API used by walk().
+                entries = self._iter_index_children(children, index_snapshot)
+                return cast(Iterator[os.DirEntry[str]], entries)
+
+        return self._scandir_with_ignore(path)
+
+    def _iter_index_children(
+        self, children: list[str], index_snapshot: dict[str, tuple[str, bool, float]]
+    ) -> Iterator[_IndexDirEntry]:
+        for child_path_lower in children:
+            dbx_path_cased, is_dir, _ = index_snapshot[child_path_lower]
+            local_path = self.to_local_path_from_cased(dbx_path_cased)
+            if not self.is_excluded(local_path) and not self._is_mignore_path(
+                dbx_path_cased, is_dir
+            ):
+                yield _IndexDirEntry(local_path)
+
 
 # ======================================================================================
 # Helper functions
@@ -3738,29 +4965,97 @@ class SyncEngine:
 def do_parallel(
     func: Callable[P, T],
     *iterable: Collection[P.args],
+    executor: Executor | None = None,
     thread_name_prefix: str = "",
     on_progress: Callable[[int, int], Any] | None = None,
 ) -> Iterable[T]:
     """
     Similar to ``ThreadPoolExecutor.map()`` but yields results as they become available.
 
+    If a task raises an exception or iteration is stopped early, any tasks which have
+    not started yet are cancelled. In any case, this waits for all running tasks to
+    finish before returning.
+
     :param func: Apply this callable to every item of ``iterable``.
     :param iterable: Iterable with arguments to pass to ``func``.
+    :param executor: Executor to run tasks in. If not given, a new ThreadPoolExecutor
+        will be created and shut down after all tasks have completed.
     :param thread_name_prefix: Used for internal ThreadPoolExecutor.
     :param on_progress: Callback when each task is completed. Takes the number of
         completed items and the total number of items as arguments.
     """
-    with ThreadPoolExecutor(
-        max_workers=NUM_THREADS, thread_name_prefix=thread_name_prefix
-    ) as tpe:
-        fs = [tpe.submit(func, *args) for args in zip(*iterable)]
+    if executor is None:
+        with ThreadPoolExecutor(
+            max_workers=NUM_THREADS, thread_name_prefix=thread_name_prefix
+        ) as tpe:
+            yield from do_parallel(
+                func, *iterable, executor=tpe, on_progress=on_progress
+            )
+        return
+
+    fs = [executor.submit(func, *args) for args in zip(*iterable)]
 
+    try:
         n_done = 0
         for f in as_completed(fs):
             n_done += 1
             if on_progress:
                 on_progress(n_done, len(iterable[0]))
             yield f.result()
+    finally:
+        for f in fs:
+            f.cancel()
+        wait(fs)
+
+
+def get_parent_tasks(events: Iterable[SyncEvent], task_ids: dict[str, int]) -> set[int]:
+    """
+    Finds the tasks which sync the nearest ancestors of the given sync events. This is
+    used to schedule syncing items only after their parent folders have been synced.
+
+    :param events: Sync events to find the ancestor tasks for.
+    :param task_ids: Mapping of normalized Dropbox paths to IDs of their sync tasks.
+    :returns: IDs of the ancestor tasks.
+    """
+    parent_tasks = set()
+
+    for event in events:
+        dirname = osp.dirname(event.dbx_path_lower)
+
+        while dirname != "/":
+            try:
+                parent_tasks.add(task_ids[dirname])
+                break
+            except KeyError:
+                dirname = osp.dirname(dirname)
+
+    return parent_tasks
+
+
+def get_sync_level(dbx_path_lower: str, move_levels: dict[str, int]) -> int:
+    """
+    Returns the level at which to sync an item when syncing changes level by level.
+    This is the level of the item in the folder hierarchy, deferred by the same number
+    of levels as the move of any item away from its path or from one of its ancestors'
+    paths.
+
+    :param dbx_path_lower: Normalized Dropbox path of the item.
+    :param move_levels: Mapping of the normalized old paths of moved items to the
+        levels at which the moves are synced.
+    :returns: Level at which to sync the item.
+    """
+    level = dbx_path_lower.count("/")
+    delay = 0
+    path = dbx_path_lower
+
+    while path != "/":
+        try:
+            delay = max(delay, move_levels[path] - path.count("/"))
+        except KeyError:
+            pass
+        path = osp.dirname(path)
+
+    return level + delay
 
 
 def is_moved(event: FileSystemEvent) -> TypeGuard[FileMovedEvent | DirMovedEvent]:
@@ -7,7 +7,7 @@ import hashlib
 
 from typing import BinaryIO, Union
 
-_WritableBuffer = Union[bytes, bytearray]
+_WritableBuffer = Union[bytes, bytearray, memoryview]
 
 
 class DropboxContentHasher:
@@ -23,12 +23,12 @@ class DropboxContentHasher:
 
     :Example:
 
-        Read a file in chunks of 1024 bytes and compute its content hash:
+        Read a file in chunks of 4 MB and compute its content hash:
 
         >>> hasher = DropboxContentHasher()
         >>> with open('some-file', 'rb') as f:
         ...     while True:
-        ...         chunk = f.read(1024)
+        ...         chunk = f.read(DropboxContentHasher.BLOCK_SIZE)
         ...         if len(chunk) == 0:
         ...             break
         ...         hasher.update(chunk)
@@ -53,18 +53,28 @@ class DropboxContentHasher:
                 "you already called digest() or hexdigest()"
             )
 
-    def update(self, new_data: bytes | bytearray) -> None:
+    def update(self, new_data: bytes | bytearray | memoryview) -> None:
         self._reuse_guard()
 
+        # Slice a memoryview instead of the data itself to avoid copies.
+        data = memoryview(new_data)
+        data_len = len(data)
+
         new_data_pos = 0
-        while new_data_pos < len(new_data):
+        while new_data_pos < data_len:
             if self._block_pos == self.BLOCK_SIZE:
                 self._overall_hasher.update(self._block_hasher.digest())
                 self._block_hasher = hashlib.sha256()
                 self._block_pos = 0
 
             space_in_block = self.BLOCK_SIZE - self._block_pos
-            part = new_data[new_data_pos : (new_data_pos + space_in_block)]
+
+            if new_data_pos == 0 and data_len <= space_in_block:
+                # Fast path: all data fits in the current block.
+                part = data
+            else:
+                part = data[new_data_pos : (new_data_pos + space_in_block)]
+
             self._block_hasher.update(part)
 
             self._block_pos += len(part)
@@ -90,6 +100,8 @@ class DropboxContentHasher:
         c._overall_hasher = self._overall_hasher.copy()
         c._block_hasher = self._block_hasher.copy()
         c._block_pos = self._block_pos
+        c._digested = False
+        c.digest_size = self.digest_size
         return c
 
 
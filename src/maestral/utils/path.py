@@ -12,6 +12,9 @@ import unicodedata
 import fcntl
 import platform
 from stat import S_ISDIR
+from queue import Queue
+from threading import Event
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple, Callable, Iterator, Iterable, Union
 
 # local imports
@@ -411,24 +414,124 @@ def walk(
             # list of its parent and trying to list its contents. If this
             # happens we treat it as empty. Likewise, if the directory was replaced
             # with a file of the same name (less likely, but possible), it will be
-            # treated as empty.
+            # treated as empty. Continue with the remaining items in the parent.
             if exc.errno in (errno.ENOENT, errno.ENOTDIR, errno.EINVAL):
-                return
+                continue
             else:
                 raise
 
 
+_ScanResult = List[Tuple[str, os.stat_result]]
+
+
+def _scan_dir(
+    path: str,
+    listdir: Callable[[str], Iterable["os.DirEntry[str]"]],
+    missing_ok: bool = True,
+) -> _ScanResult:
+    """
+    Lists the content of a single folder together with the stat results of its
+    children. Errors are handled like in :func:`walk`.
+    """
+    results = []
+
+    try:
+        for entry in listdir(path):
+            try:
+                results.append((entry.path, entry.stat(follow_symlinks=False)))
+            except OSError as exc:
+                if exc.errno not in (errno.ENOENT, errno.ENOTDIR, errno.EINVAL):
+                    raise
+    except OSError as exc:
+        # Treat folders which were deleted or replaced while scanning as empty.
+        if not missing_ok or exc.errno not in (
+            errno.ENOENT,
+            errno.ENOTDIR,
+            errno.EINVAL,
+        ):
+            raise
+
+    return results
+
+
+def walk_parallel(
+    root: str,
+    listdir: Callable[[str], Iterable["os.DirEntry[str]"]] = os.scandir,
+    max_workers: int = 1,
+) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Iterates recursively over the content of a folder, listing multiple folders in
+    parallel. This can speed up the walk considerably on file systems with a high
+    latency per request, such as network drives.
+
+    All folders which remain to be listed are submitted to a shared queue of a thread
+    pool, allowing any idle worker to pick up the next folder. Folders are always
+    yielded before their children but the order of items is otherwise undefined.
+    Errors are handled as in :func:`walk`.
+
+    :param root: Root folder to walk.
+    :param listdir: Function to call to get the folder content. Must be thread-safe.
+    :param max_workers: Maximum number of threads to use. If 1 or less, this falls
+        back to :func:`walk`.
+    :returns: Iterator over (path, stat) results.
+    """
+    if max_workers <= 1:
+        yield from walk(root, listdir)
+        return
+
+    results: "Queue[Tuple[_ScanResult, Optional[BaseException]]]" = Queue()
+    cancelled = Event()
+
+    def worker(path: str) -> None:
+        if cancelled.is_set():
+            return
+        try:
+            # Errors when listing the root folder are raised, consistent with walk().
+            results.put((_scan_dir(path, listdir, missing_ok=path != root), None))
+        except BaseException as exc:
+            results.put(([], exc))
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="maestral-walk"
+    )
+
+    try:
+        executor.submit(worker, root)
+        pending = 1
+
+        while pending > 0:
+            items, exc = results.get()
+            pending -= 1
+
+            if exc:
+                raise exc
+
+            # Schedule subfolders before yielding so that workers stay busy while
+            # the consumer processes the results.
+            for path, stat in items:
+                if S_ISDIR(stat.st_mode):
+                    executor.submit(worker, path)
+                    pending += 1
+
+            yield from items
+
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False)
+
+
 # ==== miscellaneous utilities =========================================================
 
 
 def content_hash(
-    local_path: str, chunk_size: int = 65536
+    local_path: str, chunk_size: int = DropboxContentHasher.BLOCK_SIZE
 ) -> Tuple[Optional[str], Optional[float]]:
     """
     Computes content hash of a local file.
 
     :param local_path: Absolute path on local drive.
-    :param chunk_size: Size of chunks to hash in bytes.
+    :param chunk_size: Size of chunks to hash in bytes. Defaults to the block size of
+        the Dropbox content hash, such that each chunk is hashed as a single block.
     :returns: Content hash to compare with Dropbox's content hash and mtime just before
         the hash was computed.
     """
@@ -438,12 +541,18 @@ def content_hash(
         mtime = os.lstat(local_path).st_mtime
 
         try:
-            with open(local_path, "rb", opener=opener_no_symlink) as f:
+            # Read unbuffered into a reusable buffer to avoid copying the data.
+            with open(local_path, "rb", buffering=0, opener=opener_no_symlink) as f:
+                # Don't allocate more memory than required for small files.
+                size = os.fstat(f.fileno()).st_size
+                buffer = bytearray(max(1, min(chunk_size, size)))
+                view = memoryview(buffer)
+
                 while True:
-                    chunk = f.read(chunk_size)
-                    if len(chunk) == 0:
+                    n_read = f.readinto(buffer)
+                    if not n_read:
                         break
-                    hasher.update(chunk)
+                    hasher.update(view[:n_read])
 
         except IsADirectoryError:
             return "folder", mtime
@@ -465,6 +574,28 @@ def content_hash(
         del hasher
 
 
+def content_hashes(
+    local_paths: List[str],
+) -> List[Tuple[Optional[str], Optional[float]]]:
+    """
+    Computes the content hashes of multiple local files. This is used to hash batches
+    of files in a process pool and therefore catches all OSErrors for individual files
+    instead of raising them. Failing files have a content hash of None.
+
+    :param local_paths: Absolute paths on local drive.
+    :returns: List of content hashes and mtimes as returned by :func:`content_hash`.
+    """
+    results: List[Tuple[Optional[str], Optional[float]]] = []
+
+    for local_path in local_paths:
+        try:
+            results.append(content_hash(local_path))
+        except OSError:
+            results.append((None, None))
+
+    return results
+
+
 def fs_max_lengths_for_path(path: str = "/") -> Tuple[int, int]:
     """
     Return the maximum length of file names and paths allowed on a file system.
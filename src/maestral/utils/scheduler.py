@@ -0,0 +1,150 @@
+"""Module containing a scheduler for tasks with dependencies."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import Executor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class SchedulerStats:
+    """Statistics of a scheduler run"""
+
+    n_tasks: int
+    """Number of scheduled tasks."""
+
+    max_queue_depth: int
+    """Maximum number of tasks which were ready but waiting for a worker."""
+
+    mean_wait_time: float
+    """Mean time in seconds that tasks waited for a worker once they were ready."""
+
+    max_wait_time: float
+    """Maximum time in seconds that a task waited for a worker once it was ready."""
+
+
+class DependencyScheduler(Generic[T]):
+    """A scheduler for tasks which depend on the completion of other tasks
+
+    Tasks form a directed acyclic graph. Each task is submitted to the executor as soon
+    as all tasks that it depends on have completed, without waiting for any unrelated
+    tasks. Tasks can only depend on tasks which were added before them.
+
+    :param executor: Default executor to run tasks in.
+    """
+
+    def __init__(self, executor: Executor) -> None:
+        self.executor = executor
+
+        self._funcs: list[Callable[[], T]] = []
+        self._executors: list[Executor] = []
+        self._n_dependencies: list[int] = []
+        self._dependents: list[list[int]] = []
+
+        self._lock = Lock()
+        self._ready_times: dict[int, float] = {}
+        self._wait_times: list[float] = []
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+
+    def add(
+        self,
+        func: Callable[[], T],
+        depends_on: Iterable[int] = (),
+        executor: Executor | None = None,
+    ) -> int:
+        """
+        Adds a task to the scheduler.
+
+        :param func: Callable to run for the task.
+        :param depends_on: IDs of tasks which must complete before this task starts.
+        :param executor: Executor to run this task in instead of the default executor.
+            Tasks which wait for other tasks themselves should be run in a separate
+            executor to prevent deadlocks.
+        :returns: ID of the new task.
+        """
+        task_id = len(self._funcs)
+        dependencies = set(depends_on)
+
+        for dependency in dependencies:
+            if not 0 <= dependency < task_id:
+                raise ValueError(f"Unknown task {dependency}")
+            self._dependents[dependency].append(task_id)
+
+        self._funcs.append(func)
+        self._executors.append(executor or self.executor)
+        self._n_dependencies.append(len(dependencies))
+        self._dependents.append([])
+
+        return task_id
+
+    def __len__(self) -> int:
+        return len(self._funcs)
+
+    def run(self) -> Iterator[T]:
+        """
+        Runs all tasks and yields their results as they become available. If a task
+        raises an exception or iteration is stopped early, any tasks which have not
+        started yet are cancelled. In any case, this waits for all running tasks to
+        finish before returning.
+
+        :returns: Iterator over task results.
+        """
+        n_remaining = list(self._n_dependencies)
+        futures: dict[Future[T], int] = {}
+
+        def submit(task_id: int) -> None:
+            with self._lock:
+                self._ready_times[task_id] = time.monotonic()
+                self._queue_depth += 1
+                self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+
+            executor = self._executors[task_id]
+            futures[executor.submit(self._run_task, task_id)] = task_id
+
+        try:
+            for task_id, n in enumerate(n_remaining):
+                if n == 0:
+                    submit(task_id)
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    task_id = futures.pop(future)
+                    result = future.result()
+
+                    for dependent in self._dependents[task_id]:
+                        n_remaining[dependent] -= 1
+                        if n_remaining[dependent] == 0:
+                            submit(dependent)
+
+                    yield result
+        finally:
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+    def stats(self) -> SchedulerStats:
+        """Returns statistics of the tasks which have been run so far."""
+        with self._lock:
+            n_started = len(self._wait_times)
+            return SchedulerStats(
+                n_tasks=len(self._funcs),
+                max_queue_depth=self._max_queue_depth,
+                mean_wait_time=sum(self._wait_times) / n_started if n_started else 0.0,
+                max_wait_time=max(self._wait_times, default=0.0),
+            )
+
+    def _run_task(self, task_id: int) -> T:
+        with self._lock:
+            self._wait_times.append(time.monotonic() - self._ready_times[task_id])
+            self._queue_depth -= 1
+
+        return self._funcs[task_id]()
@@ -41,6 +41,7 @@ def sync():
 
     observer.stop()
     observer.join()
+    sync.close()
 
     remove_configuration("test-config")
     delete(sync.dropbox_path)
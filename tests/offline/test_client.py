@@ -1,3 +1,7 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from datetime import datetime
 from datetime import timezone
 
@@ -8,6 +12,8 @@ from dropbox.oauth import DropboxOAuth2FlowNoRedirect
 from dropbox import users, users_common, common, team_common, files, sharing
 from maestral.client import (
     DropboxClient,
+    _ByteBudget,
+    get_hash,
     convert_account,
     convert_full_account,
     convert_space_usage,
@@ -16,7 +22,17 @@ from maestral.client import (
 )
 from maestral.keyring import CredentialStorage
 from maestral import core
-from maestral.exceptions import NotLinkedError
+from maestral.exceptions import (
+    NotLinkedError,
+    DataCorruptionError,
+    DropboxConnectionError,
+    MaestralApiError,
+    NotFoundError,
+    SyncError,
+)
+from maestral.models import UploadSessionEntry
+from maestral.utils.path import content_hash
+from maestral.utils.hashing import DropboxContentHasher
 
 
 # ==== DropboxClient tests =============================================================
@@ -94,6 +110,493 @@ def test_unlink_error():
 # ==== type conversion tests ===========================================================
 
 
+def _uploaded_file_md(size: int, hash_str: str) -> files.FileMetadata:
+    return files.FileMetadata(
+        name="file",
+        path_lower="/file",
+        path_display="/file",
+        id="id-0123456789",
+        client_modified=datetime.utcfromtimestamp(10),
+        server_modified=datetime.utcfromtimestamp(20),
+        rev="abcdf12687980",
+        size=size,
+        content_hash=hash_str,
+    )
+
+
+def _mock_upload_client(size: int, hash_str: str) -> DropboxClient:
+    client = DropboxClient("test-config", Mock(spec_set=CredentialStorage))
+    client._dbx = Mock()
+    client._dbx.files_upload.return_value = _uploaded_file_md(size, hash_str)
+    client._dbx.files_upload_session_start.return_value = Mock(session_id="id")
+    client._dbx.files_upload_session_finish.return_value = _uploaded_file_md(
+        size, hash_str
+    )
+    return client
+
+
+@pytest.mark.parametrize("chunk_size", [10**6, 10**5])
+def test_upload_verifies_content_hash(tmp_path, chunk_size):
+    file = tmp_path / "file"
+    file.write_bytes(os.urandom(3 * 10**5))
+    hash_str, _ = content_hash(str(file))
+
+    client = _mock_upload_client(3 * 10**5, hash_str)
+    md = client.upload(str(file), "/file", chunk_size=chunk_size)
+
+    assert md.content_hash == hash_str
+
+    client = _mock_upload_client(3 * 10**5, "0" * 64)
+
+    with pytest.raises(DataCorruptionError):
+        client.upload(str(file), "/file", chunk_size=chunk_size)
+
+
+def test_upload_concurrent(tmp_path, monkeypatch):
+    block_size = DropboxContentHasher.BLOCK_SIZE
+    size = 3 * block_size + 1000
+
+    file = tmp_path / "file"
+    file.write_bytes(os.urandom(size))
+    hash_str, _ = content_hash(str(file))
+
+    client = _mock_upload_client(size, hash_str)
+
+    # Fail the first append with a connection error to test per-chunk retries.
+    failed = []
+
+    def append(data, cursor, close, content_hash):
+        if not failed:
+            failed.append(cursor.offset)
+            raise requests.exceptions.ConnectionError()
+
+    client._dbx.files_upload_session_append_v2.side_effect = append
+    monkeypatch.setattr("maestral.client.time.sleep", lambda _: None)
+
+    md = client.upload(str(file), "/file", chunk_size=block_size, max_parallel_chunks=3)
+
+    assert md.content_hash == hash_str
+
+    start_kwargs = client._dbx.files_upload_session_start.call_args.kwargs
+    assert start_kwargs["session_type"].is_concurrent()
+
+    append_calls = client._dbx.files_upload_session_append_v2.call_args_list
+    offsets = sorted(c.args[1].offset for c in append_calls)
+    assert offsets == sorted([0, block_size, 2 * block_size, 3 * block_size] + failed)
+
+    # Only the last chunk closes the session.
+    last_call = append_calls[-1]
+    assert last_call.args[1].offset == 3 * block_size
+    assert last_call.kwargs["close"] is True
+    assert not any(c.kwargs["close"] for c in append_calls[:-1])
+
+    data, cursor, _ = client._dbx.files_upload_session_finish.call_args.args
+    assert data == b""
+    assert cursor.offset == size
+
+
+def test_upload_batch(tmp_path):
+    contents = [b"content 1", b"content 2", b"content 3", b"content 4"]
+    paths = [tmp_path / f"file{i}" for i in range(len(contents))]
+
+    for path, content in zip(paths, contents):
+        path.write_bytes(content)
+
+    paths[1].unlink()
+
+    client = DropboxClient("test-config", Mock(spec_set=CredentialStorage))
+    client._dbx = Mock()
+    client._dbx.files_upload_session_start.side_effect = lambda data, **kwargs: Mock(
+        session_id=data.decode()
+    )
+
+    def finish_batch(args):
+        entries = []
+        for arg in args:
+            content = arg.cursor.session_id.encode()
+            if content == b"content 3":
+                error = files.UploadSessionFinishError.too_many_write_operations
+                entries.append(files.UploadSessionFinishBatchResultEntry.failure(error))
+            else:
+                # Report a wrong hash for the last file.
+                hash_str = get_hash(content) if content != b"content 4" else "0" * 64
+                md = _uploaded_file_md(len(content), hash_str)
+                entries.append(files.UploadSessionFinishBatchResultEntry.success(md))
+        return files.UploadSessionFinishBatchResult(entries)
+
+    client._dbx.files_upload_session_finish_batch_v2.side_effect = finish_batch
+
+    entries = [(str(p), f"/{p.name}", core.WriteMode.Add, None) for p in paths]
+    res = client.upload_batch(entries, batch_size=2)
+
+    assert isinstance(res[0], core.FileMetadata)
+    assert res[0].content_hash == get_hash(contents[0])
+    assert isinstance(res[1], NotFoundError)
+    assert isinstance(res[2], SyncError)
+    assert res[2].dbx_path == "/file2"
+    assert isinstance(res[3], DataCorruptionError)
+
+    # Files are committed in batches and sessions are closed on upload.
+    assert client._dbx.files_upload_session_finish_batch_v2.call_count == 2
+    start_calls = client._dbx.files_upload_session_start.call_args_list
+    assert all(c.kwargs["close"] for c in start_calls)
+
+
+def _mock_download_client(data: bytes) -> DropboxClient:
+    client = DropboxClient("test-config", Mock(spec_set=CredentialStorage))
+    client._dbx = Mock()
+    client._dbx._headers = None
+
+    hash_str = get_hash(data)
+    md = _uploaded_file_md(len(data), hash_str)
+
+    def iter_range(start, end=len(data)):
+        resp = Mock(status_code=206 if (start, end) != (0, len(data)) else 200)
+        resp.iter_content.return_value = [
+            data[i : min(i + 10**6, end)] for i in range(start, end, 10**6)
+        ]
+        return md, resp
+
+    def clone(headers):
+        start, end = headers["Range"][len("bytes=") :].split("-")
+        end = int(end) + 1 if end else len(data)
+        ranged_dbx = Mock()
+        ranged_dbx.files_download.side_effect = lambda _: iter_range(int(start), end)
+        return ranged_dbx
+
+    client._dbx.files_download.side_effect = lambda _: iter_range(0)
+    client._dbx.clone.side_effect = clone
+
+    return client
+
+
+def test_download_resume(tmp_path):
+    block_size = DropboxContentHasher.BLOCK_SIZE
+    data = os.urandom(2 * block_size + 1000)
+
+    file = tmp_path / "file"
+    file.write_bytes(data[: block_size + 100])
+
+    client = _mock_download_client(data)
+    client.download("rev:1234", str(file), resume=True)
+
+    # Download resumes from the last complete block.
+    assert not client._dbx.files_download.called
+    client._dbx.clone.assert_called_once_with(headers={"Range": f"bytes={block_size}-"})
+    assert file.read_bytes() == data
+
+
+def test_download_resume_after_connection_error(tmp_path, monkeypatch):
+    block_size = DropboxContentHasher.BLOCK_SIZE
+    data = os.urandom(2 * block_size + 1000)
+
+    file = tmp_path / "file"
+    client = _mock_download_client(data)
+
+    # Drop the connection after 5 MB.
+    def iter_content_with_error(chunk_size):
+        yield from (data[i : i + 10**6] for i in range(0, 5 * 10**6, 10**6))
+        raise requests.exceptions.ConnectionError()
+
+    resp = Mock(status_code=200)
+    resp.iter_content.side_effect = iter_content_with_error
+    md = _uploaded_file_md(len(data), get_hash(data))
+    client._dbx.files_download.side_effect = None
+    client._dbx.files_download.return_value = (md, resp)
+
+    monkeypatch.setattr("maestral.client.time.sleep", lambda _: None)
+
+    client.download("rev:1234", str(file))
+
+    client._dbx.clone.assert_called_once_with(headers={"Range": f"bytes={block_size}-"})
+    assert file.read_bytes() == data
+
+
+@pytest.fixture
+def local_http_server():
+    """Serves random data over HTTP as a stand-in for Dropbox servers."""
+    data = os.urandom(16 * 2**20)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}", data
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.benchmark(
+    group="download",
+    min_time=0.1,
+    max_time=2,
+)
+def test_download_performance(tmp_path, benchmark, local_http_server):
+    url, data = local_http_server
+    md = _uploaded_file_md(len(data), get_hash(data))
+    session = requests.Session()
+
+    client = DropboxClient("test-config", Mock(spec_set=CredentialStorage))
+    client._dbx = Mock()
+    client._dbx.files_download.side_effect = lambda _: (
+        md,
+        session.get(url, stream=True),
+    )
+
+    file = tmp_path / "file"
+    benchmark(client.download, "rev:1234", str(file))
+
+    assert file.read_bytes() == data
+
+    if benchmark.stats:
+        mean_time = benchmark.stats.stats.mean
+        benchmark.extra_info["MB/s"] = round(len(data) / mean_time / 10**6, 1)
+
+
+def test_download_segmented(tmp_path):
+    block_size = DropboxContentHasher.BLOCK_SIZE
+    data = os.urandom(3 * block_size + 1000)
+
+    file = tmp_path / "file"
+    client = _mock_download_client(data)
+    sync_event = Mock(size=len(data), completed=0)
+
+    client.download(
+        "rev:1234",
+        str(file),
+        sync_event=sync_event,
+        num_segments=2,
+        min_segmented_size=block_size,
+    )
+
+    ranges = sorted(c.kwargs["headers"]["Range"] for c in client._dbx.clone.mock_calls)
+    assert ranges == [
+        f"bytes=0-{2 * block_size - 1}",
+        f"bytes={2 * block_size}-{len(data) - 1}",
+    ]
+    assert file.read_bytes() == data
+    assert sync_event.completed == len(data)
+
+
+def test_download_segmented_resume(tmp_path):
+    block_size = DropboxContentHasher.BLOCK_SIZE
+    data = os.urandom(3 * block_size + 1000)
+
+    file = tmp_path / "file"
+    file.write_bytes(data[: block_size + 100])
+
+    client = _mock_download_client(data)
+    sync_event = Mock(size=len(data), completed=0)
+
+    client.download(
+        "rev:1234",
+        str(file),
+        sync_event=sync_event,
+        resume=True,
+        num_segments=2,
+        min_segmented_size=block_size,
+    )
+
+    # Segments are written at their position and not appended to the partial file.
+    ranges = sorted(c.kwargs["headers"]["Range"] for c in client._dbx.clone.mock_calls)
+    assert ranges == [
+        f"bytes={3 * block_size}-{len(data) - 1}",
+        f"bytes={block_size}-{3 * block_size - 1}",
+    ]
+    assert file.stat().st_size == len(data)
+    assert file.read_bytes() == data
+
+
+def test_download_segmented_short_writes(tmp_path, monkeypatch):
+    block_size = DropboxContentHasher.BLOCK_SIZE
+    data = os.urandom(3 * block_size + 1000)
+
+    file = tmp_path / "file"
+    client = _mock_download_client(data)
+    sync_event = Mock(size=len(data), completed=0)
+
+    pwrite = os.pwrite
+
+    def short_pwrite(fd, data, offset):
+        # Write at most 1 kB at a time.
+        return pwrite(fd, data[:1000], offset)
+
+    monkeypatch.setattr(os, "pwrite", short_pwrite)
+
+    client.download(
+        "rev:1234",
+        str(file),
+        sync_event=sync_event,
+        num_segments=2,
+        min_segmented_size=block_size,
+    )
+
+    assert file.read_bytes() == data
+
+
+def test_download_segmented_failure(tmp_path):
+    block_size = DropboxContentHasher.BLOCK_SIZE
+    data = os.urandom(3 * block_size + 1000)
+
+    file = tmp_path / "file"
+    client = _mock_download_client(data)
+    clone = client._dbx.clone.side_effect
+
+    def clone_with_error(headers):
+        # Fail the download of the second segment.
+        if not headers["Range"].startswith("bytes=0-"):
+            raise requests.exceptions.HTTPError()
+        return clone(headers)
+
+    client._dbx.clone.side_effect = clone_with_error
+
+    with pytest.raises(MaestralApiError):
+        client.download(
+            "rev:1234",
+            str(file),
+            sync_event=Mock(size=len(data), completed=0),
+            num_segments=2,
+            min_segmented_size=block_size,
+        )
+
+    # Data of the first segment is kept to resume the download.
+    assert file.read_bytes() == data[: 2 * block_size]
+
+
+class DictSessionStore:
+    def __init__(self):
+        self.sessions = {}
+
+    def get_upload_session(self, local_path):
+        return self.sessions.get(local_path)
+
+    def save_upload_session(self, session):
+        self.sessions[session.local_path] = session
+
+    def delete_upload_session(self, local_path):
+        self.sessions.pop(local_path, None)
+
+
+@pytest.mark.parametrize("max_parallel_chunks", [1, 3])
+def test_upload_resume(tmp_path, monkeypatch, max_parallel_chunks):
+    monkeypatch.setattr("maestral.client.time.sleep", lambda _: None)
+
+    chunk_size = DropboxContentHasher.BLOCK_SIZE
+    size = 4 * chunk_size + 1000
+
+    file = tmp_path / "file"
+    file.write_bytes(os.urandom(size))
+    hash_str, _ = content_hash(str(file))
+
+    store = DictSessionStore()
+    client = _mock_upload_client(size, hash_str)
+
+    # Interrupt the upload with a connection error when appending the third chunk.
+
+    def append(data, cursor, close=False, content_hash=None):
+        if cursor.offset == 2 * chunk_size:
+            raise requests.exceptions.ConnectionError()
+
+    client._dbx.files_upload_session_append_v2.side_effect = append
+
+    with pytest.raises(DropboxConnectionError):
+        client.upload(
+            str(file),
+            "/file",
+            chunk_size=chunk_size,
+            max_parallel_chunks=max_parallel_chunks,
+            session_store=store,
+        )
+
+    session = store.get_upload_session(str(file))
+    assert session.session_id == "id"
+    assert session.uploaded_bytes == 2 * chunk_size
+
+    # Resume the upload without starting a new session.
+
+    client._dbx.files_upload_session_start.reset_mock()
+    client._dbx.files_upload_session_append_v2.reset_mock(side_effect=True)
+
+    md = client.upload(
+        str(file),
+        "/file",
+        chunk_size=chunk_size,
+        max_parallel_chunks=max_parallel_chunks,
+        session_store=store,
+    )
+
+    assert md.content_hash == hash_str
+    assert not client._dbx.files_upload_session_start.called
+
+    append_calls = client._dbx.files_upload_session_append_v2.call_args_list
+    assert min(c.args[1].offset for c in append_calls) >= 2 * chunk_size
+    assert store.get_upload_session(str(file)) is None
+
+
+def test_upload_resume_modified_file(tmp_path):
+    chunk_size = DropboxContentHasher.BLOCK_SIZE
+    size = 2 * chunk_size + 1000
+
+    file = tmp_path / "file"
+    file.write_bytes(os.urandom(size))
+    hash_str, _ = content_hash(str(file))
+
+    store = DictSessionStore()
+    store.save_upload_session(
+        UploadSessionEntry(
+            local_path=str(file),
+            dbx_path="/file",
+            session_id="old-id",
+            session_type="sequential",
+            uploaded_bytes=chunk_size,
+            inode=file.stat().st_ino,
+            mtime=file.stat().st_mtime - 1,
+            size=size,
+            time_created=time.time(),
+        )
+    )
+
+    client = _mock_upload_client(size, hash_str)
+    client.upload(str(file), "/file", chunk_size=chunk_size, session_store=store)
+
+    # The file was modified after the previous session was started.
+    assert client._dbx.files_upload_session_start.called
+    assert store.get_upload_session(str(file)) is None
+
+
+def test_byte_budget():
+    budget = _ByteBudget(100)
+    entered = threading.Event()
+
+    def reserve():
+        with budget.reserve(60):
+            entered.set()
+
+    with budget.reserve(60):
+        thread = threading.Thread(target=reserve)
+        thread.start()
+        # Second reservation must wait until the first one is released.
+        assert not entered.wait(0.2)
+
+    assert entered.wait(5)
+    thread.join()
+
+    # Reservations larger than the budget are granted when nothing else is reserved.
+    with budget.reserve(200):
+        pass
+
+
 def test_convert_account():
 
     dbx_account_info = users.Account(
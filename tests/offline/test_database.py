@@ -0,0 +1,298 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+import pytest
+
+from maestral.database.core import Database
+from maestral.database.orm import Manager
+from maestral.database.query import AllQuery
+from maestral.models import IndexEntry, ItemType
+
+
+def make_entry(path: str) -> IndexEntry:
+    return IndexEntry(
+        dbx_path_cased=path,
+        dbx_path_lower=path.lower(),
+        dbx_id="id:" + path,
+        item_type=ItemType.File,
+        last_sync=None,
+        rev="rev",
+        content_hash="hash",
+        symlink_target=None,
+    )
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture
+def manager(db_path):
+    db = Database(sqlite3.connect(db_path))
+    yield Manager(db, IndexEntry)
+    db.close()
+
+
+def count_committed(db_path: str) -> int:
+    with closing(sqlite3.connect(db_path)) as connection:
+        return connection.execute("SELECT COUNT(*) FROM 'index'").fetchone()[0]
+
+
+def test_statements_committed_immediately(manager, db_path):
+    manager.save(make_entry("/a"))
+    assert count_committed(db_path) == 1
+
+
+def test_transaction_commits_once(manager, db_path):
+    with manager.transaction():
+        manager.save(make_entry("/a"))
+
+        with manager.transaction():
+            manager.save(make_entry("/b"))
+
+        # Nested transactions are not committed.
+        assert count_committed(db_path) == 0
+        assert manager.count() == 2
+
+    assert count_committed(db_path) == 2
+
+
+def test_transaction_rollback(manager, db_path):
+    manager.save(make_entry("/a"))
+
+    with pytest.raises(RuntimeError):
+        with manager.transaction():
+            manager.delete_primary_key("/a")
+            manager.save(make_entry("/b"))
+            raise RuntimeError("Abort")
+
+    assert manager.has("/a")
+    assert not manager.has("/b")
+    assert manager.get("/b") is None
+    assert count_committed(db_path) == 1
+
+
+def test_begin_end_transaction(manager, db_path):
+    db = manager.db
+
+    db.begin_transaction()
+    assert db.in_transaction
+
+    manager.save(make_entry("/a"))
+    assert count_committed(db_path) == 0
+
+    db.end_transaction()
+    assert not db.in_transaction
+    assert count_committed(db_path) == 1
+
+    with pytest.raises(RuntimeError):
+        db.end_transaction()
+
+
+def test_nested_transaction_rollback(manager, db_path):
+    with manager.transaction():
+        manager.save(make_entry("/a"))
+
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                manager.save(make_entry("/b"))
+                raise RuntimeError("Abort")
+
+        # Only changes from the nested transaction are rolled back.
+        assert manager.has("/a")
+        assert not manager.has("/b")
+        assert manager.get("/b") is None
+
+    assert count_committed(db_path) == 1
+
+
+def test_commit(manager, db_path):
+    db = manager.db
+
+    with pytest.raises(RuntimeError):
+        db.commit()
+
+    db.begin_transaction()
+    manager.save(make_entry("/a"))
+    db.commit()
+
+    # The transaction remains active after committing.
+    assert db.in_transaction
+    assert count_committed(db_path) == 1
+
+    with manager.transaction():
+        manager.save(make_entry("/b"))
+
+        with pytest.raises(RuntimeError):
+            db.commit()
+
+    db.end_transaction(commit=False)
+    assert count_committed(db_path) == 1
+    assert not manager.has("/b")
+
+
+def test_pragmas(manager):
+    connection = manager.db.connection
+
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connection.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_read_pool(db_path):
+    db = Database(sqlite3.connect(db_path), read_pool_size=2)
+    manager = Manager(db, IndexEntry)
+
+    try:
+        assert db.read_pool is not None
+
+        manager.save(make_entry("/a"))
+
+        with manager.transaction():
+            manager.save(make_entry("/b"))
+
+            # Reads from the pool only see committed changes.
+            assert manager.count(committed_only=True) == 1
+            assert len(manager.select(AllQuery(), committed_only=True)) == 1
+            assert manager.count() == 2
+
+        assert manager.count(committed_only=True) == 2
+
+        # Connections from the pool are read-only.
+        with db.read_pool.connection() as connection:
+            with pytest.raises(sqlite3.OperationalError):
+                connection.execute("DELETE FROM 'index'")
+    finally:
+        db.close()
+
+
+def test_read_pool_size(db_path):
+    db = Database(sqlite3.connect(db_path), read_pool_size=2)
+
+    try:
+        assert db.read_pool is not None
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: db.read("SELECT 1")[0][0], range(50)))
+
+        assert results == [1] * 50
+        assert len(db.read_pool._connections) <= 2
+    finally:
+        db.close()
+
+
+def test_read_pool_in_memory():
+    db = Database(sqlite3.connect(":memory:"), read_pool_size=2)
+    assert db.read_pool is None
+    assert db.read("SELECT 1")[0][0] == 1
+
+
+def test_upsert_many(manager, db_path):
+    manager.save(make_entry("/a"))
+    cached = manager.get("/a")
+
+    entries = [make_entry("/a"), make_entry("/b")]
+    entries[0].rev = "new rev"
+
+    manager.upsert_many(entries)
+
+    assert count_committed(db_path) == 2
+    assert manager.get("/a").rev == "new rev"
+    assert manager.get("/a") is not cached
+    assert manager.get("/b").rev == "rev"
+
+    entry = make_entry("/c")
+    entry.dbx_path_lower = None  # type: ignore
+
+    with pytest.raises(ValueError):
+        manager.upsert_many([entry])
+
+
+def test_delete_many(manager, db_path):
+    manager.upsert_many([make_entry(f"/{i}") for i in range(10)])
+    manager.get("/0")
+
+    manager.delete_many([f"/{i}" for i in range(5)])
+
+    assert count_committed(db_path) == 5
+    assert manager.get("/0") is None
+    assert manager.has("/5")
+
+
+@pytest.mark.benchmark(group="database")
+@pytest.mark.parametrize("method", ["update", "upsert_many"])
+def test_index_write_performance(db_path, benchmark, method):
+    db = Database(sqlite3.connect(db_path))
+    manager = Manager(db, IndexEntry)
+    entries = [make_entry(f"/folder/file {i}.txt") for i in range(100_000)]
+
+    def write_entries():
+        if method == "update":
+            with manager.transaction():
+                for entry in entries:
+                    manager.update(entry)
+        else:
+            manager.upsert_many(entries)
+
+    try:
+        benchmark.pedantic(write_entries, rounds=1, iterations=1)
+        assert manager.count() == len(entries)
+    finally:
+        db.close()
+
+
+def test_get_many(manager, db_path):
+    manager.upsert_many([make_entry(f"/{i}") for i in range(2000)])
+    cached = manager.get("/0")
+
+    queries = []
+    manager.db.connection.set_trace_callback(queries.append)
+
+    entries = manager.get_many([f"/{i}" for i in range(2000)] + ["/missing"])
+
+    manager.db.connection.set_trace_callback(None)
+
+    assert len(entries) == 2000
+    assert entries["/0"] is cached
+    assert entries["/1999"].dbx_path_lower == "/1999"
+    assert "/missing" not in entries
+    assert len(queries) == 3
+
+    # Fetched entries are cached.
+    assert manager.get("/1999") is entries["/1999"]
+
+
+def test_row_factory(manager):
+    entry = make_entry("/Folder/file.txt")
+    entry.last_sync = 1.5
+    manager.save(entry)
+    manager.clear_cache()
+
+    loaded = manager.get("/folder/file.txt")
+
+    assert loaded is not entry
+    assert not hasattr(loaded, "__dict__")
+
+    for column in IndexEntry.__columns__:
+        assert getattr(loaded, column.name) == getattr(entry, column.name)
+
+    assert loaded.item_type is ItemType.File
+    assert loaded.symlink_target is None
+
+
+@pytest.mark.benchmark(group="database")
+def test_index_read_performance(db_path, benchmark):
+    db = Database(sqlite3.connect(db_path))
+    manager = Manager(db, IndexEntry)
+    manager.upsert_many([make_entry(f"/folder/file {i}.txt") for i in range(100_000)])
+
+    def read_entries():
+        manager.clear_cache()
+        return manager.select(AllQuery())
+
+    try:
+        entries = benchmark.pedantic(read_entries, rounds=1, iterations=1)
+        assert len(entries) == 100_000
+    finally:
+        db.close()
@@ -1,4 +1,5 @@
 import os
+import time
 from pathlib import Path
 
 from watchdog.events import (
@@ -6,6 +7,8 @@ from watchdog.events import (
     DirCreatedEvent,
     DirMovedEvent,
     FileMovedEvent,
+    FileModifiedEvent,
+    FileClosedEvent,
 )
 
 from maestral.sync import SyncDirection, SyncEngine
@@ -49,6 +52,37 @@ def test_always_ignored_events(sync: SyncEngine) -> None:
     assert sync.fs_events.local_file_event_queue.empty()
 
 
+def test_write_times(sync: SyncEngine) -> None:
+    path = "/test"
+
+    # Items without recent writes are not delayed.
+    assert sync.fs_events.time_since_last_write(path) is None
+
+    t0 = time.monotonic()
+    sync._wait_for_creation(path)
+    assert time.monotonic() - t0 < sync.fs_events.write_settle_time
+
+    # Items with recent writes are delayed until no new writes are received.
+    sync.fs_events.on_any_event(FileModifiedEvent(path))
+    assert sync.fs_events.time_since_last_write(path) is not None
+
+    t0 = time.monotonic()
+    sync._wait_for_creation(path)
+    assert time.monotonic() - t0 > 0.5 * sync.fs_events.write_settle_time
+    assert sync.fs_events.time_since_last_write(path) is None
+
+    # Closing a file after writing completes the write.
+    sync.fs_events.on_any_event(FileModifiedEvent(path))
+    sync.fs_events.on_any_event(FileClosedEvent(path))
+    assert sync.fs_events.time_since_last_write(path) is None
+
+    # Write times are expired.
+    sync.fs_events.on_any_event(FileModifiedEvent(path))
+    time.sleep(sync.fs_events.write_settle_time)
+    sync.fs_events.expire_write_times()
+    assert sync.fs_events._last_write_times == {}
+
+
 def test_fs_ignore_tree_creation(sync: SyncEngine) -> None:
 
     new_dir = Path(sync.dropbox_path) / "parent"
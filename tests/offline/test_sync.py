@@ -1,8 +1,35 @@
+import os
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
 from queue import Queue
 
-from maestral.sync import ActivityTree, ActivityNode
-from maestral.models import SyncEvent, SyncDirection, SyncStatus, ChangeType, ItemType
+import pytest
+from watchdog.events import FileCreatedEvent, FileModifiedEvent, FileDeletedEvent
+
+import maestral.sync
+from maestral.sync import SyncEngine, ActivityTree, ActivityNode, do_parallel
+from maestral.models import (
+    SyncEvent,
+    SyncDirection,
+    SyncStatus,
+    ChangeType,
+    ItemType,
+    IndexEntry,
+    UploadSessionEntry,
+)
+from maestral.core import FileMetadata, FolderMetadata, WriteMode
+from maestral.exceptions import (
+    CancelledError,
+    NotFoundError,
+    PathError,
+    FolderConflictError,
+    FileConflictError,
+)
+from maestral.utils.path import content_hash
 
 
 EVENT1 = SyncEvent(
@@ -146,3 +173,887 @@ def assert_tree_integrity(node: ActivityNode) -> None:
     # Recurse.
     for child in node.children.values():
         assert_tree_integrity(child)
+
+
+def test_local_changes_while_inactive(sync: SyncEngine) -> None:
+    def create_file(name: str) -> str:
+        path = os.path.join(sync.dropbox_path, name)
+        with open(path, "w") as f:
+            f.write("content")
+        return path
+
+    def add_index_entry(name: str, last_sync: float) -> None:
+        entry = IndexEntry(
+            dbx_path_cased=f"/{name}",
+            dbx_path_lower=f"/{name}",
+            dbx_id="id:" + name,
+            item_type=ItemType.File,
+            last_sync=last_sync,
+            rev="abcdef",
+        )
+        sync._index_table.update(entry)
+
+    new_path = create_file("new.txt")
+    modified_path = create_file("modified.txt")
+    create_file("unchanged.txt")
+    deleted_path = os.path.join(sync.dropbox_path, "deleted.txt")
+
+    add_index_entry("modified.txt", last_sync=1.0)
+    add_index_entry("unchanged.txt", last_sync=time.time() + 60)
+    add_index_entry("deleted.txt", last_sync=1.0)
+
+    changes, _ = sync._get_local_changes_while_inactive()
+
+    assert len(changes) == 3
+    assert FileCreatedEvent(new_path) in changes
+    assert FileModifiedEvent(modified_path) in changes
+    assert FileDeletedEvent(deleted_path) in changes
+
+
+def test_local_changes_while_inactive_folder_snapshot(
+    sync: SyncEngine, monkeypatch
+) -> None:
+    # Allow saving snapshots of folders which were just changed by the test. Their
+    # ctime cannot be set to the past.
+    monkeypatch.setattr(maestral.sync, "FOLDER_SNAPSHOT_MTIME_MARGIN", -60)
+
+    listed = []
+    scandir_with_ignore = sync._scandir_with_ignore
+
+    def scandir_spy(path):
+        listed.append(path)
+        return scandir_with_ignore(path)
+
+    monkeypatch.setattr(sync, "_scandir_with_ignore", scandir_spy)
+
+    folder = os.path.join(sync.dropbox_path, "folder")
+    file = os.path.join(folder, "file.txt")
+
+    os.mkdir(folder)
+
+    with open(file, "w") as f:
+        f.write("content")
+
+    for dbx_path, item_type in (
+        ("/folder", ItemType.Folder),
+        ("/folder/file.txt", ItemType.File),
+    ):
+        entry = IndexEntry(
+            dbx_path_cased=dbx_path,
+            dbx_path_lower=dbx_path,
+            dbx_id="id:" + dbx_path,
+            item_type=item_type,
+            last_sync=1.0,
+            rev="abcdef" if item_type is ItemType.File else "folder",
+        )
+        sync._index_table.update(entry)
+
+    for path in (file, folder, sync.dropbox_path):
+        os.utime(path, (0.5, 0.5))
+
+    changes, _ = sync._get_local_changes_while_inactive()
+
+    assert changes == []
+    assert sync._get_folder_snapshot().keys() == {"/", "/folder"}
+
+    # Unchanged folders are listed from the snapshot. Modified files are still
+    # detected.
+    with open(file, "w") as f:
+        f.write("new content")
+
+    listed.clear()
+    changes, _ = sync._get_local_changes_while_inactive()
+
+    assert changes == [FileModifiedEvent(file)]
+    assert folder not in listed
+
+    # Folders are listed again if items are added without changing the folder's
+    # mtime, as done by rsync -a or cp -p, because this still changes its ctime.
+    hidden_file = os.path.join(folder, "hidden.txt")
+
+    with open(hidden_file, "w") as f:
+        f.write("content")
+
+    os.utime(folder, (0.5, 0.5))
+
+    listed.clear()
+    changes, _ = sync._get_local_changes_while_inactive()
+
+    assert FileCreatedEvent(hidden_file) in changes
+    assert folder in listed
+    assert sync._get_folder_snapshot().keys() == {"/"}
+
+
+def test_hashing_in_process_pool(sync: SyncEngine, monkeypatch) -> None:
+    monkeypatch.setattr(maestral.sync, "PROCESS_HASHING_MIN_FILES", 1)
+    sync._hash_processes = 2
+
+    events = []
+
+    for i in range(5):
+        path = os.path.join(sync.dropbox_path, f"file_{i}.txt")
+        with open(path, "w") as f:
+            f.write(f"content {i}")
+        events.append(FileCreatedEvent(path))
+
+    sync._cache_hashes_in_process_pool(events)
+
+    assert sync._hash_table.count() == 5
+
+    for event in events:
+        hash_str, _ = content_hash(event.src_path)
+        assert sync.get_local_hash(event.src_path) == hash_str
+
+
+def test_get_local_hash_cache_only(sync: SyncEngine) -> None:
+    path = os.path.join(sync.dropbox_path, "file.txt")
+
+    with open(path, "w") as f:
+        f.write("content")
+
+    assert sync.get_local_hash(path, cache_only=True) is None
+
+    hash_str = sync.get_local_hash(path)
+
+    assert hash_str == content_hash(path)[0]
+    assert sync.get_local_hash(path, cache_only=True) == hash_str
+
+
+def test_committed_only_reads(sync: SyncEngine) -> None:
+    entry = IndexEntry(
+        dbx_path_cased="/file.txt",
+        dbx_path_lower="/file.txt",
+        dbx_id="id:1",
+        item_type=ItemType.File,
+        last_sync=1.0,
+        rev="rev",
+    )
+
+    with sync._database_transaction():
+        sync._index_table.update(entry)
+
+        # Uncommitted changes are only visible to reads from the main connection.
+        assert sync.get_local_rev("/file.txt") == "rev"
+        assert sync.get_local_rev("/file.txt", committed_only=True) is None
+
+    assert sync.get_local_rev("/file.txt", committed_only=True) == "rev"
+
+
+def test_committed_only_reads_without_pool(sync: SyncEngine, monkeypatch) -> None:
+    monkeypatch.setattr(sync._db, "read_pool", None)
+
+    # Reads fall back to the main connection and must hold the lock.
+    with sync._database_access(lock=False):
+        assert sync._db_lock._is_owned()
+
+
+def test_upload_sessions(sync: SyncEngine) -> None:
+    path = os.path.join(sync.dropbox_path, "file.txt")
+
+    session = UploadSessionEntry(
+        local_path=path,
+        dbx_path="/file.txt",
+        session_id="id",
+        session_type="sequential",
+        uploaded_bytes=2**33,
+        inode=1234,
+        mtime=10.0,
+        size=2**34,
+        time_created=time.time(),
+    )
+    sync.save_upload_session(session)
+
+    session.uploaded_bytes = 2**34
+    sync.save_upload_session(session)
+
+    sync._upload_sessions_table.clear_cache()
+    assert sync.get_upload_session(path).uploaded_bytes == 2**34
+
+    # Expired sessions are removed together with old sync history.
+    session.time_created = time.time() - sync.client.UPLOAD_SESSION_MAX_AGE - 1
+    sync.save_upload_session(session)
+    sync._clean_history()
+
+    assert sync.get_upload_session(path) is None
+
+    sync.save_upload_session(session)
+    sync.delete_upload_session(path)
+
+    assert sync.get_upload_session(path) is None
+
+
+def test_local_deletions_batched(sync: SyncEngine, monkeypatch) -> None:
+    for name, rev in [("a.txt", "rev-a"), ("b.txt", "rev-b"), ("folder", "folder")]:
+        entry = IndexEntry(
+            dbx_path_cased=f"/{name}",
+            dbx_path_lower=f"/{name}",
+            dbx_id="id:" + name,
+            item_type=ItemType.Folder if rev == "folder" else ItemType.File,
+            last_sync=1.0,
+            rev=rev,
+        )
+        sync._index_table.update(entry)
+
+    batches = []
+
+    def remove_batch(entries):
+        batches.append(entries)
+        return [object(), NotFoundError("Not found", "", dbx_path="/b.txt")]
+
+    def create_remote_entry(event):
+        event.status = SyncStatus.Done
+        return event
+
+    monkeypatch.setattr(sync.client, "remove_batch", remove_batch)
+    monkeypatch.setattr(sync, "_create_remote_entry", create_remote_entry)
+
+    events = [
+        SyncEvent(
+            dbx_path=f"/{name}",
+            direction=SyncDirection.Up,
+            status=SyncStatus.Queued,
+            local_path=os.path.join(sync.dropbox_path, name),
+            dbx_path_lower=f"/{name}",
+            change_type=ChangeType.Removed,
+            completed=0,
+            size=0,
+            item_type=item_type,
+            sync_time=datetime.today(),
+        )
+        for name, item_type in [
+            ("a.txt", ItemType.File),
+            ("b.txt", ItemType.File),
+            ("new.txt", ItemType.File),
+            ("folder", ItemType.Folder),
+        ]
+    ]
+
+    results = sync.apply_local_changes(events)
+    status = {e.dbx_path: e.status for e in results}
+
+    # Only indexed files are deleted in a batch, guarded by their revs.
+    assert batches == [[("/a.txt", "rev-a"), ("/b.txt", "rev-b")]]
+    assert status == {
+        "/a.txt": SyncStatus.Done,
+        "/b.txt": SyncStatus.Skipped,
+        "/new.txt": SyncStatus.Done,
+        "/folder": SyncStatus.Done,
+    }
+    assert sync.get_index_entry("/a.txt") is None
+    assert sync.get_index_entry("/b.txt") is None
+    assert sync.get_index_entry("/folder") is not None
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        "_on_local_files_deleted_batch",
+        "_on_local_folders_created_batch",
+        "_on_local_files_uploaded_batch",
+    ],
+)
+def test_local_batches_throttled(sync: SyncEngine, monkeypatch, method) -> None:
+    calls = []
+    monkeypatch.setattr(sync, "_slow_down", lambda: calls.append(1))
+
+    getattr(sync, method)([])
+
+    # Batches enforce the CPU limit once, like individually synced items.
+    assert len(calls) == 1
+
+
+def test_local_folders_created_batched(sync: SyncEngine, monkeypatch) -> None:
+    def folder_md(name: str) -> FolderMetadata:
+        return FolderMetadata(
+            name=name,
+            path_lower=f"/{name}",
+            path_display=f"/{name}",
+            id="id:" + name,
+            shared=False,
+        )
+
+    def make_dir_batch(dbx_paths, autorename=False):
+        batches.append(dbx_paths)
+        return [
+            folder_md("a"),
+            FolderConflictError("Conflict", "", dbx_path="/b"),
+            FileConflictError("Conflict", "", dbx_path="/c"),
+            PathError("Invalid path", "", dbx_path="/d"),
+        ]
+
+    def create_remote_entry(event):
+        event.status = SyncStatus.Done
+        return event
+
+    batches = []
+
+    monkeypatch.setattr(sync.client, "make_dir_batch", make_dir_batch)
+    monkeypatch.setattr(
+        sync.client, "make_dir", lambda p, autorename: folder_md("c (1)")
+    )
+    monkeypatch.setattr(sync.client, "get_metadata", lambda p: folder_md("b"))
+    monkeypatch.setattr(sync, "_create_remote_entry", create_remote_entry)
+
+    events = []
+
+    for name, item_type in [
+        ("a", ItemType.Folder),
+        ("b", ItemType.Folder),
+        ("c", ItemType.Folder),
+        ("d", ItemType.Folder),
+        ("file.txt", ItemType.File),
+    ]:
+        local_path = os.path.join(sync.dropbox_path, name)
+
+        if item_type is ItemType.Folder:
+            os.mkdir(local_path)
+
+        event = SyncEvent(
+            dbx_path=f"/{name}",
+            direction=SyncDirection.Up,
+            status=SyncStatus.Queued,
+            local_path=local_path,
+            dbx_path_lower=f"/{name}",
+            change_type=ChangeType.Added,
+            completed=0,
+            size=0,
+            item_type=item_type,
+            sync_time=datetime.today(),
+        )
+        events.append(event)
+
+    results = sync.apply_local_changes(events)
+    status = {e.dbx_path: e.status for e in results}
+
+    # Only folders are created in a batch.
+    assert batches == [["/a", "/b", "/c", "/d"]]
+    assert status == {
+        "/a": SyncStatus.Done,
+        "/b": SyncStatus.Skipped,
+        "/c": SyncStatus.Done,
+        "/d": SyncStatus.Failed,
+        "/file.txt": SyncStatus.Done,
+    }
+
+    # Existing and created folders are added to the index. A conflicting copy is
+    # created for a folder which conflicts with a file on Dropbox.
+    assert sync.get_index_entry("/a").is_directory
+    assert sync.get_index_entry("/b").is_directory
+    assert sync.get_index_entry("/c (1)").is_directory
+    assert sync.get_index_entry("/c") is None
+    assert sync.get_index_entry("/d") is None
+    assert os.path.isdir(os.path.join(sync.dropbox_path, "c (1)"))
+
+    assert len(sync.sync_errors) == 1
+    assert sync.sync_errors[0].dbx_path == "/d"
+
+
+def test_local_small_files_uploaded_batched(sync: SyncEngine, monkeypatch) -> None:
+    def file_md(name: str, hash_str: str) -> FileMetadata:
+        return FileMetadata(
+            name=name,
+            path_lower=f"/{name}",
+            path_display=f"/{name}",
+            id="id:" + name,
+            client_modified=datetime.today(),
+            server_modified=datetime.today(),
+            rev="rev-" + name,
+            size=7,
+            symlink_target=None,
+            shared=False,
+            modified_by=None,
+            is_downloadable=True,
+            content_hash=hash_str,
+        )
+
+    def upload_batch(entries, autorename, sync_events, max_parallel_uploads):
+        batches.append(entries)
+        res = []
+        for local_path, dbx_path, write_mode, update_rev in entries:
+            if dbx_path == "/file1.txt":
+                res.append(PathError("Invalid path", "", dbx_path=dbx_path))
+            else:
+                hash_str, _ = content_hash(local_path)
+                res.append(file_md(dbx_path.lstrip("/"), hash_str))
+        return res
+
+    def create_remote_entry(event):
+        event.status = SyncStatus.Done
+        return event
+
+    batches = []
+
+    sync.client.get_metadata = lambda dbx_path: None
+    monkeypatch.setattr(sync.client, "upload_batch", upload_batch)
+    monkeypatch.setattr(sync, "_create_remote_entry", create_remote_entry)
+
+    n_small = maestral.sync.UPLOAD_BATCH_MIN_FILES
+    events = []
+
+    for i in range(n_small + 1):
+        name = f"file{i}.txt"
+        local_path = os.path.join(sync.dropbox_path, name)
+
+        # The last file is too large to be uploaded in a batch.
+        size = maestral.sync.UPLOAD_BATCH_MAX_FILE_SIZE + 1 if i == n_small else 7
+
+        with open(local_path, "wb") as f:
+            f.write(b"0" * size)
+
+        event = SyncEvent(
+            dbx_path=f"/{name}",
+            direction=SyncDirection.Up,
+            status=SyncStatus.Queued,
+            local_path=local_path,
+            dbx_path_lower=f"/{name}",
+            change_type=ChangeType.Added,
+            completed=0,
+            size=size,
+            item_type=ItemType.File,
+            sync_time=datetime.today(),
+        )
+        events.append(event)
+
+    results = sync.apply_local_changes(events)
+    status = {e.dbx_path: e.status for e in results}
+
+    assert len(batches) == 1
+    assert sorted(e[1] for e in batches[0]) == [f"/file{i}.txt" for i in range(n_small)]
+    assert all(e[2] is WriteMode.Add for e in batches[0])
+
+    assert status.pop("/file1.txt") == SyncStatus.Failed
+    assert all(s == SyncStatus.Done for s in status.values())
+
+    # Uploaded files are added to the index and their hashes are cached.
+    entry = sync.get_index_entry("/file0.txt")
+    assert entry.rev == "rev-file0.txt"
+    assert sync.get_index_entry("/file1.txt") is None
+
+    local_path = os.path.join(sync.dropbox_path, "file0.txt")
+    cached_hash = sync.get_local_hash(local_path, cache_only=True)
+    assert cached_hash == content_hash(local_path)[0]
+
+    assert len(sync.sync_errors) == 1
+    assert sync.sync_errors[0].dbx_path == "/file1.txt"
+
+
+def test_local_changes_synced_after_parents(sync: SyncEngine, monkeypatch) -> None:
+    synced = []
+
+    def create_folders(events):
+        time.sleep(0.2)
+        synced.extend(e.dbx_path for e in events)
+        return events
+
+    def create_remote_entry(event):
+        synced.append(event.dbx_path)
+        return event
+
+    monkeypatch.setattr(sync, "_on_local_folders_created_batch", create_folders)
+    monkeypatch.setattr(sync, "_create_remote_entry", create_remote_entry)
+
+    events = [
+        SyncEvent(
+            dbx_path=dbx_path,
+            direction=SyncDirection.Up,
+            status=SyncStatus.Queued,
+            local_path=sync.dropbox_path + dbx_path,
+            dbx_path_lower=dbx_path,
+            change_type=ChangeType.Added,
+            completed=0,
+            size=0,
+            item_type=item_type,
+            sync_time=datetime.today(),
+        )
+        for dbx_path, item_type in [
+            ("/a", ItemType.Folder),
+            ("/a/b/file.txt", ItemType.File),
+            ("/c/d/file.txt", ItemType.File),
+        ]
+    ]
+
+    sync.apply_local_changes(events)
+
+    # Items wait for their nearest ancestor in the batch but not for other items.
+    assert synced.index("/a") < synced.index("/a/b/file.txt")
+    assert synced.index("/c/d/file.txt") < synced.index("/a")
+
+
+def test_local_changes_synced_after_moves(sync: SyncEngine, monkeypatch) -> None:
+    synced = []
+
+    def create_folders(events):
+        synced.extend(e.dbx_path for e in events)
+        return events
+
+    def create_remote_entry(event):
+        if event.is_moved:
+            time.sleep(0.2)
+        synced.append(event.dbx_path)
+        return event
+
+    monkeypatch.setattr(sync, "_on_local_folders_created_batch", create_folders)
+    monkeypatch.setattr(sync, "_create_remote_entry", create_remote_entry)
+
+    def make_event(dbx_path, item_type, change_type, dbx_path_from=None):
+        return SyncEvent(
+            dbx_path=dbx_path,
+            dbx_path_lower=dbx_path,
+            dbx_path_from=dbx_path_from,
+            dbx_path_from_lower=dbx_path_from,
+            direction=SyncDirection.Up,
+            status=SyncStatus.Queued,
+            local_path=sync.dropbox_path + dbx_path,
+            change_type=change_type,
+            completed=0,
+            size=0,
+            item_type=item_type,
+            sync_time=datetime.today(),
+        )
+
+    events = [
+        # File replaced by a folder after moving it to a subfolder.
+        make_event("/a", ItemType.Folder, ChangeType.Added),
+        make_event("/a/file.txt", ItemType.File, ChangeType.Added),
+        make_event("/b", ItemType.Folder, ChangeType.Added),
+        make_event("/b/a", ItemType.File, ChangeType.Moved, "/a"),
+        # File replaced by a new file after renaming it.
+        make_event("/c", ItemType.File, ChangeType.Added),
+        make_event("/d", ItemType.File, ChangeType.Moved, "/c"),
+    ]
+
+    sync.apply_local_changes(events)
+
+    # Items at the old path of a moved file wait for the move.
+    assert synced.index("/b") < synced.index("/b/a")
+    assert synced.index("/b/a") < synced.index("/a") < synced.index("/a/file.txt")
+    assert synced.index("/d") < synced.index("/c")
+
+
+def test_remote_changes_overlap(sync: SyncEngine, monkeypatch) -> None:
+    lock = threading.Lock()
+    synced = []
+
+    def create_local_entry(event):
+        if event.dbx_path in ("/x", "/a") and not event.is_file:
+            time.sleep(0.2)
+        with lock:
+            synced.append((event.change_type, event.dbx_path))
+        return event
+
+    monkeypatch.setattr(sync, "_create_local_entry", create_local_entry)
+
+    events = [
+        SyncEvent(
+            dbx_path=dbx_path,
+            direction=SyncDirection.Down,
+            status=SyncStatus.Queued,
+            local_path=sync.dropbox_path + dbx_path,
+            dbx_path_lower=dbx_path,
+            change_type=change_type,
+            completed=0,
+            size=0,
+            item_type=item_type,
+            sync_time=datetime.today(),
+        )
+        for dbx_path, change_type, item_type in [
+            ("/x", ChangeType.Removed, ItemType.Folder),
+            ("/x", ChangeType.Added, ItemType.File),
+            ("/z/old.txt", ChangeType.Removed, ItemType.File),
+            ("/z", ChangeType.Added, ItemType.Folder),
+            ("/a", ChangeType.Added, ItemType.Folder),
+            ("/a/file.txt", ChangeType.Added, ItemType.File),
+            ("/file.txt", ChangeType.Added, ItemType.File),
+        ]
+    ]
+
+    sync.apply_remote_changes(events)
+
+    added = ChangeType.Added
+    removed = ChangeType.Removed
+
+    # Creations wait for deletions at the same path and of children and for their
+    # parent folders.
+    assert synced.index((removed, "/x")) < synced.index((added, "/x"))
+    assert synced.index((removed, "/z/old.txt")) < synced.index((added, "/z"))
+    assert synced.index((added, "/a")) < synced.index((added, "/a/file.txt"))
+
+    # Unrelated files don't wait for deletions or folders.
+    assert synced.index((added, "/file.txt")) < synced.index((removed, "/x"))
+    assert synced.index((added, "/file.txt")) < synced.index((added, "/a"))
+
+
+def test_remote_changes_committed_in_batches(sync: SyncEngine, monkeypatch) -> None:
+    def count_committed() -> int:
+        with closing(sqlite3.connect(sync._db_path)) as connection:
+            return connection.execute("SELECT COUNT(*) FROM 'index'").fetchone()[0]
+
+    committed = []
+
+    def create_local_entry(event):
+        event.rev = "rev"
+        sync.update_index_from_sync_event(event)
+        return event
+
+    def commit():
+        commit_orig()
+        committed.append(count_committed())
+
+    commit_orig = sync._db.commit
+
+    monkeypatch.setattr(sync, "_create_local_entry", create_local_entry)
+    monkeypatch.setattr(sync._db, "commit", commit)
+    monkeypatch.setattr(maestral.sync, "DB_COMMIT_EVENTS", 4)
+    monkeypatch.setattr(maestral.sync, "DB_COMMIT_INTERVAL", 60.0)
+
+    events = [
+        SyncEvent(
+            dbx_path=f"/file{i}.txt",
+            direction=SyncDirection.Down,
+            status=SyncStatus.Queued,
+            local_path=f"{sync.dropbox_path}/file{i}.txt",
+            dbx_path_lower=f"/file{i}.txt",
+            dbx_id=f"id:{i}",
+            change_type=ChangeType.Added,
+            completed=0,
+            size=0,
+            item_type=ItemType.File,
+            sync_time=datetime.today(),
+        )
+        for i in range(10)
+    ]
+
+    sync.apply_remote_changes(events)
+
+    # Index changes are committed after every 4 events and when all events have been
+    # applied.
+    assert len(committed) == 2
+    assert all(n >= 4 for n in committed)
+    assert count_committed() == 10
+
+
+def test_sync_errors_visible_during_sync(sync: SyncEngine, monkeypatch) -> None:
+    errors = []
+
+    def create_local_entry(event):
+        err = NotFoundError("Not found", dbx_path=event.dbx_path)
+        sync._handle_sync_error(err, direction=SyncDirection.Down)
+
+        # Sync errors are committed while the sync is still in progress.
+        errors.append([e.dbx_path for e in sync.sync_errors])
+        return event
+
+    monkeypatch.setattr(sync, "_create_local_entry", create_local_entry)
+    monkeypatch.setattr(maestral.sync, "DB_COMMIT_INTERVAL", 60.0)
+
+    event = SyncEvent(
+        dbx_path="/file.txt",
+        direction=SyncDirection.Down,
+        status=SyncStatus.Queued,
+        local_path=f"{sync.dropbox_path}/file.txt",
+        dbx_path_lower="/file.txt",
+        dbx_id="id:1",
+        change_type=ChangeType.Added,
+        completed=0,
+        size=0,
+        item_type=ItemType.File,
+        sync_time=datetime.today(),
+    )
+
+    sync.apply_remote_changes([event])
+
+    assert errors == [["/file.txt"]]
+
+
+def test_sync_events_from_metadata_bulk_lookup(sync: SyncEngine) -> None:
+    sync._index_table.upsert_many(
+        [
+            IndexEntry(
+                dbx_path_cased=f"/Folder/file {i}.txt",
+                dbx_path_lower=f"/folder/file {i}.txt",
+                dbx_id=f"id:{i}",
+                item_type=ItemType.File,
+                last_sync=None,
+                rev=f"rev-{i}",
+                content_hash=None,
+            )
+            for i in range(1, 1000)
+        ]
+        + [
+            IndexEntry(
+                dbx_path_cased="/Folder",
+                dbx_path_lower="/folder",
+                dbx_id="id:folder",
+                item_type=ItemType.Folder,
+                last_sync=None,
+                rev="folder",
+                content_hash="folder",
+            )
+        ]
+    )
+    sync._index_table.clear_cache()
+
+    entries = [
+        FileMetadata(
+            name=f"file {i}.txt",
+            path_lower=f"/folder/file {i}.txt",
+            path_display=f"/folder/file {i}.txt",
+            id=f"id:{i}",
+            client_modified=datetime.today(),
+            server_modified=datetime.today(),
+            rev=f"rev-{i}",
+            size=7,
+            symlink_target=None,
+            shared=True,
+            modified_by="dbid:1234",
+            is_downloadable=True,
+            content_hash=None,
+        )
+        for i in range(1, 2000)
+    ]
+
+    queries = []
+    sync._connection.set_trace_callback(queries.append)
+
+    try:
+        sync_events = sync._sync_events_from_metadata(entries)
+    finally:
+        sync._connection.set_trace_callback(None)
+
+    assert len(queries) <= 3
+    assert sync_events[0].dbx_path == "/Folder/file 1.txt"
+    assert sync_events[0].change_type is ChangeType.Modified
+    assert sync_events[-1].change_type is ChangeType.Added
+
+
+def test_do_parallel_reuses_executor() -> None:
+    thread_names = set()
+
+    def func(i: int) -> int:
+        thread_names.add(threading.current_thread().name)
+        return 2 * i
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="test-pool") as executor:
+        for _ in range(5):
+            res = do_parallel(func, range(10), executor=executor)
+            assert sorted(res) == [2 * i for i in range(10)]
+
+    assert len(thread_names) <= 2
+    assert all(name.startswith("test-pool") for name in thread_names)
+
+
+def test_do_parallel_cancels_pending_tasks() -> None:
+    calls = []
+
+    def func(i: int) -> None:
+        calls.append(i)
+        if i == 0:
+            raise CancelledError("Sync cancelled")
+        time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(CancelledError):
+            list(do_parallel(func, range(100), executor=executor))
+
+    # Tasks which have not started when the first task failed are cancelled.
+    assert len(calls) < 100
+
+
+def test_close(sync: SyncEngine) -> None:
+    # Start worker threads in all pools.
+    for pool in (sync._upload_pool, sync._download_pool, sync._hash_pool):
+        list(do_parallel(lambda i: i, range(10), executor=pool))
+
+    sync._batch_pool.submit(lambda: None).result()
+
+    pools = (sync._upload_pool, sync._download_pool, sync._hash_pool, sync._batch_pool)
+    threads = [t for pool in pools for t in pool._threads]
+    assert threads
+
+    # Open a read-only connection.
+    sync.has_sync_errors()
+    assert sync._db.read_pool._connections
+
+    sync.close()
+
+    for thread in threads:
+        assert not thread.is_alive()
+
+    with pytest.raises(RuntimeError):
+        sync._upload_pool.submit(lambda: None)
+
+    # Database connections are closed.
+    assert not sync._db.read_pool._connections
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        sync._connection.execute("SELECT 1")
+
+
+def test_clean_cache_dir_keeps_partial_downloads(sync: SyncEngine) -> None:
+    partial_path = sync._partial_download_path("015a3c0f37b0e9000000001")
+    tmp_path = sync._new_tmp_file()
+
+    with open(partial_path, "wb") as f:
+        f.write(b"partial content")
+
+    sync.clean_cache_dir(keep_partial_downloads=True)
+
+    assert os.path.isfile(partial_path)
+    assert not os.path.exists(tmp_path)
+
+    sync.clean_cache_dir()
+
+    assert not os.path.exists(partial_path)
+
+
+def test_get_ctime_walks_sequentially(sync: SyncEngine, monkeypatch) -> None:
+    def walk_parallel(*args, **kwargs):
+        raise AssertionError("Thread pool used for a single folder")
+
+    monkeypatch.setattr(maestral.sync, "walk_parallel", walk_parallel)
+
+    folder = os.path.join(sync.dropbox_path, "folder")
+    os.makedirs(os.path.join(folder, "subfolder"))
+
+    file = os.path.join(folder, "subfolder", "file.txt")
+    with open(file, "w") as f:
+        f.write("content")
+
+    assert sync._get_ctime(folder) >= os.stat(file).st_ctime
+    assert sync._get_ctime(os.path.join(sync.dropbox_path, "missing")) == -1.0
+
+
+def test_check_requires_upload_missing_file(sync: SyncEngine, monkeypatch) -> None:
+    md = FileMetadata(
+        name="file.txt",
+        path_lower="/file.txt",
+        path_display="/file.txt",
+        id="id:1",
+        client_modified=datetime.today(),
+        server_modified=datetime.today(),
+        rev="rev",
+        size=0,
+        symlink_target=None,
+        shared=False,
+        modified_by=None,
+        is_downloadable=True,
+        content_hash="hash",
+    )
+    monkeypatch.setattr(sync.client, "get_metadata", lambda dbx_path: md)
+
+    event = SyncEvent(
+        dbx_path="/file.txt",
+        direction=SyncDirection.Up,
+        status=SyncStatus.Syncing,
+        local_path=sync.dropbox_path + "/file.txt",
+        dbx_path_lower="/file.txt",
+        change_type=ChangeType.Added,
+        completed=0,
+        size=0,
+        item_type=ItemType.File,
+        sync_time=datetime.today(),
+    )
+
+    # A file which cannot be hashed because it no longer exists is left to the upload.
+    assert sync._check_requires_upload(event)
+    assert event.content_hash is None
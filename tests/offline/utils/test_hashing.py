@@ -0,0 +1,66 @@
+import hashlib
+
+import pytest
+
+from maestral.utils.hashing import DropboxContentHasher
+from maestral.utils.path import content_hash
+
+
+BLOCK_SIZE = DropboxContentHasher.BLOCK_SIZE
+SIZES = [0, 1, BLOCK_SIZE - 1, BLOCK_SIZE, BLOCK_SIZE + 1, 2 * BLOCK_SIZE + 123]
+
+
+def make_data(size: int) -> bytes:
+    return (bytes(range(251)) * (size // 251 + 1))[:size]
+
+
+def reference_hash(data: bytes) -> str:
+    block_hashes = b"".join(
+        hashlib.sha256(data[i : i + BLOCK_SIZE]).digest()
+        for i in range(0, len(data), BLOCK_SIZE)
+    )
+    return hashlib.sha256(block_hashes).hexdigest()
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("chunk_size", [1000, 65536, BLOCK_SIZE, 3 * BLOCK_SIZE])
+def test_content_hasher(size, chunk_size):
+    data = make_data(size)
+
+    hasher = DropboxContentHasher()
+    view = memoryview(data)
+
+    for i in range(0, size, chunk_size):
+        hasher.update(view[i : i + chunk_size])
+
+    assert hasher.hexdigest() == reference_hash(data)
+
+
+def test_content_hasher_copy():
+    hasher = DropboxContentHasher()
+    hasher.update(b"content")
+
+    hasher_copy = hasher.copy()
+    hasher_copy.update(b" more content")
+
+    assert hasher.hexdigest() == reference_hash(b"content")
+    assert hasher_copy.hexdigest() == reference_hash(b"content more content")
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_content_hash(tmp_path, size):
+    data = make_data(size)
+
+    file = tmp_path / "file"
+    file.write_bytes(data)
+
+    hash_str, mtime = content_hash(str(file))
+
+    assert hash_str == reference_hash(data)
+    assert mtime == file.stat().st_mtime
+    assert content_hash(str(file), chunk_size=1000)[0] == hash_str
+
+
+def test_content_hash_special_items(tmp_path):
+    assert content_hash(str(tmp_path))[0] == "folder"
+    assert content_hash(str(tmp_path / "missing")) == (None, None)
@@ -1,3 +1,6 @@
+import errno
+import os
+
 import pytest
 
 from maestral.utils.path import (
@@ -5,6 +8,8 @@ from maestral.utils.path import (
     get_existing_equivalent_paths,
     is_fs_case_sensitive,
     is_child,
+    walk,
+    walk_parallel,
 )
 from maestral.utils.appdirs import get_home_dir
 
@@ -82,3 +87,61 @@ def test_is_child():
     assert is_child("/parent/path/child/", "/parent/path")
     assert not is_child("/parent/path", "/parent/path")
     assert not is_child("/path1", "/path2")
+
+
+def test_walk_skips_vanished_dirs(tmp_path):
+
+    # Assert that a folder which disappears during the walk is treated as empty
+    # without ending the iteration over its siblings.
+
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "file.txt").touch()
+
+    def listdir(path):
+        if os.path.basename(path) == "a":
+            raise FileNotFoundError(errno.ENOENT, "No such file or directory", path)
+        return sorted(os.scandir(path), key=lambda e: e.name)
+
+    paths = [path for path, _ in walk(str(tmp_path), listdir)]
+
+    assert paths == [
+        str(tmp_path / "a"),
+        str(tmp_path / "b"),
+        str(tmp_path / "b" / "file.txt"),
+        str(tmp_path / "c"),
+        str(tmp_path / "c" / "file.txt"),
+    ]
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_walk_parallel(tmp_path, max_workers):
+
+    # Assert that the parallel walk returns the same items as a sequential walk and
+    # that folders are always returned before their children.
+
+    for i in range(5):
+        for j in range(5):
+            folder = tmp_path / f"folder_{i}" / f"subfolder_{j}"
+            folder.mkdir(parents=True)
+            (folder / "file.txt").touch()
+
+    expected = {path: stat.st_ino for path, stat in walk(str(tmp_path))}
+    result = list(walk_parallel(str(tmp_path), max_workers=max_workers))
+
+    assert {path: stat.st_ino for path, stat in result} == expected
+    assert len(result) == len(expected)
+
+    seen = {str(tmp_path)}
+
+    for path, _ in result:
+        assert os.path.dirname(path) in seen
+        seen.add(path)
+
+
+def test_walk_parallel_errors(tmp_path):
+
+    # Assert that errors when listing the root folder are raised.
+
+    with pytest.raises(FileNotFoundError):
+        list(walk_parallel(str(tmp_path / "missing"), max_workers=4))
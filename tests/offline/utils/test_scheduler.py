@@ -0,0 +1,83 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from maestral.utils.scheduler import DependencyScheduler
+
+
+def test_dependencies():
+    finished = []
+    lock = threading.Lock()
+
+    def task(name: str, duration: float = 0.0):
+        def func():
+            time.sleep(duration)
+            with lock:
+                finished.append(name)
+            return name
+
+        return func
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        scheduler = DependencyScheduler(executor)
+
+        slow = scheduler.add(task("slow", 0.5))
+        parent = scheduler.add(task("parent"))
+        child = scheduler.add(task("child"), depends_on=[parent])
+        scheduler.add(task("grandchild"), depends_on=[child])
+        scheduler.add(task("slow child"), depends_on=[slow, parent])
+
+        results = list(scheduler.run())
+
+    assert sorted(results) == sorted(
+        ["slow", "parent", "child", "grandchild", "slow child"]
+    )
+
+    # Children are started as soon as their parents are done, without waiting for
+    # unrelated tasks.
+    assert finished.index("parent") < finished.index("child")
+    assert finished.index("child") < finished.index("grandchild")
+    assert finished.index("grandchild") < finished.index("slow")
+    assert finished[-1] == "slow child"
+
+    stats = scheduler.stats()
+    assert stats.n_tasks == 5
+    assert stats.max_queue_depth >= 1
+    assert stats.max_wait_time >= stats.mean_wait_time >= 0
+
+
+def test_failure_cancels_pending_tasks():
+    calls = []
+
+    def fail():
+        calls.append("fail")
+        raise RuntimeError("Task failed")
+
+    def succeed():
+        calls.append("succeed")
+        time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        scheduler = DependencyScheduler(executor)
+
+        parent = scheduler.add(fail)
+
+        for _ in range(100):
+            scheduler.add(succeed)
+
+        scheduler.add(succeed, depends_on=[parent])
+
+        with pytest.raises(RuntimeError):
+            list(scheduler.run())
+
+    assert len(calls) < 102
+
+
+def test_unknown_dependency():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        scheduler = DependencyScheduler(executor)
+
+        with pytest.raises(ValueError):
+            scheduler.add(lambda: None, depends_on=[0])